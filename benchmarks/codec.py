@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Microbenchmarks of proof and schema codecs on synthetic data (see `synthetic.py`).
+
+Each benchmark is run in batches of calls lasting at least `--min-time` seconds, taking the best of `--runs` batches;
+throughput is reported as operations and bytes of the consensus serialization of the processed object per second.
+Results are written as JSON with `--output`, and may be compared against earlier ones with `--compare`."""
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import rgbconvert
+from rgbconvert.schema import Schema, compiler
+from rgbconvert.proofs import Proof
+
+import synthetic
+
+
+def benchmarks(schema: Schema, proof: Proof) -> dict:
+    """Returns benchmark name -> (bytes per operation, factory); factories take number of calls and return function
+    making them, so per-call setup is done before the time measurement starts"""
+    data = proof.serialize()
+    # -- structured data are passed through JSON, so they are the same as the ones read from files
+    structure = json.loads(json.dumps(proof.structure_serialize()))
+    schema_structure = synthetic.schema_data(len(schema.seal_types))
+
+    def stream_deserialize(n):
+        return lambda: [Proof.stream_deserialize(io.BytesIO(data), schema_obj=schema) for _ in range(n)]
+
+    def stream_serialize(n):
+        return lambda: [proof.stream_serialize(io.BytesIO()) for _ in range(n)]
+
+    def structure_serialize(n):
+        return lambda: [proof.structure_serialize() for _ in range(n)]
+
+    def construct(n):
+        return lambda: [Proof(schema_obj=schema, **structure) for _ in range(n)]
+
+    def resolve_refs(n):
+        schemas = [Schema(**schema_structure) for _ in range(n)]
+        return lambda: [item.resolve_refs() for item in schemas]
+
+    def get_hash(n):
+        proofs = [Proof.from_buffer(data, schema_obj=schema)[0] for _ in range(n)]
+        return lambda: [item.GetHash() for item in proofs]
+
+    return {
+        'proof.stream_deserialize': (len(data), stream_deserialize),
+        'proof.stream_serialize': (len(data), stream_serialize),
+        'proof.structure_serialize': (len(data), structure_serialize),
+        'proof.construct': (len(data), construct),
+        'proof.GetHash': (len(data), get_hash),
+        'schema.resolve_refs': (len(schema.serialize()), resolve_refs),
+    }
+
+
+def measure(factory, min_time: float, runs: int) -> float:
+    """Returns the best time of a single call in seconds"""
+    n = 1
+    while True:
+        run = factory(n)
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        n = max(n * 2, int(n * min_time / elapsed * 1.2)) if elapsed > 0 else n * 10
+    best = elapsed
+    for _ in range(runs - 1):
+        run = factory(n)
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best / n
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, stdout=subprocess.PIPE,
+                              stderr=subprocess.DEVNULL, universal_newlines=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@click.command()
+@click.option('--seals', '-n', default=100, help='Number of seals in the proof')
+@click.option('--seal-types', '-m', default=4, help='Number of seal types in the schema')
+@click.option('--parents', '-p', default=100, help='Number of parent proofs')
+@click.option('--repeat', '-r', default=4, help='Number of values of each metadata field')
+@click.option('--seed', default=0, help='Seed of the synthetic data generator')
+@click.option('--min-time', default=0.2, help='Minimal duration of a measured batch of calls, in seconds')
+@click.option('--runs', default=3, help='Number of measured batches (the best one is taken)')
+@click.option('--interpreted', is_flag=True, help='Use interpreted proof codecs instead of the schema-compiled ones')
+@click.option('--filter', '-k', 'pattern', default=None, help='Run only benchmarks with names containing the string')
+@click.option('--output', '-o', default=None, help='File to write results to, in JSON')
+@click.option('--compare', '-c', default=None, help='File with earlier results to compare against')
+def main(seals: int, seal_types: int, parents: int, repeat: int, seed: int, min_time: float, runs: int,
+         interpreted: bool, pattern: str, output: str, compare: str):
+    compiler.enabled = not interpreted
+    schema = synthetic.make_schema(seal_types)
+    proof = synthetic.make_proof(schema, seals=seals, parents=parents, repeat=repeat, seed=seed)
+
+    results = {}
+    for name, (size, factory) in benchmarks(schema, proof).items():
+        if pattern is not None and pattern not in name:
+            continue
+        seconds = measure(factory, min_time, runs)
+        results[name] = {
+            'ops_per_sec': 1 / seconds,
+            'bytes_per_sec': size / seconds,
+            'bytes_per_op': size,
+        }
+
+    params = {'seals': seals, 'seal_types': seal_types, 'parents': parents, 'repeat': repeat, 'seed': seed,
+              'interpreted': interpreted}
+    baseline = None
+    if compare is not None:
+        with open(compare) as f:
+            earlier = json.load(f)
+        baseline = earlier['results']
+        if earlier['params'] != params:
+            click.echo(f'Warning: results in `{compare}` were measured with different parameters', err=True)
+    for name, result in results.items():
+        line = f'{name:28} {result["ops_per_sec"]:12.1f} ops/s {result["bytes_per_sec"] / 1e6:10.3f} MB/s'
+        if baseline is not None and name in baseline:
+            line += f' {result["ops_per_sec"] / baseline[name]["ops_per_sec"]:8.2f}x'
+        click.echo(line)
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump({
+                'params': params,
+                'env': {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+                        'machine': platform.machine(), 'version': rgbconvert.__version__,
+                        'revision': git_revision(), 'time': int(time.time())},
+                'results': results
+            }, f, indent=2)
+            f.write('\n')
+
+
+if __name__ == '__main__':
+    main()
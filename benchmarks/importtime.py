@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Measures cold-start import time of the package and the CLI with `python -X importtime` and checks it against the
+budget recorded in `importtime.json`; exits with non-zero status if any of the budgets is exceeded.
+
+Import time of each target is the sum of cumulative times of its top-level imports, minus the same sum for the bare
+interpreter. Checks take the best of several runs; with `--record`, new budgets are computed from the median of at
+least `RECORD_RUNS` runs multiplied by the headroom ratio, so they are not exceeded by measurement noise."""
+
+import os
+import re
+import sys
+import json
+import tempfile
+import statistics
+import subprocess
+
+import click
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'importtime.json')
+
+TARGETS = {
+    'package': ['-c', 'import rgbconvert'],
+    'proof-api': ['-c', 'import rgbconvert; rgbconvert.Proof, rgbconvert.Schema'],
+    'cli-help': [os.path.join(ROOT, 'rgb-convert.py'), '--help'],
+}
+
+# Smallest number of runs per target used to record budgets
+RECORD_RUNS = 15
+
+# Smallest budget which may be recorded, so targets importing almost nothing do not fail on measurement noise
+MIN_BUDGET = 5000
+
+# Top-level entries of `-X importtime` output: "import time: <self> | <cumulative> | <module>"
+TOP_LEVEL = re.compile(r'^import time:\s+\d+ \|\s+(\d+) \| (\S+)$')
+
+
+def import_time(args: list, env: dict) -> int:
+    """Returns total time of top-level imports in microseconds"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + args, cwd=ROOT, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f'`{" ".join(args)}` failed:\n{proc.stderr}')
+    return sum(int(match.group(1)) for match in map(TOP_LEVEL.match, proc.stderr.splitlines()) if match)
+
+
+def measure(args: list, env: dict, runs: int) -> list:
+    """Returns import times of all the runs"""
+    # -- the first run compiles the modules, which is not counted
+    import_time(args, env)
+    return [import_time(args, env) for _ in range(runs)]
+
+
+@click.command()
+@click.option('--runs', '-n', default=5,
+              help=f'Number of runs per target (the best one is checked; at least {RECORD_RUNS} are used by --record)')
+@click.option('--record', is_flag=True, help='Store measured times (with headroom) as new budgets')
+@click.option('--headroom', default=1.5, help='Budget to measured time ratio used with --record')
+@click.option('--budget', 'budget_file', default=BUDGET_FILE, help='Budget file')
+def main(runs: int, record: bool, headroom: float, budget_file: str):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    # -- CLI checks for a running daemon as it would normally do, but never finds one
+    env['RGB_CONVERT_SOCKET'] = os.path.join(tempfile.mkdtemp(), 'none.sock')
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+
+    if record:
+        runs = max(runs, RECORD_RUNS)
+        baseline = statistics.median(measure(['-c', 'pass'], env, runs))
+        results = {name: max(statistics.median(measure(args, env, runs)) - baseline, 0)
+                   for name, args in TARGETS.items()}
+        budgets = {name: max(int(value * headroom), MIN_BUDGET) for name, value in results.items()}
+        with open(budget_file, 'w') as f:
+            json.dump({'unit': 'us', 'budgets': budgets}, f, indent=2)
+            f.write('\n')
+        for name, value in results.items():
+            click.echo(f'{name}: {value / 1000:.1f} ms, budget set to {budgets[name] / 1000:.1f} ms')
+        return
+
+    baseline = min(measure(['-c', 'pass'], env, runs))
+    results = {name: max(min(measure(args, env, runs)) - baseline, 0) for name, args in TARGETS.items()}
+    with open(budget_file) as f:
+        budgets = json.load(f)['budgets']
+    failed = []
+    for name, value in results.items():
+        budget = budgets.get(name)
+        status = 'no budget' if budget is None else 'ok' if value <= budget else 'OVER BUDGET'
+        click.echo(f'{name}: {value / 1000:.1f} ms' +
+                   (f' (budget {budget / 1000:.1f} ms): {status}' if budget is not None else f': {status}'))
+        if budget is not None and value > budget:
+            failed.append(name)
+    if len(failed) > 0:
+        sys.exit(f'Import time budget is exceeded for: {", ".join(failed)}')
+
+
+if __name__ == '__main__':
+    main()
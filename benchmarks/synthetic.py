@@ -0,0 +1,142 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Generator of synthetic schemas and proofs of configurable size for benchmarks.
+
+Schemas define a field type for each `FieldType.Type` supported by proof codecs and the given number of seal types,
+every second of which is a balance. Two proof types are defined: `issue` (root proof with a single value of each
+field) and `transfer` (closing seals of all types, with any number of values of each field). Generated data are
+structured (like the ones read from YAML or JSON files) and deterministic for the given seed."""
+
+import random
+
+from rgbconvert.schema import Schema, FieldType, SealType
+from rgbconvert.proofs import Proof
+
+# Field types without consensus serialization support
+UNSUPPORTED_TYPES = [FieldType.Type.outpoint, FieldType.Type.soutpoint]
+
+FIELD_TYPES = [tp for tp in FieldType.Type if tp not in UNSUPPORTED_TYPES]
+
+PUBKEY = '0262b06cb205c3de54717e0bc0eab2088b0edb9b63fab499f6cac87548ca205be1'
+
+
+def field_name(tp: FieldType.Type) -> str:
+    return f'f_{tp.name}'
+
+
+def seal_name(no: int) -> str:
+    return f'seal_{no}'
+
+
+def schema_data(seal_types: int = 2) -> dict:
+    if seal_types < 1:
+        raise ValueError(f'schema must have at least one seal type; got {seal_types}')
+    # -- ECDSA signatures can be only absent, so their fields are always optional
+    usage = {tp: 'optional' if tp is FieldType.Type.ecdsa else 'single' for tp in FIELD_TYPES}
+    return {
+        'name': 'Synthetic',
+        'schema_ver': '1.0.0',
+        'prev_schema': 0,
+        'field_types': {field_name(tp): tp.name for tp in FIELD_TYPES},
+        'seal_types': {seal_name(no): 'balance' if no % 2 == 0 else 'none' for no in range(seal_types)},
+        'proof_types': [
+            {
+                'name': 'issue',
+                'fields': {field_name(tp): usage[tp] for tp in FIELD_TYPES},
+                'seals': {seal_name(no): 'any' for no in range(seal_types)},
+            },
+            {
+                'name': 'transfer',
+                'unseals': {seal_name(no): 'any' for no in range(seal_types)},
+                'fields': {field_name(tp): 'optional' if tp is FieldType.Type.ecdsa else 'any' for tp in FIELD_TYPES},
+                'seals': {seal_name(no): 'any' for no in range(seal_types)},
+            },
+        ]
+    }
+
+
+def make_schema(seal_types: int = 2) -> Schema:
+    schema = Schema(**schema_data(seal_types))
+    schema.resolve_refs()
+    return schema
+
+
+def field_value(tp: FieldType.Type, rng: random.Random):
+    """Returns random value of the field type in the structured data form"""
+    if tp is FieldType.Type.ecdsa:
+        return None
+    elif tp is FieldType.Type.str:
+        return ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz ') for _ in range(rng.randrange(1, 64)))
+    elif tp is FieldType.Type.bytes:
+        return bytes(rng.getrandbits(8) for _ in range(rng.randrange(1, 64))).hex()
+    elif tp in [FieldType.Type.sha256, FieldType.Type.sha256d]:
+        return bytes(rng.getrandbits(8) for _ in range(32)).hex()
+    elif tp in [FieldType.Type.ripmd160, FieldType.Type.hash160]:
+        return bytes(rng.getrandbits(8) for _ in range(20)).hex()
+    elif tp is FieldType.Type.pubkey:
+        return PUBKEY
+    bits = {
+        FieldType.Type.u8: 8, FieldType.Type.u16: 16, FieldType.Type.u32: 32, FieldType.Type.u64: 64,
+        FieldType.Type.i8: 8, FieldType.Type.i16: 16, FieldType.Type.i32: 32, FieldType.Type.i64: 64,
+        FieldType.Type.vi: 64, FieldType.Type.fvi: 32,
+    }[tp]
+    # -- variable-length ints are spread over all their encoding lengths
+    if tp in [FieldType.Type.vi, FieldType.Type.fvi]:
+        bits = rng.choice([6, 8, 16, bits])
+    value = rng.getrandbits(bits)
+    if tp.name.startswith('i'):
+        value -= 1 << (bits - 1)
+    elif tp is FieldType.Type.fvi:
+        value = min(value, 0xffffffff)
+    return value
+
+
+def proof_data(schema: Schema, type_name: str = 'transfer', seals: int = 10, parents: int = 0, repeat: int = 1,
+               seed: int = 0) -> dict:
+    """Generates structured data of a proof with `seals` seals spread over all seal types of the schema, `parents`
+    parent proof ids (which requires `transfer` proof type) and `repeat` values of each field of `transfer` proofs"""
+    rng = random.Random(seed)
+    data = {'type_name': type_name}
+    if type_name == 'issue':
+        data.update(ver=1, format='root', schema=schema.bech32_id(), network='bitcoin:testnet',
+                    root=f'{bytes(rng.getrandbits(8) for _ in range(32)).hex()}:0')
+        data['fields'] = {field_name(tp): field_value(tp, rng) for tp in FIELD_TYPES}
+    else:
+        data['fields'] = {field_name(tp): [field_value(tp, rng) for _ in range(repeat)]
+                          for tp in FIELD_TYPES if tp is not FieldType.Type.ecdsa}
+
+    # -- seals are grouped by their type, as they are in the consensus serialization
+    data['seals'] = []
+    for no in range(seals):
+        seal_type = schema.seal_types[no * len(schema.seal_types) // seals]
+        seal = {'type_name': seal_type.name}
+        # -- half of the seals reference outputs of the proof own transaction, which have no txid
+        seal['outpoint'] = no if no % 2 == 0 else f'{bytes(rng.getrandbits(8) for _ in range(32)).hex()}:{no}'
+        if seal_type.type is SealType.Type.balance:
+            seal['amount'] = rng.getrandbits(rng.choice([8, 32, 64]))
+        data['seals'].append(seal)
+
+    data['pubkey'] = PUBKEY
+    if parents > 0:
+        if type_name == 'issue':
+            raise ValueError('root proofs can\'t have parents')
+        data['parents'] = [bytes(rng.getrandbits(8) for _ in range(32)).hex() for _ in range(parents)]
+        data['txid'] = bytes(rng.getrandbits(8) for _ in range(32)).hex()
+    return data
+
+
+def make_proof(schema: Schema, **kwargs) -> Proof:
+    """Generates proof resolved against the schema; takes the same arguments as `proof_data`"""
+    return Proof(schema_obj=schema, **proof_data(schema, **kwargs))
@@ -14,29 +14,170 @@
 # along with this software.
 # If not, see <https://opensource.org/licenses/MIT>.
 
+from __future__ import annotations
 
-import re
+import os
 import sys
+
+
+# Commands which are short and keep no state between runs, so they may be forwarded to `serve` daemon: command ->
+# flags telling which of its positional arguments are paths
+FORWARDED_COMMANDS = {
+    'schema-validate': (True,),
+    'schema-transcode': (True, True),
+    'proof-validate': (True,),
+    'proof-transcode': (True, True),
+    'archive-get': (True, False, True),
+    'archive-list': (True,),
+    'seal-lookup': (True, False),
+}
+# Options of the forwarded commands which take a value, and the ones of them which value is a path
+FORWARDED_OPTIONS = {'-f', '--format', '-i', '--input-format', '-o', '--output-format', '-s', '--schema', '--start',
+                     '--stop'}
+FORWARDED_PATH_OPTIONS = {'-s', '--schema'}
+
+
+def forwarded_argv(argv: list):
+    """Returns command line which may be run by `serve` daemon, with relative paths made absolute, or `None` if it
+    must be run locally: commands which are not in `FORWARDED_COMMANDS`, global options and unknown options (incl.
+    `--help`) are not forwarded"""
+    if len(argv) == 0 or argv[0] not in FORWARDED_COMMANDS:
+        return None
+    paths = FORWARDED_COMMANDS[argv[0]]
+    result = [argv[0]]
+    positional = 0
+    args = iter(argv[1:])
+    for arg in args:
+        if arg.startswith('-') and len(arg) > 1:
+            (name, eq, value) = arg.partition('=')
+            if name not in FORWARDED_OPTIONS or (eq and not name.startswith('--')):
+                return None
+            value = value if eq else next(args, None)
+            if value is None:
+                return None
+            result += [name, os.path.abspath(value) if name in FORWARDED_PATH_OPTIONS else value]
+        elif positional < len(paths):
+            result.append(os.path.abspath(arg) if paths[positional] else arg)
+            positional += 1
+        else:
+            return None
+    return result
+
+
+def _forward_to_daemon(argv: list):
+    """Thin client mode: forwards command line to `serve` daemon if one is running, exiting with its results.
+    Runs before the heavy imports below, so forwarded invocations do not pay their cost"""
+    argv = forwarded_argv(argv)
+    if argv is None or os.environ.get('RGB_CONVERT_NO_DAEMON'):
+        return
+    from rgbconvert.daemon import DaemonClient, DaemonError, default_socket_path
+    if not os.path.exists(default_socket_path()):
+        return
+    try:
+        with DaemonClient() as client:
+            response = client.request(command='run', argv=argv)
+    except (DaemonError, OSError):
+        # -- daemon is not available, so the command is run locally
+        return
+    if 'error' in response:
+        sys.exit(f'Daemon error: {response["error"]}')
+    import base64
+    sys.stdout.buffer.write(base64.b64decode(response['stdout']))
+    sys.stdout.flush()
+    sys.stderr.write(response['stderr'])
+    sys.exit(response['status'])
+
+
+if __name__ == "__main__":
+    _forward_to_daemon(sys.argv[1:])
+
+
+import io
+import json
+import time
+import glob
+import itertools
+import signal
+import contextlib
 import logging
 
-import yaml
+from typing import TYPE_CHECKING
+
 import click
 
-from rgbconvert.schema.schema import *
-from rgbconvert.proofs.proof import *
+from rgbconvert import timing, metrics
+
+# Modules of the package and the libraries needed only by some of the commands (`multiprocessing`, `asyncio`,
+# `sqlite3`) are imported by the functions using them, so they do not slow down `--help` and the start of the other
+# commands; annotations are not evaluated, so the classes they refer to are imported for type checkers only
+if TYPE_CHECKING:
+    from rgbconvert.schema.schema import Schema
+    from rgbconvert.proofs.proof import Proof
+    from rgbconvert.result_cache import ResultCache
 
 __author__ = "Dr Maxim Orlovsky <orlovsky@pandoracore.com>"
 
 
+# Compiled schema cache used by `load_shema`, set up by `main`; `None` if disabled with `--no-schema-cache`
+schema_cache = None
+
+# Cache of transcoding and validation results; `None` unless enabled with `--result-cache`
+result_cache = None
+
+
 @click.group()
-def main():
+@click.option('--schema-cache/--no-schema-cache', default=True,
+              help='Use on-disk cache of compiled schemas (enabled by default)')
+@click.option('--schema-cache-dir', help='Directory for compiled schema cache (overrides RGB_CONVERT_CACHE_DIR)')
+@click.option('--interpreted', is_flag=True, help='Use interpreted proof codecs instead of the schema-compiled ones')
+@click.option('--result-cache', 'result_cache_dir',
+              help='Directory for cache of proof transcoding and validation results (disabled by default)')
+@click.option('--result-cache-size', type=int, default=1024, help='Result cache size limit, in megabytes')
+@click.option('--result-cache-link', is_flag=True, help='Hard-link cached output files instead of copying them')
+@click.option('--profile', is_flag=True, help='Report time spent in each processing stage as JSON to stderr')
+@click.option('--profile-output', help='Write processing stage timings as JSON into the file (implies --profile)')
+@click.option('--cprofile', help='Dump cProfile statistics of the whole command into the file (readable by pstats)')
+@click.pass_context
+def main(ctx, **kwargs):
     """
     Simple CLI for working with OpenSeals proof files
     """
-    pass
+    from rgbconvert.result_cache import ResultCache
+    from rgbconvert.schema import compiler
+    from rgbconvert.schema.cache import SchemaCache
+    global schema_cache, result_cache
+    compiler.enabled = not kwargs['interpreted']
+    # -- options are always re-applied, since `serve` daemon runs many commands in the same process
+    schema_cache = SchemaCache(kwargs['schema_cache_dir']) if kwargs['schema_cache'] else None
+    result_cache = ResultCache(kwargs['result_cache_dir'], kwargs['result_cache_size'] << 20,
+                               kwargs['result_cache_link']) if kwargs['result_cache_dir'] is not None else None
+
+    timing.enabled = kwargs['profile'] or kwargs['profile_output'] is not None
+    if timing.enabled:
+        timing.reset()
+        ctx.call_on_close(lambda start=time.perf_counter(): _write_profile(
+            ctx.invoked_subcommand, time.perf_counter() - start, kwargs['profile_output']))
+        # -- resources are released before close callbacks are called, so the report includes the command span
+        ctx.with_resource(timing.span(f'command.{ctx.invoked_subcommand}'))
+    if kwargs['cprofile'] is not None:
+        import cProfile
+        profiler = cProfile.Profile()
+        ctx.call_on_close(lambda: (profiler.disable(), profiler.dump_stats(kwargs['cprofile'])))
+        profiler.enable()
+
+
+def _write_profile(command: str, wall: float, path: str = None):
+    report = {'command': command, 'wall': wall, 'stages': timing.report()}
+    if path is None:
+        click.echo(json.dumps(report, indent=2), err=True)
+    else:
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
 
 
 def guess_format(file: str, kwargs: dict, input_file=True) -> str:
+    from rgbconvert import files
     if 'format' in kwargs:
         format = kwargs['format']
     elif 'input_format' in kwargs and input_file:
@@ -44,47 +185,127 @@ def guess_format(file: str, kwargs: dict, input_file=True) -> str:
     elif 'output_format' in kwargs and not input_file:
         format = kwargs['output_format']
 
-    if format is None:
-        format = "yaml" if re.search("\\.ya?ml$", file.lower()) is not None else "binary"
-    elif format.lower() == "yaml" or format.lower() == "binary":
-        format = format.lower()
-    else:
-        sys.exit("Wrong value for --format or -f argument: accepted values are 'yaml' and 'binary'")
-    return format
+    try:
+        return files.guess_format(file, format)
+    except ValueError:
+        sys.exit(f"Wrong value for --format or -f argument: accepted values are {', '.join(files.FORMATS)}")
 
 
+# Schemas loaded by the process: absolute file path -> (modification time and size of the file, schema). Entries of
+# files which were changed since are replaced, so the daemon keeps a single schema per file
+_loaded_schemas = {}
+
+
+@timing.timed('cli.load_schema')
 def load_shema(file: str) -> Schema:
-    logging.info(f'- loading schema data from `{file}`')
-    with open(file) as f:
-        data = yaml.safe_load(f)
+    path = os.path.abspath(file)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    (loaded, schema) = _loaded_schemas.get(path, (None, None))
+    if loaded == signature:
+        logging.info(f'- using schema from `{file}` which is already loaded')
+        return schema
+    schema = _load_schema_file(file)
+    _loaded_schemas[path] = (signature, schema)
+    return schema
+
+
+def _load_schema_file(file: str) -> Schema:
+    from rgbconvert import files
+    from rgbconvert.schema.schema import Schema
+    format = guess_format(file, {'format': None})
+    logging.info(f'- loading schema data from `{file}` with format `{format}`')
+    with open(file, 'rb') as f:
+        content = f.read()
+
+    # Binary schemas have all internal references serialized as resolved type indexes, so they are not cached
+    if format == 'binary':
+        return Schema.deserialize(content)
+
+    if schema_cache is not None:
+        schema = schema_cache.get(content)
+        if schema is not None:
+            logging.info(f'- using compiled schema from cache `{schema_cache.path}`')
+            return schema
+
+    data = files.load_structure(content, format)
     schema = Schema(**data)
     schema.resolve_refs()
+
+    if schema_cache is not None:
+        try:
+            schema_cache.put(content, schema)
+        except OSError as err:
+            logging.warning(f'- unable to store compiled schema in cache `{schema_cache.path}`: {err}')
     return schema
 
 
+def result_key(infile: str, schema: Schema, operation: str):
+    """Returns result cache key for the operation on the input file, or `None` if result cache is disabled"""
+    if result_cache is None:
+        return None
+    return result_cache.key(infile, schema.bech32_id(), operation)
+
+
+def cached_result(key: str, outfile: str = None):
+    """Returns cached result description, restoring cached output into `outfile`, or `None` on cache miss"""
+    if key is None:
+        return None
+    return result_cache.get(key, outfile)
+
+
+def store_result(key: str, meta: dict, outfile: str = None):
+    if key is None:
+        return
+    try:
+        result_cache.put(key, meta, outfile)
+    except OSError as err:
+        logging.warning(f'- unable to store result in cache `{result_cache.path}`: {err}')
+
+
+def load_proof(file: str, format: str, schema: Schema) -> Proof:
+    from rgbconvert import files
+    logging.info(f'- loading proof data from `{file}` with format `{format}`')
+    return files.load_proof(file, schema, format)
+
+
+def save_proof(proof: Proof, file: str, format: str):
+    """Writes proof into `file` with the given format and returns number of bytes written (or 'n/a' for YAML)"""
+    from rgbconvert import files
+    return files.save_proof(proof, file, format)
+
+
 @main.command()
 @click.argument('file')
 @click.option('--format', '-f')
 def schema_validate(file: str, **kwargs) -> Schema:
     """
     Reads file containing a proof, schema or a proof history and validates its consistency.
-    File can have YAML or binary serialization format. The format is guessed by file extension: YAML files must have
-    .yaml or .yml extension; other file extension are considered to be binary. This can be modified with -t or
-    --filetype command-line option, which can take either 'YAML' or 'binary' values
+    File can have YAML, JSON or binary serialization format. The format is guessed by file extension: YAML files must
+    have .yaml or .yml extension, JSON files .json (or .jsonl for JSON Lines); other file extension are considered to
+    be binary. This can be modified with -f or --format command-line option, which can take 'yaml', 'json', 'jsonl'
+    or 'binary' values
     """
+    from rgbconvert import files
+    from rgbconvert.schema.schema import Schema
     logging.info(f'Validating schema from `{file}`:')
     format = guess_format(file, kwargs)
 
     logging.info(f'- applied format is `{format}`')
     logging.info('- reading data with this format')
-    with open(file) as f:
-        data = yaml.safe_load(f)
+    if format == 'binary':
+        logging.info('- parsing data and resolving internal references')
+        with open(file, 'rb') as f:
+            schema = Schema.deserialize(f.read())
+    else:
+        with open(file) as f:
+            data = files.load_structure(f, format)
 
-    logging.info('- parsing data')
-    schema = Schema(**data)
+        logging.info('- parsing data')
+        schema = Schema(**data)
 
-    logging.info('- resolving internal references')
-    schema.resolve_refs()
+        logging.info('- resolving internal references')
+        schema.resolve_refs()
 
     logging.info('- validating schema')
     schema.validate()
@@ -118,21 +339,43 @@ def schema_transcode(infile: str, outfile: str, **kwargs):
 @click.option('--format', '-f')
 @click.option('--schema', '-s')
 def proof_validate(file: str, **kwargs) -> Schema:
-    """Loads and validates internal structure for a given proof"""
+    """Loads and validates internal structure for a given proof (or for each of the proofs of a JSON Lines file)"""
+    from rgbconvert import files
+    from rgbconvert.proofs.errors import ProofValidationError
     logging.info(f'Validating proof from `{file}`:')
     format = guess_format(file, kwargs)
 
     if 'schema' in kwargs:
         schema = load_shema(kwargs['schema'])
 
-    logging.info(f'- loading proof data from `{file}` with format `{format}`')
-    if format is 'yaml':
-        with open(file, 'r') as f:
-            data = yaml.safe_load(f)
-            proof = Proof(schema_obj=schema, **data)
-    elif format is 'binary':
-        with open(file, 'rb') as f:
-            proof = Proof.stream_deserialize(f, schema_obj=schema)
+    key = result_key(file, schema, f'validate:{format}')
+    verdict = cached_result(key)
+    if verdict is not None:
+        logging.info(f'- using validation result from cache `{result_cache.path}`')
+        for (proof_id, type_name) in verdict['proofs']:
+            logging.info(f'Proof `{proof_id}` of type `{type_name}` is correct')
+        if verdict['error'] is not None:
+            raise ProofValidationError(verdict['error'])
+        return
+
+    if format == 'jsonl':
+        logging.info(f'- loading proof data from `{file}` with format `{format}`')
+        proofs = files.load_proofs(file, schema, format)
+    else:
+        proofs = [load_proof(file, format, schema)]
+
+    # -- only verdicts are cached: errors of other kinds (like malformed input) are not
+    valid = []
+    for proof in proofs:
+        logging.info('- validating proof against schema')
+        try:
+            proof.validate()
+        except ProofValidationError as err:
+            store_result(key, {'proofs': valid, 'error': str(err)})
+            raise
+        valid.append((proof.bech32_id(), proof.type_name))
+        logging.info(f'Proof `{proof.bech32_id()}` of type `{proof.type_name}` is correct')
+    store_result(key, {'proofs': valid, 'error': None})
 
 
 @main.command()
@@ -143,36 +386,754 @@ def proof_validate(file: str, **kwargs) -> Schema:
 @click.option('--output-format', '-o')
 def proof_transcode(infile: str, outfile: str, **kwargs):
     """Transcodes proof file into another format"""
+    from rgbconvert import files
     logging.info(f'Transcoding proof from `{infile}` to `{outfile}`:')
 
     input_format = guess_format(infile, kwargs, input_file=True)
     output_format = guess_format(outfile, kwargs, input_file=False)
-    if input_format is output_format:
+    if input_format == output_format:
         sys.exit(f'Input file format and output formats are the same (`{input_format}`), nothing to transcode')
 
     if 'schema' in kwargs:
         schema = load_shema(kwargs['schema'])
 
-    logging.info(f'- loading proof data from `{infile}` with format `{input_format}`')
-    if input_format is 'yaml':
-        with open(infile, 'r') as f:
-            data = yaml.safe_load(f)
-            proof = Proof(schema_obj=schema, **data)
-    elif input_format is 'binary':
-        with open(infile, 'rb') as f:
-            proof = Proof.stream_deserialize(f, schema_obj=schema)
+    key = result_key(infile, schema, f'transcode:{input_format}:{output_format}')
+    result = cached_result(key, outfile)
+    if result is not None:
+        logging.info(f'- using transcoded proof data from cache `{result_cache.path}`')
 
-    logging.info('- serializing data')
-    if output_format is 'yaml':
-        with open(outfile, 'w') as f:
-            yaml.dump(proof.structure_serialize(), f, default_flow_style=False)
-            pos = 'n/a'
-    elif output_format is 'binary':
-        with open(outfile, 'wb') as f:
-            proof.stream_serialize(f)
-            pos = f.tell()
+    if output_format == 'jsonl':
+        if result is None:
+            # -- JSON Lines output is written as proofs are read, so large inputs are never fully kept in memory
+            logging.info(f'- loading proof data from `{infile}` with format `{input_format}`')
+            result = {'count': files.save_proofs(files.load_proofs(infile, schema, input_format), outfile)}
+            store_result(key, result, outfile)
+        logging.info(f'Proofs from `{infile}` in `{input_format}` format were transcoded into `{outfile}` with '
+                     f'`{output_format}` format\n\t{result["count"]} proofs are written')
+        return
+
+    if result is None:
+        if input_format == 'jsonl':
+            # -- other formats hold a single proof, so JSON Lines files with many of them can't be transcoded into them
+            logging.info(f'- loading proof data from `{infile}` with format `{input_format}`')
+            proofs = list(itertools.islice(files.load_proofs(infile, schema, input_format), 2))
+            if len(proofs) == 0:
+                sys.exit(f'`{infile}` contains no proofs')
+            if len(proofs) > 1:
+                sys.exit(f'`{infile}` contains more than one proof, while `{output_format}` format holds a single one; '
+                         f'transcode it into JSON Lines or pack its proofs into a container with `proof-pack`')
+            proof = proofs[0]
+        else:
+            proof = load_proof(infile, input_format, schema)
+
+        logging.info('- serializing data')
+        result = {'pos': save_proof(proof, outfile, output_format), 'id': proof.bech32_id(), 'type': proof.type_name}
+        store_result(key, result, outfile)
     logging.info(f'Proof `{infile}` in `{input_format}` format was transcoded into `{outfile}` with `{output_format}` '
-                 f'format\n\t{pos} bytes are written and resulting proof hash is {proof.bech32_id()}')
+                 f'format\n\t{result["pos"]} bytes are written and resulting proof hash is {result["id"]}')
+
+
+# Schema loaded once per batch worker process by `_init_batch_worker`
+_batch_schema = None
+
+# Whether batch items are transcoded by a separate worker process, which sends its metrics and stage timings back
+# with the results
+_batch_process = False
+
+# Error raised by `_init_batch_worker`, which is reported for each item instead of failing the worker process (since
+# `multiprocessing.Pool` would restart the failed worker endlessly)
+_batch_error = None
+
+
+def _init_batch_worker(schema_file: str, cache_path: str, results: ResultCache, profile: bool = None):
+    from rgbconvert.schema.cache import SchemaCache
+    global _batch_schema, _batch_process, _batch_error, schema_cache, result_cache
+    if profile is not None:
+        # -- counters and timings inherited from the parent process on fork are dropped, so they are not reported twice
+        _batch_process = True
+        timing.enabled = profile
+        timing.reset()
+        metrics.reset()
+    schema_cache = SchemaCache(cache_path) if cache_path is not None else None
+    result_cache = results
+    try:
+        _batch_schema = load_shema(schema_file)
+        _batch_error = None
+    except KeyboardInterrupt:
+        raise
+    except BaseException as ex:
+        _batch_error = f'unable to load schema `{schema_file}`: {type(ex).__name__}: {ex}'
+
+
+def _transcode_batch_item(job: tuple) -> tuple:
+    """Transcodes a single proof inside a batch worker. Returns tuple of input file name, result dict with number
+    of bytes written (`pos`) and proof type name (`type`), error description, which is `None` for successfully
+    transcoded proofs, and metrics and stage timings collected by the worker process since the previous item (or
+    `None` if the item is transcoded by the main process)"""
+    (infile, outfile, input_format, output_format) = job
+    (result, err) = (None, _batch_error)
+    if err is None:
+        try:
+            key = result_key(infile, _batch_schema, f'transcode:{input_format}:{output_format}')
+            result = cached_result(key, outfile)
+            if result is None:
+                proof = load_proof(infile, input_format, _batch_schema)
+                # -- proof type is reported for the incremental mode manifest
+                result = {'pos': save_proof(proof, outfile, output_format), 'type': proof.type_name}
+                if key is not None:
+                    # -- proof id is stored for `proof-transcode`, which reports it
+                    result['id'] = proof.bech32_id()
+                    store_result(key, result, outfile)
+        except KeyboardInterrupt:
+            raise
+        except BaseException as ex:
+            err = f'{type(ex).__name__}: {ex}'
+    stats = None
+    if _batch_process:
+        stats = {'metrics': metrics.snapshot(), 'stages': timing.report()}
+        metrics.reset()
+        timing.reset()
+    return infile, result, err, stats
+
+
+def batch_input_files(source: str) -> list:
+    """Lists proof files from a directory (non-recursively, skipping hidden files) or a glob pattern"""
+    if os.path.isdir(source):
+        names = [os.path.join(source, name) for name in os.listdir(source) if not name.startswith('.')]
+    else:
+        names = glob.glob(source)
+    return sorted(name for name in names if os.path.isfile(name))
+
+
+# Name of the manifest file kept in the output directory by the incremental mode of `proof-transcode-batch`
+BATCH_MANIFEST = '.rgb-convert-manifest.json'
+
+
+@main.command()
+@click.argument('source')
+@click.argument('outdir')
+@click.option('--schema', '-s', required=True)
+@click.option('--input-format', '-i')
+@click.option('--output-format', '-o')
+@click.option('--jobs', '-j', type=int, default=None, help='Number of worker processes (defaults to CPU count)')
+@click.option('--chunk-size', '-c', type=int, default=None,
+              help='Number of proofs sent to a worker at once (defaults to an even split between workers)')
+@click.option('--metrics', 'metrics_file', help='File to write operational metrics to (Prometheus text or .json)')
+@click.option('--metrics-interval', type=float, default=15.0, help='Interval between metrics file updates, seconds')
+@click.option('--incremental', is_flag=True,
+              help=f'Transcode only proofs which were changed since the previous run (or which proof types were '
+                   f'changed by the schema), according to `{BATCH_MANIFEST}` manifest kept in OUTDIR')
+@click.option('--watch', is_flag=True,
+              help='Keep running, transcoding proofs each time SOURCE or schema are changed (implies --incremental)')
+@click.option('--interval', type=float, default=1.0,
+              help='Interval between checks for changes in --watch mode on systems without inotify, seconds')
+def proof_transcode_batch(source: str, outdir: str, **kwargs):
+    """
+    Transcodes all proof files from SOURCE directory or glob pattern into OUTDIR directory.
+    Each worker process loads the schema once and then transcodes its share of proofs; files which fail to transcode
+    are reported without stopping the batch. If no output format is given, proofs in structured formats (YAML, JSON)
+    are transcoded into binary and binary proofs into YAML.
+    """
+    if not kwargs['watch']:
+        if _transcode_batch(source, outdir, kwargs) > 0:
+            sys.exit(1)
+        return
+
+    from rgbconvert.incremental import Watcher
+    kwargs['incremental'] = True
+    dirs = {os.path.dirname(os.path.abspath(kwargs['schema']))}
+    if os.path.isdir(source):
+        dirs.add(os.path.abspath(source))
+    else:
+        dirs.update(os.path.dirname(os.path.abspath(infile)) for infile in batch_input_files(source))
+    watcher = Watcher(sorted(dirs), lambda: _batch_snapshot(source, kwargs['schema']), kwargs['interval'])
+    try:
+        while True:
+            try:
+                _transcode_batch(source, outdir, kwargs)
+            except Exception as err:
+                # -- like a broken schema being edited; it is reported and retried on the next change
+                logging.error(f'Transcoding failed: {err}')
+            logging.info(f'Watching `{source}` and `{kwargs["schema"]}` for changes...')
+            watcher.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+
+
+def _batch_snapshot(source: str, schema_file: str) -> dict:
+    """Stat signatures of batch input files and schema, which are compared by `--watch` mode to detect changes"""
+    snapshot = {}
+    for path in batch_input_files(source) + [schema_file]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+    return snapshot
+
+
+def _transcode_batch(source: str, outdir: str, kwargs: dict) -> int:
+    """Transcodes proofs for `proof-transcode-batch` (once per change in `--watch` mode); returns number of failed
+    proofs"""
+    from rgbconvert import files
+    infiles = batch_input_files(source)
+    if len(infiles) == 0:
+        if kwargs['watch']:
+            logging.warning(f'No proof files found at `{source}`')
+            return 0
+        sys.exit(f'No proof files found at `{source}`')
+    os.makedirs(outdir, exist_ok=True)
+
+    jobs = []
+    for infile in infiles:
+        input_format = guess_format(infile, kwargs, input_file=True)
+        if kwargs['output_format'] is not None:
+            output_format = guess_format(infile, kwargs, input_file=False)
+        else:
+            output_format = 'binary' if input_format in files.STRUCTURED_FORMATS else 'yaml'
+        if input_format == output_format:
+            sys.exit(f'Input file format and output formats are the same (`{input_format}`), nothing to transcode')
+        ext = files.FORMAT_EXTENSIONS[output_format]
+        outfile = os.path.join(outdir, os.path.splitext(os.path.basename(infile))[0] + ext)
+        jobs.append((infile, outfile, input_format, output_format))
+
+    # -- schema is loaded by the main process first, so it is not left to fail in each of the workers
+    try:
+        schema = load_shema(kwargs['schema'])
+    except Exception as err:
+        if kwargs['watch']:
+            raise
+        sys.exit(f'Unable to load schema `{kwargs["schema"]}`: {type(err).__name__}: {err}')
+
+    manifest = None
+    if kwargs['incremental']:
+        from rgbconvert.incremental import Manifest, proof_type_digests
+        (schema_id, digests) = (schema.bech32_id(), proof_type_digests(schema))
+        manifest = Manifest(os.path.join(outdir, BATCH_MANIFEST))
+        # -- manifest is keyed by absolute paths, so it does not depend on the working directory
+        manifest.prune(os.path.abspath(infile) for infile in infiles)
+        states = {}
+        for (infile, outfile, input_format, output_format) in jobs:
+            state = manifest.check(os.path.abspath(infile), os.path.abspath(outfile),
+                                   f'{input_format}:{output_format}', schema_id, digests)
+            if state is not None:
+                states[infile] = state
+        if len(states) < len(jobs):
+            logging.info(f'{len(jobs) - len(states)} of {len(jobs)} proofs are up to date')
+        jobs = [job for job in jobs if job[0] in states]
+        if len(jobs) == 0:
+            manifest.save()
+            return 0
+    outputs = {job[0]: job for job in jobs}
+
+    workers = kwargs['jobs'] or os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    chunk_size = kwargs['chunk_size']
+    if chunk_size is None:
+        chunk_size, extra = divmod(len(jobs), workers * 4)
+        chunk_size += 1 if extra else 0
+    logging.info(f'Transcoding {len(jobs)} proofs from `{source}` to `{outdir}` with {workers} worker(s), '
+                 f'{chunk_size} proof(s) per chunk:')
+    initargs = (kwargs['schema'], schema_cache.path if schema_cache is not None else None, result_cache)
+    if workers == 1:
+        _init_batch_worker(*initargs)
+        results = map(_transcode_batch_item, jobs)
+        pool = None
+    else:
+        import multiprocessing
+        pool = multiprocessing.Pool(workers, initializer=_init_batch_worker, initargs=initargs + (timing.enabled,))
+        results = pool.imap_unordered(_transcode_batch_item, jobs, chunksize=chunk_size)
+
+    flusher = metrics.Flusher(kwargs['metrics_file'], kwargs['metrics_interval']) if kwargs['metrics_file'] else None
+    failed = 0
+    try:
+        for (infile, result, err, stats) in results:
+            if stats is not None:
+                metrics.merge(stats['metrics'])
+                timing.merge(stats['stages'])
+            if err is not None:
+                failed += 1
+                logging.error(f'- `{infile}` failed: {err}')
+                if manifest is not None:
+                    manifest.discard(os.path.abspath(infile))
+            else:
+                logging.debug(f'- `{infile}` transcoded, {result["pos"]} bytes written')
+                if manifest is not None:
+                    (_, outfile, input_format, output_format) = outputs[infile]
+                    manifest.update(os.path.abspath(infile), states[infile], os.path.abspath(outfile),
+                                    f'{input_format}:{output_format}', schema_id, result.get('type'), digests)
+            if flusher is not None:
+                flusher.maybe_flush()
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if flusher is not None:
+            flusher.flush()
+        if manifest is not None:
+            # -- saved even if the batch is interrupted, so the proofs transcoded so far are not redone
+            manifest.save()
+
+    logging.info(f'{len(jobs) - failed} of {len(jobs)} proofs were transcoded, {failed} failed')
+    return failed
+
+
+def _file_magic(path: str, magic: bytes) -> bool:
+    """Checks whether `path` is a file starting with `magic` bytes"""
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as f:
+        return f.read(len(magic)) == magic
+
+
+def _read_packed_proofs(infile: str, format: str, schema: Schema):
+    """Reads proof file for packing into container or archive, yielding consensus-serialized data of its proofs
+    (JSON Lines files may contain many of them)"""
+    from rgbconvert import files
+    from rgbconvert.proofs.proof import Proof
+    if format == 'binary':
+        # -- binary proofs are packed as they are, but they still must be valid
+        with open(infile, 'rb') as f:
+            data = f.read()
+        Proof.from_buffer(data, schema_obj=schema)
+        yield data
+        return
+    for proof in files.load_proofs(infile, schema, format):
+        yield proof.serialize()
+
+
+@main.command()
+@click.argument('source')
+@click.argument('container')
+@click.option('--schema', '-s', required=True)
+@click.option('--input-format', '-i')
+def proof_pack(source: str, container: str, **kwargs):
+    """
+    Packs all proof files from SOURCE directory or glob pattern into CONTAINER file, appending them if the container
+    already exists. Binary proofs are packed as they are; proofs in structured formats are serialized with the schema
+    first.
+    """
+    from rgbconvert.container import ContainerWriter
+    infiles = batch_input_files(source)
+    if len(infiles) == 0:
+        sys.exit(f'No proof files found at `{source}`')
+    schema = load_shema(kwargs['schema'])
+    logging.info(f'Packing {len(infiles)} proof files from `{source}` into `{container}`:')
+
+    (packed, failed) = (0, 0)
+    with ContainerWriter.open(container, schema) as writer:
+        for infile in infiles:
+            format = guess_format(infile, kwargs, input_file=True)
+            try:
+                for data in _read_packed_proofs(infile, format, schema):
+                    proof_id = writer.append_raw(data)
+                    packed += 1
+                    logging.debug(f'- proof from `{infile}` packed as {proof_id}')
+            except KeyboardInterrupt:
+                raise
+            except BaseException as ex:
+                failed += 1
+                logging.error(f'- `{infile}` failed: {type(ex).__name__}: {ex}')
+        pos = writer.f.tell()
+
+    logging.info(f'{packed} proofs from {len(infiles) - failed} of {len(infiles)} files were packed, {failed} files '
+                 f'failed; container size is {pos} bytes')
+    if failed > 0:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('container')
+@click.argument('outdir')
+@click.option('--schema', '-s')
+@click.option('--output-format', '-o')
+def proof_unpack(container: str, outdir: str, **kwargs):
+    """
+    Unpacks proofs from CONTAINER file into OUTDIR directory, one file per proof named after the proof id. Proofs are
+    unpacked in binary format unless a structured `--output-format` (yaml, json) is given, which requires the schema.
+    """
+    import bitcoin.segwit_addr as bech32
+    from rgbconvert import files
+    from rgbconvert.container import ContainerReader
+    from rgbconvert.proofs.proof import Proof
+    output_format = guess_format('.bin', {'format': kwargs['output_format']})
+    schema = load_shema(kwargs['schema']) if kwargs['schema'] is not None else None
+    if output_format in files.STRUCTURED_FORMATS and schema is None:
+        sys.exit(f'Unpacking proofs into {output_format.upper()} format requires schema (--schema or -s argument)')
+    os.makedirs(outdir, exist_ok=True)
+    logging.info(f'Unpacking proofs from `{container}` to `{outdir}`:')
+
+    count = 0
+    with open(container, 'rb') as f:
+        reader = ContainerReader(f, schema_obj=schema)
+        for (proof_id, data) in reader.frames():
+            name = bech32.encode('pf', 1, proof_id.bytes) + files.FORMAT_EXTENSIONS[output_format]
+            if output_format == 'binary':
+                with open(os.path.join(outdir, name), 'wb') as out:
+                    out.write(data)
+            else:
+                (proof, _) = Proof.from_buffer(data, schema_obj=schema)
+                save_proof(proof, os.path.join(outdir, name), output_format)
+            count += 1
+
+    logging.info(f'{count} proofs were unpacked')
+
+
+@main.command()
+@click.argument('source')
+@click.argument('archive')
+@click.option('--schema', '-s', required=True)
+@click.option('--input-format', '-i')
+def archive_build(source: str, archive: str, **kwargs):
+    """
+    Builds proof ARCHIVE indexed by proof ids from a proof container file or from all proof files in SOURCE
+    directory, glob pattern or JSON Lines file. Existing archive file is overwritten.
+    """
+    from rgbconvert.archive import ArchiveWriter
+    from rgbconvert.container import Container, ContainerReader
+    schema = load_shema(kwargs['schema'])
+    logging.info(f'Building proof archive `{archive}` from `{source}`:')
+
+    (total, failed) = (0, 0)
+    with ArchiveWriter(archive, schema) as writer:
+        if _file_magic(source, Container.MAGIC):
+            with open(source, 'rb') as f:
+                for (_, data) in ContainerReader(f, schema_obj=schema).frames():
+                    writer.append_raw(data)
+                    total += 1
+        else:
+            infiles = batch_input_files(source)
+            if len(infiles) == 0:
+                sys.exit(f'No proof files found at `{source}`')
+            for infile in infiles:
+                try:
+                    for data in _read_packed_proofs(infile, guess_format(infile, kwargs, input_file=True), schema):
+                        writer.append_raw(data)
+                        total += 1
+                except KeyboardInterrupt:
+                    raise
+                except BaseException as ex:
+                    failed += 1
+                    logging.error(f'- `{infile}` failed: {type(ex).__name__}: {ex}')
+        count = len(writer.entries)
+
+    logging.info(f'{count} unique proofs out of {total} were archived, {failed} files failed')
+    if failed > 0:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('archive')
+@click.argument('proof_id')
+@click.argument('outfile', required=False)
+@click.option('--schema', '-s')
+@click.option('--output-format', '-o')
+def archive_get(archive: str, proof_id: str, outfile: str, **kwargs):
+    """
+    Extracts proof with PROOF_ID (Bech32 `pf1...` or hex string) from ARCHIVE into OUTFILE; without OUTFILE prints
+    the proof in YAML (or the given `--output-format`) format. Structured formats require the schema.
+    """
+    from rgbconvert import files
+    from rgbconvert.archive import ArchiveReader
+    from rgbconvert.proofs.proof import Proof
+    schema = load_shema(kwargs['schema']) if kwargs['schema'] is not None else None
+    format = guess_format(outfile if outfile is not None else 'stdout.yaml', kwargs, input_file=False)
+    if format in files.STRUCTURED_FORMATS and schema is None:
+        sys.exit(f'Extracting proofs in {format.upper()} format requires schema (--schema or -s argument)')
+
+    with ArchiveReader(archive, schema_obj=schema) as reader:
+        data = reader.get_raw(proof_id)
+        if data is None:
+            sys.exit(f'Proof `{proof_id}` is not found in `{archive}`')
+        # -- the view must be released before the archive is closed, even if writing the proof fails
+        try:
+            if format == 'binary' and outfile is None:
+                sys.stdout.buffer.write(data)
+            elif format == 'binary':
+                with open(outfile, 'wb') as f:
+                    f.write(data)
+            else:
+                (proof, _) = Proof.from_buffer(bytes(data), schema_obj=schema)
+                if outfile is not None:
+                    save_proof(proof, outfile, format)
+                else:
+                    files.dump_structure(proof.structure_serialize(), sys.stdout, format)
+        finally:
+            data.release()
+
+
+@main.command()
+@click.argument('archive')
+@click.option('--start', help='First proof id of the range (inclusive)')
+@click.option('--stop', help='Last proof id of the range (exclusive)')
+def archive_list(archive: str, **kwargs):
+    """Lists ids of proofs stored in ARCHIVE in ascending order, optionally limited to a range of ids"""
+    import bitcoin.segwit_addr as bech32
+    from rgbconvert.archive import ArchiveReader
+    with ArchiveReader(archive) as reader:
+        for proof_id in reader.ids(kwargs['start'], kwargs['stop']):
+            click.echo(bech32.encode('pf', 1, proof_id.bytes))
+
+
+def load_spent(path: str) -> dict:
+    """Reads JSON file mapping proof ids (Bech32 or hex) to lists of outpoints (`txid:vout`) of the seals closed by
+    the proofs; returns it keyed by raw proof ids, or `None` if no file is given"""
+    if path is None:
+        return None
+    from rgbconvert.data_types import Hash256Id, OutPoint
+    with open(path, 'r') as f:
+        data = json.load(f)
+    try:
+        return {Hash256Id(proof_id).bytes: [OutPoint(outpoint) for outpoint in outpoints]
+                for (proof_id, outpoints) in data.items()}
+    except (ValueError, TypeError, AttributeError) as err:
+        sys.exit(f'Malformed spent outpoints file `{path}`: {err}')
+
+
+def source_proofs(source: str, schema: Schema, kwargs: dict):
+    """Iterates over proofs from a proof container, proof archive, directory or glob pattern of proof files (including
+    JSON Lines files, which are read line by line)"""
+    from rgbconvert import files
+    from rgbconvert.archive import Archive, ArchiveReader
+    from rgbconvert.container import Container, ContainerReader
+    if os.path.isfile(source):
+        with open(source, 'rb') as f:
+            magic = f.read(len(Container.MAGIC))
+        if magic == Container.MAGIC:
+            with open(source, 'rb') as f:
+                yield from ContainerReader(f, schema_obj=schema)
+            return
+        elif magic == Archive.MAGIC:
+            with ArchiveReader(source, schema_obj=schema) as reader:
+                # -- proofs are decoded from copies of their data, so they may outlive the archive
+                for (_, proof) in reader.items():
+                    yield proof
+            return
+    infiles = batch_input_files(source)
+    if len(infiles) == 0:
+        sys.exit(f'No proof files found at `{source}`')
+    for infile in infiles:
+        yield from files.load_proofs(infile, schema, guess_format(infile, kwargs, input_file=True))
+
+
+@main.command()
+@click.argument('source')
+@click.option('--output', '-o', help='File to write the table to (standard output by default)')
+@click.option('--format', '-f', type=click.Choice(['csv', 'jsonl']),
+              help='Table format; guessed by the output file extension, CSV by default')
+def proof_scan(source: str, **kwargs):
+    """
+    Reads only headers of the binary proofs from SOURCE (proof container, proof archive, directory or glob pattern of
+    proof files) and writes a table of their paths, ids, formats, versions, schema ids, networks, root outpoints and
+    proof type numbers. No schema is needed; files in structured formats are skipped.
+    """
+    from rgbconvert import files, scan
+    infiles = batch_input_files(source)
+    binary = [infile for infile in infiles if files.guess_format(infile) == 'binary']
+    if len(binary) == 0:
+        sys.exit(f'No binary proof files found at `{source}`')
+    if len(binary) < len(infiles):
+        logging.warning(f'- {len(infiles) - len(binary)} file(s) in structured formats were skipped')
+    output = kwargs['output']
+    format = kwargs['format']
+    if format is None:
+        format = 'jsonl' if output is not None and files.guess_format(output) == 'jsonl' else 'csv'
+
+    (count, failed) = (0, 0)
+    out = open(output, 'w', newline='') if output is not None else sys.stdout
+    try:
+        if format == 'csv':
+            import csv
+            writer = csv.DictWriter(out, scan.COLUMNS)
+            writer.writeheader()
+            write = writer.writerow
+        else:
+            write = lambda row: out.write(json.dumps(row) + '\n')
+        for header in scan.scan(binary):
+            if header['error'] is not None:
+                failed += 1
+                logging.error(f'- `{header["path"]}` failed: {header["error"]}')
+            else:
+                count += 1
+            write(scan.header_row(header))
+    finally:
+        if output is not None:
+            out.close()
+
+    logging.info(f'{count} proof headers were scanned from {len(binary)} files, {failed} files failed')
+    if failed > 0:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('source')
+@click.option('--schema', '-s', required=True)
+@click.option('--input-format', '-i')
+@click.option('--spent', 'spent_file', help='JSON file mapping proof ids to the outpoints of the seals they close')
+def history_validate(source: str, **kwargs):
+    """
+    Validates proof history from SOURCE, which can be a proof container, proof archive, directory or glob pattern of
+    proof files. Proofs are validated in topological order once all their parents are known. Balances are checked
+    against the seals closed by each proof if their outpoints are given with --spent option, otherwise only against
+    the total balance of the proof parents.
+    """
+    import bitcoin.segwit_addr as bech32
+    from rgbconvert.history import History
+    schema = load_shema(kwargs['schema'])
+    spent = load_spent(kwargs['spent_file'])
+    logging.info(f'Validating proof history from `{source}`:')
+
+    history = History(schema)
+    for proof in source_proofs(source, schema, kwargs):
+        for node in history.add(proof, spent.get(proof.GetHash()) if spent is not None else None):
+            if node.error is not None:
+                logging.error(f'- proof `{bech32.encode("pf", 1, node.id)}` is invalid: {node.error}')
+
+    invalid = len(history.invalid())
+    pending = len(history.pending())
+    logging.info(f'{len(history)} proofs processed: {len(history.order) - invalid} valid, {invalid} invalid, '
+                 f'{pending} pending with {len(history.missing())} unknown parent proof(s)')
+    if invalid > 0:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('source')
+@click.argument('index')
+@click.option('--schema', '-s', required=True)
+@click.option('--input-format', '-i')
+@click.option('--bulk', is_flag=True, help='Use bulk-load mode for the initial indexing of large amounts of proofs')
+@click.option('--spent', 'spent_file', help='JSON file mapping proof ids to the outpoints of the seals they close')
+def seal_index(source: str, index: str, **kwargs):
+    """
+    Adds seals defined and closed by proofs from SOURCE (proof container, proof archive, directory or glob pattern of
+    proof files) to the seal INDEX database, creating it if needed, and reports double spends. Proofs do not contain
+    the outpoints they spend, so seals closed by the proofs are known only from --spent file.
+    """
+    import bitcoin.segwit_addr as bech32
+    from rgbconvert.seal_index import SealIndex
+    schema = load_shema(kwargs['schema'])
+    spent = load_spent(kwargs['spent_file'])
+    logging.info(f'Indexing seals from `{source}` into `{index}`:')
+
+    with SealIndex(index) as db:
+        if kwargs['bulk']:
+            with db.bulk():
+                count = db.extend(source_proofs(source, schema, kwargs), spent)
+        else:
+            count = db.extend(source_proofs(source, schema, kwargs), spent)
+        if db.skipped > 0:
+            logging.warning(f'- {db.skipped} seal(s) were not indexed since their proofs have no txid')
+        if db.unknown > 0:
+            logging.warning(f'- seals closed by {db.unknown} proof(s) are unknown since their spent outpoints were '
+                            f'not given, so their double spends are not detected')
+        conflicts = 0
+        for (outpoint, proofs) in db.double_spends():
+            conflicts += 1
+            logging.error(f'- seal `{outpoint.structure_serialize()}` is closed by several proofs: '
+                          f'{", ".join(bech32.encode("pf", 1, proof.bytes) for proof in proofs)}')
+
+    logging.info(f'{count} proofs were indexed, {conflicts} double spend(s) found')
+    if conflicts > 0:
+        sys.exit(1)
+
+
+@main.command()
+@click.argument('index')
+@click.argument('outpoint')
+def seal_lookup(index: str, outpoint: str):
+    """Prints proofs defining and closing seal with OUTPOINT (`txid:vout`) according to the seal INDEX database"""
+    import bitcoin.segwit_addr as bech32
+    from rgbconvert.seal_index import SealIndex
+    with SealIndex(index) as db:
+        for (title, proofs) in [('created_by', db.created_by(outpoint)), ('closed_by', db.closed_by(outpoint))]:
+            click.echo(f'{title}:')
+            for proof in proofs:
+                click.echo(f'  - {bech32.encode("pf", 1, proof.bytes)}')
+
+
+def _run_forwarded(request: dict) -> dict:
+    """Runs command line forwarded by a thin client inside `serve` daemon, capturing its output and exit status.
+    Standard output may be binary (e.g. `archive-get -o binary`), so it is returned encoded with Base64"""
+    if request.get('command') != 'run':
+        raise ValueError(f'unknown daemon command `{request.get("command")}`')
+    argv = list(request['argv'])
+    # -- commands run in the daemon process, which is shared by all clients, so its working directory can't be
+    # changed for them: only the commands which paths were made absolute by the client are accepted
+    if forwarded_argv(argv) != argv:
+        raise ValueError(f'command line `{" ".join(argv)}` can\'t be run inside the daemon; only '
+                         f'{", ".join(FORWARDED_COMMANDS)} commands with absolute paths are accepted')
+
+    import base64
+    (stdout, stderr) = (io.TextIOWrapper(io.BytesIO(), encoding='utf-8', write_through=True), io.StringIO())
+    handlers = [handler for handler in logging.getLogger().handlers if isinstance(handler, logging.StreamHandler)]
+    streams = [handler.setStream(stderr) for handler in handlers]
+    try:
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                main.main(args=argv, prog_name='rgb-convert.py', standalone_mode=False)
+                status = 0
+            except click.exceptions.Exit as ex:
+                status = ex.exit_code
+            except click.ClickException as ex:
+                ex.show()
+                status = ex.exit_code
+            except click.Abort:
+                status = 1
+            except SystemExit as ex:
+                if isinstance(ex.code, str):
+                    print(ex.code, file=sys.stderr)
+                status = ex.code if isinstance(ex.code, int) else 0 if ex.code is None else 1
+            except Exception as ex:
+                logging.error(f'{type(ex).__name__}: {ex}')
+                status = 1
+    finally:
+        for (handler, stream) in zip(handlers, streams):
+            handler.setStream(stream)
+    stdout.flush()
+    return {'status': status, 'stdout': base64.b64encode(stdout.buffer.getvalue()).decode('ascii'),
+            'stderr': stderr.getvalue()}
+
+
+@main.command()
+@click.option('--socket', 'path', help='Unix socket path (overrides RGB_CONVERT_SOCKET)')
+@click.option('--schema', '-s', multiple=True, help='Schema to be loaded in advance; may be given many times')
+@click.option('--metrics', 'metrics_file', help='File to write operational metrics to (Prometheus text or .json)')
+@click.option('--metrics-interval', type=float, default=15.0, help='Interval between metrics file updates, seconds')
+def serve(path: str, **kwargs):
+    """Runs daemon serving commands forwarded by other invocations of this tool over a Unix socket, keeping
+    libraries and schemas loaded in memory"""
+    import asyncio
+    from rgbconvert.daemon import DaemonServer, DaemonError
+    for schema in kwargs['schema']:
+        load_shema(schema)
+    server = DaemonServer(_run_forwarded, path)
+    flusher = metrics.Flusher(kwargs['metrics_file'], kwargs['metrics_interval']) if kwargs['metrics_file'] else None
+
+    async def run():
+        if flusher is None:
+            return await server.serve_forever()
+        task = asyncio.ensure_future(flusher.run())
+        try:
+            await server.serve_forever()
+        finally:
+            task.cancel()
+
+    logging.info(f'Serving on `{server.path}`; press Ctrl-C to stop')
+    # -- on termination the socket file must be removed as well
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    except DaemonError as err:
+        sys.exit(str(err))
+    finally:
+        server.close()
+        if flusher is not None:
+            flusher.flush()
 
 
 if __name__ == "__main__":
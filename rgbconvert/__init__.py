@@ -12,9 +12,50 @@
 # along with this software.
 # If not, see <https://opensource.org/licenses/MIT>.
 
-from .data_types import SemVer, Hash256Id
-from .parser import *
-from .proofs import *
-from .schema import *
+"""Public API of the package is loaded lazily: submodules (and the libraries they depend on) are imported on the first
+access to any of the names they export, so `import rgbconvert` itself is cheap. This relies on module `__getattr__`
+(PEP 562), so the package requires Python 3.7 or later"""
+
+import importlib
 
 __version__ = "0.1.0"
+
+# Submodule -> names it exports through the package
+_EXPORTS = {
+    'data_types': ['SemVer', 'Hash256Id'],
+    'parser': ['FieldEnum', 'FieldParser', 'FieldParseError', 'StructureSerializable'],
+    'proofs': ['ProofValidationError', 'MetaField', 'Seal', 'Proof', 'LazyProof', 'InternPool', 'CompactProof'],
+    'schema': ['SchemaError', 'SchemaInternalRefError', 'SchemaValidationError', 'FieldType', 'ProofType',
+               'SealType', 'TypeRef', 'Schema', 'SchemaCache'],
+    'container': ['ContainerError', 'Container', 'ContainerReader', 'ContainerWriter'],
+    'archive': ['ArchiveError', 'Archive', 'ArchiveReader', 'ArchiveWriter'],
+    'history': ['HistoryNode', 'History'],
+    'seal_index': ['SealIndex'],
+    'result_cache': ['ResultCache'],
+    'files': ['guess_format', 'load_schema', 'load_proof', 'load_proofs', 'save_proof', 'save_proofs'],
+    'aio': ['aload_schema', 'aread_proof', 'aread_proofs', 'awrite_proof', 'atranscode_proofs'],
+}
+
+_MODULES = {name: module for module, names in _EXPORTS.items() for name in names}
+
+_SUBMODULES = ['consensus', 'daemon', 'incremental', 'metrics', 'scan', 'timing'] + list(_EXPORTS.keys())
+
+
+def __getattr__(name: str):
+    if name in _MODULES:
+        value = getattr(importlib.import_module(f'.{_MODULES[name]}', __name__), name)
+    elif name in _SUBMODULES:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module `{__name__}` has no attribute `{name}`')
+    # -- following accesses do not go through `__getattr__`
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals().keys()) | set(_MODULES.keys()) | set(_SUBMODULES))
+
+
+# Submodules are exported as well, like they were when the package imported all of them eagerly
+__all__ = list(_MODULES.keys()) + _SUBMODULES
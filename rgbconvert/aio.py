@@ -0,0 +1,136 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""asyncio API for reading, writing and transcoding proof files.
+
+Blocking file I/O and proof decoding/encoding run in an executor (the loop default thread pool unless another one is
+given), so the event loop is never blocked by them. The number of files being processed at the same time is bounded
+by `concurrency`: `aread_proofs` does not start reading the next file until the consumer has taken a proof, which
+provides backpressure for slow consumers, and `awrite_proof` calls may share an `asyncio.Semaphore` limiting the
+number of concurrent writes."""
+
+import asyncio
+from collections import deque
+from functools import partial
+
+from .schema.schema import Schema
+from .proofs.proof import Proof
+from . import files
+
+DEFAULT_CONCURRENCY = 8
+
+
+async def aload_schema(path: str, cache=None, executor=None) -> Schema:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, files.load_schema, path, cache)
+
+
+async def aread_proof(path: str, schema: Schema, format: str = None, executor=None) -> Proof:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, files.load_proof, path, schema, format)
+
+
+async def aread_proofs(paths, schema: Schema, format: str = None, concurrency: int = DEFAULT_CONCURRENCY,
+                       executor=None, ordered: bool = True, return_exceptions: bool = False):
+    """Asynchronously iterates over proofs read from the files with the given `paths` (any iterable, which is
+    consumed gradually). No more than `concurrency` files are read at the same time. Proofs are yielded in the order
+    of `paths` if `ordered` is set, or in the order they are read otherwise.
+
+    Reading errors are raised from the iterator, cancelling all pending reads, unless `return_exceptions` is set, in
+    which case the exception is yielded in place of the proof which failed to be read."""
+    if concurrency < 1:
+        raise ValueError(f'`concurrency` must be a positive number; got `{concurrency}` instead')
+    loop = asyncio.get_running_loop()
+    paths = iter(paths)
+    pending = deque()
+
+    def schedule():
+        while len(pending) < concurrency:
+            path = next(paths, None)
+            if path is None:
+                return
+            pending.append(loop.run_in_executor(executor, files.load_proof, path, schema, format))
+
+    try:
+        schedule()
+        while len(pending) > 0:
+            if ordered:
+                future = pending.popleft()
+                await asyncio.wait([future])
+            else:
+                (done, _) = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                future = done.pop()
+                pending.remove(future)
+            if future.exception() is not None and not return_exceptions:
+                raise future.exception()
+            result = future.exception() or future.result()
+            # -- the slot is freed only once the consumer asks for the next proof
+            yield result
+            schedule()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def awrite_proof(proof: Proof, path: str, format: str = None, executor=None,
+                       limit: asyncio.Semaphore = None):
+    """Writes proof into file with the given format, returning number of bytes written (or 'n/a' for YAML).
+    If `limit` semaphore is given, the write waits for it, so it can bound concurrent writes shared by many tasks"""
+    loop = asyncio.get_running_loop()
+    write = partial(files.save_proof, proof, path, format)
+    if limit is None:
+        return await loop.run_in_executor(executor, write)
+    async with limit:
+        return await loop.run_in_executor(executor, write)
+
+
+async def atranscode_proofs(jobs, schema: Schema, input_format: str = None, output_format: str = None,
+                            concurrency: int = DEFAULT_CONCURRENCY, executor=None):
+    """Transcodes proofs for the list of `(input path, output path)` pairs with no more than `concurrency` files
+    being processed at the same time. Asynchronously yields triplets of input path, output path and either the
+    number of bytes written or the exception which occurred during transcoding"""
+    jobs = list(jobs)
+    proofs = aread_proofs([infile for (infile, _) in jobs], schema, input_format, concurrency, executor,
+                          return_exceptions=True)
+    limit = asyncio.Semaphore(concurrency)
+    writes = deque()
+
+    async def write(proof, outfile):
+        if isinstance(proof, Exception):
+            return proof
+        try:
+            return await awrite_proof(proof, outfile, output_format, executor, limit)
+        except Exception as err:
+            return err
+
+    no = 0
+    async for proof in proofs:
+        writes.append(asyncio.ensure_future(write(proof, jobs[no][1])))
+        no += 1
+        # -- reading is paused while the write queue is full
+        while len(writes) >= concurrency:
+            (infile, outfile) = jobs[no - len(writes)]
+            yield infile, outfile, await writes.popleft()
+    while len(writes) > 0:
+        (infile, outfile) = jobs[no - len(writes)]
+        yield infile, outfile, await writes.popleft()
+
+
+__all__ = [
+    'aload_schema',
+    'aread_proof',
+    'aread_proofs',
+    'awrite_proof',
+    'atranscode_proofs'
+]
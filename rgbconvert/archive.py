@@ -0,0 +1,237 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Proof archive: a file with consensus-serialized proofs for the same schema supporting random access by proof id.
+
+Archive starts with a fixed-size header (`MAGIC` bytes, format version byte, 32-byte schema id, number of proofs and
+offset of the index as 64-bit little-endian ints). It is followed by proof data, one proof after another, and the
+index: an array of fixed-size entries (32-byte proof id, 64-bit data offset and 32-bit data length) sorted by proof
+id. Archives are read through `mmap`, so lookups binary-search the index and decode only the requested proof."""
+
+import os
+import mmap
+import struct
+import bisect
+
+from bitcoin.core import Hash
+
+from .data_types import Hash256Id
+from .proofs.proof import Proof
+from .proofs.lazy_proof import LazyProof
+from .schema.schema import Schema
+
+
+class ArchiveError(Exception):
+    pass
+
+
+class Archive:
+    MAGIC = b'RGBPA'
+    VERSION = 0x01
+
+    HEADER = struct.Struct('<5sB32sQQ')
+    ENTRY = struct.Struct('<32sQI')
+
+    @staticmethod
+    def proof_id(proof_id) -> bytes:
+        """Returns raw proof id bytes from `Hash256Id`, raw bytes, Bech32 (`pf1...`) or hex string"""
+        if isinstance(proof_id, Hash256Id):
+            return proof_id.bytes
+        elif isinstance(proof_id, (bytes, bytearray)) and len(proof_id) == 32:
+            return bytes(proof_id)
+        return Hash256Id(proof_id).bytes
+
+
+class _IndexKeys:
+    """Sequence of proof ids from the memory-mapped index, suitable for `bisect`"""
+
+    __slots__ = ['buf', 'start', 'count']
+
+    def __init__(self, buf, start: int, count: int):
+        self.buf = buf
+        self.start = start
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, no: int) -> bytes:
+        pos = self.start + no * Archive.ENTRY.size
+        return self.buf[pos:pos + 32]
+
+
+class ArchiveReader:
+    """Provides random access to the proofs of an archive by their ids and iteration over ranges of ids"""
+
+    __slots__ = ['f', 'mm', 'schema_id', 'schema_obj', 'count', 'index']
+
+    def __init__(self, path: str, schema_obj: Schema = None):
+        self.f = open(path, 'rb')
+        try:
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.f.close()
+            raise ArchiveError(f'`{path}` is not an RGB proof archive')
+        if len(self.mm) < Archive.HEADER.size:
+            self.close()
+            raise ArchiveError(f'`{path}` is not an RGB proof archive')
+        (magic, version, schema_id, count, index) = Archive.HEADER.unpack_from(self.mm, 0)
+        if magic != Archive.MAGIC:
+            self.close()
+            raise ArchiveError(f'`{path}` is not an RGB proof archive')
+        if version != Archive.VERSION:
+            self.close()
+            raise ArchiveError(f'unsupported proof archive version {version}')
+        if index + count * Archive.ENTRY.size > len(self.mm):
+            self.close()
+            raise ArchiveError(f'proof archive `{path}` is truncated')
+
+        self.schema_id = Hash256Id(schema_id)
+        self.schema_obj = schema_obj
+        self.count = count
+        self.index = _IndexKeys(self.mm, index, count)
+        if schema_obj is not None and schema_obj.GetHash() != schema_id:
+            self.close()
+            raise ArchiveError(f'archive holds proofs for schema `{self.schema_id.structure_serialize(bech32=True)}`, '
+                               f'while `{schema_obj.bech32_id()}` schema is provided')
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, proof_id) -> bool:
+        return self._find(Archive.proof_id(proof_id)) is not None
+
+    def _entry(self, no: int) -> tuple:
+        return Archive.ENTRY.unpack_from(self.mm, self.index.start + no * Archive.ENTRY.size)
+
+    def _find(self, key: bytes):
+        no = bisect.bisect_left(self.index, key)
+        return no if no < self.count and self.index[no] == key else None
+
+    def get_raw(self, proof_id):
+        """Returns `memoryview` of consensus-serialized data for the proof with the given id, or `None` if the archive
+        does not contain such proof"""
+        no = self._find(Archive.proof_id(proof_id))
+        if no is None:
+            return None
+        (_, offset, length) = self._entry(no)
+        return memoryview(self.mm)[offset:offset + length]
+
+    def get(self, proof_id, lazy: bool = False):
+        """Returns proof with the given id decoded from the archive, or `None` if the archive does not contain it.
+        Proofs are decoded from a copy of their data, except for `lazy` ones: those reference the memory-mapped
+        archive and must be released before it is closed"""
+        no = self._find(Archive.proof_id(proof_id))
+        if no is None:
+            return None
+        return self._decode(no, lazy)
+
+    def _decode(self, no: int, lazy: bool):
+        (_, offset, length) = self._entry(no)
+        if lazy:
+            (proof, _) = LazyProof.from_buffer(self.mm, offset, self.schema_obj, size=length)
+        else:
+            # -- raw state and metadata of the proof would otherwise keep views of the map, preventing `close`
+            (proof, _) = Proof.from_buffer(self.mm[offset:offset + length], 0, self.schema_obj)
+        return proof
+
+    def _range(self, start=None, stop=None) -> range:
+        first = 0 if start is None else bisect.bisect_left(self.index, Archive.proof_id(start))
+        last = self.count if stop is None else bisect.bisect_left(self.index, Archive.proof_id(stop))
+        return range(first, last)
+
+    def ids(self, start=None, stop=None):
+        """Iterates over proof ids in ascending order within [`start`, `stop`) range (whole archive by default)"""
+        for no in self._range(start, stop):
+            yield Hash256Id(self.index[no])
+
+    def frames(self, start=None, stop=None):
+        """Iterates over pairs of proof id and `memoryview` of consensus-serialized proof data in ascending id order
+        within [`start`, `stop`) range"""
+        view = memoryview(self.mm)
+        for no in self._range(start, stop):
+            (proof_id, offset, length) = self._entry(no)
+            yield Hash256Id(proof_id), view[offset:offset + length]
+
+    def items(self, start=None, stop=None, lazy: bool = False):
+        """Iterates over pairs of proof id and proof in ascending id order within [`start`, `stop`) range (see `get`
+        on `lazy` proofs)"""
+        for no in self._range(start, stop):
+            yield Hash256Id(self.index[no]), self._decode(no, lazy)
+
+    def close(self):
+        """Closes the archive; lazy proofs and frames read from the archive must be released before it is closed,
+        since they reference its memory-mapped data"""
+        if getattr(self, 'mm', None) is not None:
+            self.mm.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveWriter:
+    """Creates a new archive. Proof data are written as they are added, while the index is kept in memory and written
+    by `close`; the header is updated last, so archives which were not closed properly are never considered valid"""
+
+    __slots__ = ['f', 'schema_id', 'entries', 'known']
+
+    def __init__(self, path: str, schema):
+        self.schema_id = Hash256Id(schema.GetHash()) if isinstance(schema, Schema) else schema
+        self.entries = []
+        self.known = set()
+        self.f = open(path, 'wb')
+        self.f.write(bytes(Archive.HEADER.size))
+
+    def append(self, proof: Proof) -> Hash256Id:
+        return self.append_raw(proof.serialize())
+
+    def append_raw(self, data) -> Hash256Id:
+        """Adds consensus-serialized proof data, returning proof id. Proofs which are already present are skipped"""
+        proof_id = Hash(data)
+        if proof_id not in self.known:
+            self.known.add(proof_id)
+            self.entries.append((proof_id, self.f.tell(), len(data)))
+            self.f.write(data)
+        return Hash256Id(proof_id)
+
+    def close(self):
+        index = self.f.tell()
+        self.entries.sort()
+        for entry in self.entries:
+            self.f.write(Archive.ENTRY.pack(*entry))
+        self.f.seek(0)
+        self.f.write(Archive.HEADER.pack(Archive.MAGIC, Archive.VERSION, self.schema_id.bytes,
+                                         len(self.entries), index))
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.f.close()
+
+
+__all__ = [
+    'ArchiveError',
+    'Archive',
+    'ArchiveReader',
+    'ArchiveWriter'
+]
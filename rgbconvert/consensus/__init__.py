@@ -35,16 +35,16 @@ class FlagVarIntSerializer(Serializer):
         mask = 0x80 if flag is True else 0
         if i < 0:
             raise ValueError('FlagVarInt must be a non-negative integer')
-        elif i < 0xfc:
+        elif i < 0x7c:
             f.write(bytes([i | mask]))
         elif i <= 0xff:
-            f.write(bytes(0x7c | mask))
+            f.write(bytes([0x7c | mask]))
             f.write(bytes([i]))
         elif i <= 0xffff:
-            f.write(bytes(0x7d | mask))
+            f.write(bytes([0x7d | mask]))
             f.write(struct.pack(b'<H', i))
         elif i <= 0xffffffff:
-            f.write(bytes(0x7e | mask))
+            f.write(bytes([0x7e | mask]))
             f.write(struct.pack(b'<I', i))
         else:
             raise ValueError(f"FlagVarInt can't be greater than 2^32; got {i} instead")
@@ -95,8 +95,19 @@ class SeparatorByteSignal(BaseException):
         return self.separator is FlagVarIntSerializer.Separator.EOF
 
 
+from .buffer import BufferReader, StreamReader, BufferWriter
+from .varint import decode_varints, encode_varints, decode_flag_varints, decode_flag_varint_run, encode_flag_varints
+
 __all__ = [
     'FlagVarIntSerializer',
     'ZeroBytesSerializer',
-    'SeparatorByteSignal'
+    'SeparatorByteSignal',
+    'BufferReader',
+    'StreamReader',
+    'BufferWriter',
+    'decode_varints',
+    'encode_varints',
+    'decode_flag_varints',
+    'decode_flag_varint_run',
+    'encode_flag_varints'
 ]
@@ -0,0 +1,215 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import struct
+
+from bitcoin.core.serialize import SerializationTruncationError
+
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+_unpack_u64 = struct.Struct('<Q').unpack_from
+
+
+def truncated(need: int, got: int):
+    raise SerializationTruncationError(f'Asked to read {need} bytes, but only got {got}')
+
+
+def read_varint(buf, pos: int, end: int) -> (int, int):
+    """Reads Bitcoin-style variable length int from `buf` at `pos` offset, returning the value and the offset next to
+    it. Reading never goes beyond `end` offset"""
+    if pos >= end:
+        truncated(1, 0)
+    prefix = buf[pos]
+    if prefix < 0xfd:
+        return prefix, pos + 1
+    (size, unpack) = (2, _unpack_u16) if prefix == 0xfd else (4, _unpack_u32) if prefix == 0xfe else (8, _unpack_u64)
+    if pos + 1 + size > end:
+        truncated(size, end - pos - 1)
+    return unpack(buf, pos + 1)[0], pos + 1 + size
+
+
+def read_flag_varint(buf, pos: int, end: int) -> (int, bool, int):
+    """Reads flag-prefixed variable length int (see `FlagVarIntSerializer`) from `buf` at `pos` offset, returning the
+    value, the flag and the offset next to it. Raises `SeparatorByteSignal` for separator bytes"""
+    if pos >= end:
+        truncated(1, 0)
+    prefix = buf[pos]
+    r = prefix & 0x7f
+    if r < 0x7c:
+        return r, prefix & 0x80 == 0x80, pos + 1
+    elif prefix == 0x7f or prefix == 0xff:
+        from . import FlagVarIntSerializer, SeparatorByteSignal
+        raise SeparatorByteSignal(FlagVarIntSerializer.Separator.EOL if prefix == 0x7f
+                                  else FlagVarIntSerializer.Separator.EOF)
+    (size, unpack) = (1, None) if r == 0x7c else (2, _unpack_u16) if r == 0x7d else (4, _unpack_u32)
+    if pos + 1 + size > end:
+        truncated(size, end - pos - 1)
+    value = buf[pos + 1] if unpack is None else unpack(buf, pos + 1)[0]
+    return value, prefix & 0x80 == 0x80, pos + 1 + size
+
+
+class BufferReader:
+    """Offset-based reader over `bytes`, `bytearray`, `mmap` or any other object supporting buffer protocol.
+
+    Unlike `BytesIO`, the reader does not copy the underlying buffer: `read_view` returns `memoryview` slices of it,
+    and the values are decoded in place with `struct.unpack_from`. The reader provides file-like `read`, `tell` and
+    `seek` methods, so it can be passed to the existing `stream_deserialize` methods as well.
+    """
+
+    __slots__ = ['view', 'pos', 'end']
+
+    def __init__(self, buf, offset: int = 0, size: int = None):
+        view = buf if isinstance(buf, memoryview) else memoryview(buf)
+        if view.ndim != 1 or view.itemsize != 1:
+            view = view.cast('B')
+        self.view = view
+        self.pos = offset
+        self.end = len(view) if size is None else offset + size
+        if self.end > len(view) or offset < 0:
+            raise ValueError(f'buffer of {len(view)} bytes does not contain range {offset}..{self.end}')
+
+    def remaining(self) -> int:
+        return self.end - self.pos
+
+    def at_end(self) -> bool:
+        return self.pos >= self.end
+
+    def tell(self) -> int:
+        return self.pos
+
+    def seek(self, pos: int, whence: int = 0):
+        self.pos = pos if whence == 0 else self.pos + pos if whence == 1 else self.end + pos
+        return self.pos
+
+    def read_view(self, n: int) -> memoryview:
+        """Returns `n` next bytes as a `memoryview` slice of the underlying buffer without copying them"""
+        pos = self.pos
+        if pos + n > self.end:
+            truncated(n, self.end - pos)
+        self.pos = pos + n
+        return self.view[pos:pos + n]
+
+    def read(self, n: int = -1) -> bytes:
+        if n < 0:
+            n = self.end - self.pos
+        n = min(n, self.end - self.pos)
+        pos = self.pos
+        self.pos = pos + n
+        return self.view[pos:pos + n].tobytes()
+
+    def read_byte(self) -> int:
+        pos = self.pos
+        if pos >= self.end:
+            truncated(1, 0)
+        self.pos = pos + 1
+        return self.view[pos]
+
+    def read_varint(self) -> int:
+        (value, self.pos) = read_varint(self.view, self.pos, self.end)
+        return value
+
+    def read_flag_varint(self) -> (int, bool):
+        pos = self.pos
+        if pos < self.end and self.view[pos] & 0x7f == 0x7f:
+            # -- separator bytes are consumed before raising the signal, like it happens with streams
+            self.pos = pos + 1
+        (value, flag, self.pos) = read_flag_varint(self.view, pos, self.end)
+        return value, flag
+
+    def read_varbytes_view(self) -> memoryview:
+        """Reads length-prefixed byte string returning it as a `memoryview` slice of the underlying buffer"""
+        return self.read_view(self.read_varint())
+
+    def read_flag_varint_run(self, flag: bool):
+        """Reads consecutive FlagVarInts with the given flag at once, returning `array` of their values (see
+        `decode_flag_varint_run`)"""
+        (values, self.pos) = decode_flag_varint_run(self.view, self.pos, self.end, flag)
+        return values
+
+
+class StreamReader:
+    """Adapter providing `BufferReader` interface for file objects"""
+
+    __slots__ = ['f']
+
+    def __init__(self, f):
+        self.f = f
+
+    def at_end(self) -> bool:
+        pos = self.f.tell()
+        if len(self.f.read(1)) == 0:
+            return True
+        self.f.seek(pos)
+        return False
+
+    def tell(self) -> int:
+        return self.f.tell()
+
+    def seek(self, pos: int, whence: int = 0):
+        return self.f.seek(pos, whence)
+
+    def read(self, n: int = -1) -> bytes:
+        return self.f.read(n)
+
+    def read_view(self, n: int) -> bytes:
+        data = self.f.read(n)
+        if len(data) < n:
+            truncated(n, len(data))
+        return data
+
+    def read_byte(self) -> int:
+        return self.read_view(1)[0]
+
+    def read_varint(self) -> int:
+        prefix = self.read_byte()
+        if prefix < 0xfd:
+            return prefix
+        size = 2 if prefix == 0xfd else 4 if prefix == 0xfe else 8
+        return read_varint(bytes([prefix]) + self.read_view(size), 0, size + 1)[0]
+
+    def read_flag_varint(self) -> (int, bool):
+        prefix = self.read_byte()
+        r = prefix & 0x7f
+        size = 0 if r < 0x7c or prefix == 0x7f or prefix == 0xff else 1 if r == 0x7c else 2 if r == 0x7d else 4
+        data = bytes([prefix]) + (self.read_view(size) if size > 0 else b'')
+        return read_flag_varint(data, 0, len(data))[:2]
+
+    def read_varbytes_view(self) -> bytes:
+        return self.read_view(self.read_varint())
+
+
+class BufferWriter:
+    """File-like writer appending data to a `bytearray`, which can be reused after `clear`"""
+
+    __slots__ = ['buf']
+
+    def __init__(self, buf: bytearray = None):
+        self.buf = buf if buf is not None else bytearray()
+
+    def write(self, data) -> int:
+        self.buf += data
+        return len(data)
+
+    def tell(self) -> int:
+        return len(self.buf)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buf)
+
+    def clear(self):
+        del self.buf[:]
+
+
+# -- imported last, since the batch codec itself is built on top of the readers defined above
+from .varint import decode_flag_varint_run
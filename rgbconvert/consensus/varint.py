@@ -0,0 +1,209 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Batch codec for runs of VarInts and FlagVarInts (see `FlagVarIntSerializer`), like the balances of sealed state
+or the outputs of seal sequences.
+
+Runs of single-byte values, which dominate real data, are located with a regular expression and converted at once by
+C code (`array.extend`, `bytes.translate`), so only multi-byte values are decoded one by one. Values are returned as
+`array('Q')` (`array('I')` for FlagVarInts), which supports buffer protocol and can be wrapped by
+`numpy.frombuffer` without copying."""
+
+import re
+import struct
+from array import array
+
+from .buffer import truncated, read_flag_varint
+
+_pack_u16 = struct.Struct('<H').pack
+_pack_u32 = struct.Struct('<I').pack
+_pack_u64 = struct.Struct('<Q').pack
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+_unpack_u64 = struct.Struct('<Q').unpack_from
+_SMALL_INTS = [bytes([i]) for i in range(0x100)]
+
+# Prefixes of multi-byte VarInts
+_VARINT_LONG = re.compile(b'[\xfd-\xff]')
+# Prefixes of multi-byte FlagVarInts and separator bytes
+_FLAG_VARINT_LONG = re.compile(b'[\x7c-\x7f\xfc-\xff]')
+# Bytes other than single-byte FlagVarInts with the flag set or unset
+_NOT_FLAGGED = re.compile(b'[^\x80-\xfb]')
+_NOT_UNFLAGGED = re.compile(b'[^\x00-\x7b]')
+
+# Single-byte FlagVarInt -> its value, its flag; single-byte value -> FlagVarInt with the flag set
+_FLAG_VALUE = bytes(i & 0x7f for i in range(0x100))
+_FLAG_BIT = bytes(i >> 7 for i in range(0x100))
+_SET_FLAG = bytes(i | 0x80 for i in range(0x80)) + bytes(range(0x80, 0x100))
+
+# Prefix of multi-byte VarInt -> size of the value and its decoder
+_VARINT_WIDTHS = {0xfd: (2, _unpack_u16), 0xfe: (4, _unpack_u32), 0xff: (8, _unpack_u64)}
+
+# Prefix of multi-byte FlagVarInt (with the flag dropped) -> size of the value and its decoder
+_FLAG_VARINT_WIDTHS = {0x7c: (1, struct.Struct('<B').unpack_from), 0x7d: (2, _unpack_u16), 0x7e: (4, _unpack_u32)}
+
+
+def varint_bytes(i: int) -> bytes:
+    if i < 0:
+        raise ValueError('varint must be non-negative integer')
+    elif i < 0xfd:
+        return _SMALL_INTS[i]
+    elif i <= 0xffff:
+        return b'\xfd' + _pack_u16(i)
+    elif i <= 0xffffffff:
+        return b'\xfe' + _pack_u32(i)
+    else:
+        return b'\xff' + _pack_u64(i)
+
+
+def flag_varint_bytes(i: int, flag: bool = False) -> bytes:
+    mask = 0x80 if flag else 0
+    if i < 0:
+        raise ValueError('FlagVarInt must be a non-negative integer')
+    elif i < 0x7c:
+        return _SMALL_INTS[i | mask]
+    elif i <= 0xff:
+        return bytes([0x7c | mask, i])
+    elif i <= 0xffff:
+        return _SMALL_INTS[0x7d | mask] + _pack_u16(i)
+    elif i <= 0xffffffff:
+        return _SMALL_INTS[0x7e | mask] + _pack_u32(i)
+    raise ValueError(f"FlagVarInt can't be greater than 2^32; got {i} instead")
+
+
+def decode_varints(buf, pos: int, end: int, count: int) -> (array, int):
+    """Decodes `count` consecutive VarInts from `buf` at `pos` offset, never reading beyond `end` offset. Returns
+    `array('Q')` of values and the offset next to them"""
+    values = array('Q')
+    append = values.append
+    search = _VARINT_LONG.search
+    left = count
+    while left > 0:
+        if pos >= end:
+            truncated(1, 0)
+        prefix = buf[pos]
+        if prefix < 0xfd:
+            if left == 1 or pos + 1 >= end or buf[pos + 1] >= 0xfd:
+                # -- a single-byte value between multi-byte ones is not worth searching for the end of the run
+                append(prefix)
+                pos += 1
+                left -= 1
+                continue
+            stop = min(pos + left, end)
+            match = search(buf, pos, stop)
+            run_end = match.start() if match is not None else stop
+            values.extend(buf[pos:run_end])
+            left -= run_end - pos
+            pos = run_end
+            continue
+        (size, unpack) = _VARINT_WIDTHS[prefix]
+        if pos + 1 + size > end:
+            truncated(size, end - pos - 1)
+        append(unpack(buf, pos + 1)[0])
+        pos += 1 + size
+        left -= 1
+    return values, pos
+
+
+def encode_varints(values) -> bytes:
+    if len(values) == 0:
+        return b''
+    if min(values) < 0:
+        raise ValueError('varint must be non-negative integer')
+    if max(values) < 0xfd:
+        return bytes(values)
+    # -- `varint_bytes` is inlined, since function calls would cost more than the encoding itself
+    return b''.join([_SMALL_INTS[i] if i < 0xfd else b'\xfd' + _pack_u16(i) if i <= 0xffff else
+                     b'\xfe' + _pack_u32(i) if i <= 0xffffffff else b'\xff' + _pack_u64(i) for i in values])
+
+
+def decode_flag_varints(buf, pos: int, end: int, count: int) -> (array, bytearray, int):
+    """Decodes `count` consecutive FlagVarInts from `buf` at `pos` offset, never reading beyond `end` offset. Returns
+    `array('I')` of values, `bytearray` of their flags (as 0 and 1) and the offset next to them. Raises
+    `SeparatorByteSignal` if a separator byte is met"""
+    values = array('I')
+    flags = bytearray()
+    search = _FLAG_VARINT_LONG.search
+    left = count
+    while left > 0:
+        if pos >= end:
+            truncated(1, 0)
+        if buf[pos] & 0x7f < 0x7c:
+            stop = min(pos + left, end)
+            match = search(buf, pos, stop)
+            run_end = match.start() if match is not None else stop
+            run = bytes(buf[pos:run_end])
+            values.extend(run.translate(_FLAG_VALUE))
+            flags += run.translate(_FLAG_BIT)
+            left -= run_end - pos
+            pos = run_end
+        else:
+            (value, flag, pos) = read_flag_varint(buf, pos, end)
+            values.append(value)
+            flags.append(flag)
+            left -= 1
+    return values, flags, pos
+
+
+def decode_flag_varint_run(buf, pos: int, end: int, flag: bool) -> (array, int):
+    """Decodes consecutive FlagVarInts with the given `flag` from `buf` at `pos` offset up to the first FlagVarInt
+    with another flag, separator byte or `end` offset. Returns `array('I')` of values and the offset next to them"""
+    values = array('I')
+    append = values.append
+    search = (_NOT_FLAGGED if flag else _NOT_UNFLAGGED).search
+    mask = 0x80 if flag else 0x00
+    while pos < end:
+        prefix = buf[pos]
+        if prefix & 0x80 != mask:
+            break
+        r = prefix & 0x7f
+        if r < 0x7c:
+            match = search(buf, pos, end)
+            run_end = match.start() if match is not None else end
+            values.extend(bytes(buf[pos:run_end]).translate(_FLAG_VALUE) if flag else buf[pos:run_end])
+            pos = run_end
+            continue
+        elif r == 0x7f:
+            break
+        (size, unpack) = _FLAG_VARINT_WIDTHS[r]
+        if pos + 1 + size > end:
+            truncated(size, end - pos - 1)
+        append(unpack(buf, pos + 1)[0])
+        pos += 1 + size
+    return values, pos
+
+
+def encode_flag_varints(values, flags) -> bytes:
+    """Encodes FlagVarInts; `flags` is either a sequence of flags for each of the values or a single flag for all
+    of them"""
+    if len(values) == 0:
+        return b''
+    if isinstance(flags, bool):
+        if max(values) < 0x7c:
+            # -- fails on negative values, as `flag_varint_bytes` does
+            data = bytes(values)
+            return data.translate(_SET_FLAG) if flags else data
+        return b''.join([flag_varint_bytes(i, flags) for i in values])
+    return b''.join([flag_varint_bytes(i, flag) for (i, flag) in zip(values, flags)])
+
+
+__all__ = [
+    'varint_bytes',
+    'flag_varint_bytes',
+    'decode_varints',
+    'encode_varints',
+    'decode_flag_varints',
+    'decode_flag_varint_run',
+    'encode_flag_varints'
+]
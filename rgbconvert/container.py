@@ -0,0 +1,149 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Multi-proof container: a single file holding a sequence of consensus-serialized proofs for the same schema.
+
+Container starts with a header consisting of `MAGIC` bytes, format version byte and 32-byte schema id. The header is
+followed by frames, one per proof; each frame is composed of VarInt-encoded length of the proof data, 32-byte proof
+id (`Proof.GetHash`) and the consensus-serialized proof itself. Frames are length-prefixed since proofs are not
+self-delimiting (their pruned data are optional and extend to the end of the data)."""
+
+import os
+
+from bitcoin.core import Hash
+from bitcoin.core.serialize import VarIntSerializer
+
+from .consensus import StreamReader
+from .data_types import Hash256Id
+from .proofs.proof import Proof
+from .proofs.lazy_proof import LazyProof
+from .schema.schema import Schema
+
+
+class ContainerError(Exception):
+    pass
+
+
+class Container:
+    MAGIC = b'RGBPC'
+    VERSION = 0x01
+    HEADER_SIZE = len(MAGIC) + 1 + 32
+
+    @staticmethod
+    def schema_id(schema) -> Hash256Id:
+        return Hash256Id(schema.GetHash()) if isinstance(schema, Schema) else schema
+
+    @staticmethod
+    def write_header(f, schema_id: Hash256Id):
+        f.write(Container.MAGIC)
+        f.write(bytes([Container.VERSION]))
+        schema_id.stream_serialize(f)
+
+    @staticmethod
+    def read_header(f) -> Hash256Id:
+        header = f.read(Container.HEADER_SIZE)
+        if len(header) < Container.HEADER_SIZE or not header.startswith(Container.MAGIC):
+            raise ContainerError('file is not an RGB proof container')
+        if header[len(Container.MAGIC)] != Container.VERSION:
+            raise ContainerError(f'unsupported proof container version {header[len(Container.MAGIC)]}')
+        return Hash256Id(header[-32:])
+
+
+class ContainerReader:
+    """Reads proofs from a container one frame at a time, so memory usage does not depend on the container size"""
+
+    __slots__ = ['f', 'schema_id', 'schema_obj', 'lazy', 'verify']
+
+    def __init__(self, f, schema_obj: Schema = None, lazy: bool = False, verify: bool = True):
+        self.f = f
+        self.schema_obj = schema_obj
+        self.lazy = lazy
+        self.verify = verify
+        self.schema_id = Container.read_header(f)
+        if schema_obj is not None and Container.schema_id(schema_obj).bytes != self.schema_id.bytes:
+            raise ContainerError(f'container holds proofs for schema '
+                                 f'`{self.schema_id.structure_serialize(bech32=True)}`, while '
+                                 f'`{schema_obj.bech32_id()}` schema is provided')
+
+    def frames(self):
+        """Yields tuples of proof id and raw consensus-serialized proof data"""
+        reader = StreamReader(self.f)
+        while not reader.at_end():
+            start = reader.tell()
+            size = reader.read_varint()
+            proof_id = reader.read_view(32)
+            data = reader.read_view(size)
+            if self.verify and Hash(data) != proof_id:
+                raise ContainerError(f'proof data does not match proof id `{Hash256Id(proof_id)}` '
+                                     f'in the frame at offset {start}')
+            yield Hash256Id(proof_id), data
+
+    def __iter__(self):
+        cls = LazyProof if self.lazy else Proof
+        for (_, data) in self.frames():
+            (proof, _) = cls.from_buffer(data, schema_obj=self.schema_obj)
+            yield proof
+
+
+class ContainerWriter:
+    """Appends proofs to a container, creating it if the file is empty"""
+
+    __slots__ = ['f', 'schema_id']
+
+    def __init__(self, f, schema):
+        self.f = f
+        self.schema_id = Container.schema_id(schema)
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            Container.write_header(f, self.schema_id)
+            return
+        f.seek(0)
+        schema_id = Container.read_header(f)
+        if schema_id.bytes != self.schema_id.bytes:
+            raise ContainerError(f'unable to append proofs to container for schema '
+                                 f'`{schema_id.structure_serialize(bech32=True)}`')
+        f.seek(0, os.SEEK_END)
+
+    @classmethod
+    def open(cls, path: str, schema):
+        """Opens container file for appending, creating it if it does not exist"""
+        return cls(open(path, 'r+b' if os.path.exists(path) else 'w+b'), schema)
+
+    def append(self, proof: Proof) -> Hash256Id:
+        return self.append_raw(proof.serialize())
+
+    def append_raw(self, data: bytes) -> Hash256Id:
+        """Appends already consensus-serialized proof data, returning proof id"""
+        proof_id = Hash(data)
+        VarIntSerializer.stream_serialize(len(data), self.f)
+        self.f.write(proof_id)
+        self.f.write(data)
+        return Hash256Id(proof_id)
+
+    def close(self):
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+__all__ = [
+    'ContainerError',
+    'Container',
+    'ContainerReader',
+    'ContainerWriter'
+]
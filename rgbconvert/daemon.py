@@ -0,0 +1,210 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Long-running daemon keeping libraries and schemas loaded in memory, and a client for it.
+
+Daemon listens on a Unix domain socket. Both requests and responses are JSON objects, each sent as a frame prefixed
+with its length as a 32-bit big-endian int; a single connection may be used for any number of requests, which are
+answered in order. Requests are processed by a handler function in an executor, which by default has a single
+thread, so handlers do not need to be thread-safe. Requests with `command` set to `ping` are answered by the daemon
+itself; errors raised by the handler are returned as `{"error": "..."}` responses.
+
+The socket is created accessible only by its owner, and clients refuse to connect to sockets owned by other users."""
+
+import os
+import json
+import socket
+import struct
+
+FRAME = struct.Struct('>I')
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    pass
+
+
+def default_socket_path() -> str:
+    """Returns socket path from `RGB_CONVERT_SOCKET` environment variable or, if it is not set, `rgb-convert.sock`
+    inside user runtime directory or, if there is none, inside private `rgb-convert-<uid>` temporary directory"""
+    if 'RGB_CONVERT_SOCKET' in os.environ:
+        return os.environ['RGB_CONVERT_SOCKET']
+    if 'XDG_RUNTIME_DIR' in os.environ:
+        return os.path.join(os.environ['XDG_RUNTIME_DIR'], 'rgb-convert.sock')
+    import tempfile
+    return os.path.join(tempfile.gettempdir(), f'rgb-convert-{os.getuid()}', 'rgb-convert.sock')
+
+
+def _check_owner(path: str):
+    try:
+        st = os.lstat(path)
+    except OSError as err:
+        raise DaemonError(f'unable to access `{path}`: {err}')
+    if st.st_uid != os.getuid():
+        raise DaemonError(f'`{path}` is owned by another user')
+
+
+def _encode(message: dict) -> bytes:
+    data = json.dumps(message).encode('utf-8')
+    return FRAME.pack(len(data)) + data
+
+
+def _decode(data: bytes) -> dict:
+    try:
+        message = json.loads(data.decode('utf-8'))
+    except ValueError as err:
+        raise DaemonError(f'malformed message: {err}')
+    if not isinstance(message, dict):
+        raise DaemonError('message must be a JSON object')
+    return message
+
+
+class DaemonServer:
+    """Serves requests with the `handler` function, taking request and returning response dict"""
+
+    __slots__ = ['path', 'handler', 'executor', 'server']
+
+    def __init__(self, handler, path: str = None, executor=None):
+        # -- `asyncio` is imported only by the server, so clients do not pay for it
+        from concurrent.futures import ThreadPoolExecutor
+        self.path = path if path is not None else default_socket_path()
+        self.handler = handler
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1)
+        self.server = None
+
+    async def start(self):
+        import asyncio
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(directory):
+            os.makedirs(directory, mode=0o700)
+        # -- a directory owned by another user (e.g. created in advance under the predictable temporary name) could
+        # be used to replace the socket
+        _check_owner(directory)
+        if os.path.exists(self.path):
+            if DaemonClient.available(self.path):
+                raise DaemonError(f'another daemon is already listening on `{self.path}`')
+            # -- stale socket left by a daemon which was not shut down properly
+            os.unlink(self.path)
+        # -- the socket is created with permissions restricted by the umask, so it is never accessible by others
+        umask = os.umask(0o177)
+        try:
+            self.server = await asyncio.start_unix_server(self._serve, path=self.path)
+        finally:
+            os.umask(umask)
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    async def _serve(self, reader, writer):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    (size,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+                    if size > MAX_FRAME_SIZE:
+                        raise DaemonError(f'request frame of {size} bytes exceeds the limit')
+                    request = _decode(await reader.readexactly(size))
+                except asyncio.IncompleteReadError:
+                    break
+                except DaemonError as err:
+                    writer.write(_encode({'error': str(err)}))
+                    break
+
+                if request.get('command') == 'ping':
+                    response = {'pid': os.getpid()}
+                else:
+                    try:
+                        response = await loop.run_in_executor(self.executor, self.handler, request)
+                    except Exception as err:
+                        response = {'error': f'{type(err).__name__}: {err}'}
+                writer.write(_encode(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+
+class DaemonClient:
+    """Blocking client sending requests to the daemon over a single connection"""
+
+    __slots__ = ['sock']
+
+    def __init__(self, path: str = None, timeout: float = None):
+        path = path if path is not None else default_socket_path()
+        # -- a socket owned by another user may be served by anyone, who would then see the requests
+        _check_owner(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        try:
+            self.sock.connect(path)
+        except OSError as err:
+            self.sock.close()
+            raise DaemonError(f'unable to connect to daemon at `{path}`: {err}')
+
+    @staticmethod
+    def available(path: str = None) -> bool:
+        """Checks whether a daemon is listening on the socket"""
+        path = path if path is not None else default_socket_path()
+        if not os.path.exists(path):
+            return False
+        try:
+            with DaemonClient(path, timeout=1.0) as client:
+                client.request(command='ping')
+        except (DaemonError, OSError):
+            return False
+        return True
+
+    def request(self, **request) -> dict:
+        self.sock.sendall(_encode(request))
+        (size,) = FRAME.unpack(self._read(FRAME.size))
+        return _decode(self._read(size))
+
+    def _read(self, size: int) -> bytes:
+        buf = bytearray()
+        while len(buf) < size:
+            chunk = self.sock.recv(size - len(buf))
+            if len(chunk) == 0:
+                raise DaemonError('daemon closed connection')
+            buf += chunk
+        return bytes(buf)
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+__all__ = [
+    'DaemonError',
+    'DaemonServer',
+    'DaemonClient',
+    'default_socket_path'
+]
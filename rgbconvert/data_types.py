@@ -15,9 +15,7 @@
 import re
 from abc import ABC
 from enum import unique
-from inflection import *
 from bitcoin.core import lx, b2lx
-from bitcoin.core.key import CPubKey
 from bitcoin.core.serialize import *
 import bitcoin.segwit_addr as bech32
 
@@ -66,6 +64,7 @@ class Network(FieldEnum):
         return cls.__members__[val]
 
     def structure_serialize(self, **kwargs) -> str:
+        from inflection import underscore
         return underscore(self.name).replace('_', ':')
 
 
@@ -108,8 +107,8 @@ class SemVer(Serializable, StructureSerializable):
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
         major = VarIntSerializer.stream_deserialize(f)
-        minor = ser_read(f, 1)
-        patch = ser_read(f, 1)
+        minor = ser_read(f, 1)[0]
+        patch = ser_read(f, 1)[0]
         return cls(major, minor, patch)
 
     def stream_serialize(self, f, **kwargs):
@@ -152,6 +151,15 @@ class HashId(ImmutableSerializable, ABC, StructureSerializable):
             raise ValueError(f'Unknown value for HashId initialization: {data}')
         object.__setattr__(self, 'bytes', value)
 
+    @classmethod
+    def from_raw(cls, data: bytes, bits: int = None):
+        """Constructs hash id from `data` of the proper length without any checks; for binary decoders only, since
+        user-provided values must go through the constructor"""
+        self = cls.__new__(cls)
+        object.__setattr__(self, 'bits', cls.BITS if bits is None else bits)
+        object.__setattr__(self, 'bytes', data)
+        return self
+
     def __str__(self):
         return f'{b2lx(self.bytes)}'
 
@@ -177,7 +185,7 @@ class HashId(ImmutableSerializable, ABC, StructureSerializable):
             raise ValueError(
                 'HashId.stream_deserialize must be provided with number of hash bits to read (`bits` parameter)')
         bits = kwargs['bits']
-        return HashId(f.read(int(bits / 8)), kwargs['bits'])
+        return HashId.from_raw(ser_read(f, int(bits / 8)), bits)
 
     def stream_serialize(self, f, **kwargs):
         f.write(self.bytes)
@@ -195,7 +203,7 @@ class Hash160Id(HashId):
 
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
-        return super().stream_deserialize(f, bits=Hash160Id.BITS, **kwargs)
+        return cls.from_raw(ser_read(f, int(Hash160Id.BITS / 8)))
 
 
 class Hash256Id(HashId):
@@ -210,11 +218,11 @@ class Hash256Id(HashId):
 
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
-        return super().stream_deserialize(f, bits=Hash256Id.BITS, **kwargs)
+        return cls.from_raw(ser_read(f, int(Hash256Id.BITS / 8)))
 
 
 class PubKey(ImmutableSerializable, StructureSerializable):
-    __slots__ = ['cpubkey']
+    __slots__ = ['data', '_cpubkey']
 
     def __init__(self, data):
         if isinstance(data, str):
@@ -223,17 +231,36 @@ class PubKey(ImmutableSerializable, StructureSerializable):
             data = bytes(data)
         if not isinstance(data, bytes):
             raise ValueError('PubKey can be constructed only from either hex string, bytearray or byte data')
-        object.__setattr__(self, 'cpubkey', CPubKey(data))
+        # -- `bitcoin.core.key` loads libssl through ctypes, so it is imported only when public keys are used
+        from bitcoin.core.key import CPubKey
+        object.__setattr__(self, 'data', data)
+        object.__setattr__(self, '_cpubkey', CPubKey(data))
+
+    @classmethod
+    def from_raw(cls, data: bytes):
+        """Constructs public key from serialized `data` without any checks; for binary decoders only. The key is
+        parsed into `CPubKey` on the first access to `cpubkey`"""
+        self = cls.__new__(cls)
+        object.__setattr__(self, 'data', data)
+        object.__setattr__(self, '_cpubkey', None)
+        return self
+
+    @property
+    def cpubkey(self):
+        if self._cpubkey is None:
+            from bitcoin.core.key import CPubKey
+            object.__setattr__(self, '_cpubkey', CPubKey(self.data))
+        return self._cpubkey
 
     def structure_serialize(self, **kwargs) -> str:
-        return self.cpubkey.hex()
+        return self.data.hex()
 
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
-        return cls(ser_read(f, 33))
+        return cls.from_raw(ser_read(f, 33))
 
     def stream_serialize(self, f, **kwargs):
-        f.write(self.cpubkey)
+        f.write(self.data)
 
 
 class OutPoint(ImmutableSerializable, StructureSerializable):
@@ -243,7 +270,8 @@ class OutPoint(ImmutableSerializable, StructureSerializable):
         if isinstance(data, str) and ':' in data and vout is None:
             (txid, vout, *_) = data.split(':')
             txid = bytes(bytearray.fromhex(txid))
-        elif isinstance(data, bytes) and vout is not None:
+        elif (data is None or isinstance(data, bytes)) and vout is not None:
+            # -- short-form outpoints of the seals referencing proof transaction itself have no txid
             txid = data
         elif isinstance(data, int) and vout is None:
             (txid, vout) = (None, data)
@@ -259,7 +287,18 @@ class OutPoint(ImmutableSerializable, StructureSerializable):
         except _:
             raise ValueError('OutPoint can be constructed only from string `txid_hex:vout` or `int`')
 
+    @classmethod
+    def from_raw(cls, txid, vout: int):
+        """Constructs outpoint from 32-byte `txid` (or `None` for short-form outpoints) and `vout` without any checks;
+        for binary decoders only"""
+        self = cls.__new__(cls)
+        object.__setattr__(self, 'txid', txid)
+        object.__setattr__(self, 'vout', vout)
+        return self
+
     def structure_serialize(self, **kwargs):
+        if self.txid is None:
+            return self.vout
         return f'{self.txid.hex()}:{self.vout}'
 
     @classmethod
@@ -271,7 +310,7 @@ class OutPoint(ImmutableSerializable, StructureSerializable):
         else:
             txid = ser_read(f, 32)
             vout = VarIntSerializer.stream_deserialize(f)
-        return cls(txid, vout)
+        return cls.from_raw(txid, vout)
 
     def stream_serialize(self, f, **kwargs):
         short_form = kwargs['short'] if 'short' in kwargs else False
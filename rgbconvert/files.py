@@ -0,0 +1,223 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Reading and writing schema and proof files in binary and structured (YAML, JSON and JSON Lines) formats.
+
+JSON Lines files hold one proof per line and are read and written incrementally with `load_proofs` and
+`save_proofs`; other formats hold a single proof per file. `yaml` is imported only when YAML files are read or
+written, since it is the slowest library to load; its libyaml-based C loader and dumper are used when available."""
+
+import os
+import json
+import tempfile
+from contextlib import contextmanager
+
+from .schema.schema import Schema
+from .schema.cache import SchemaCache
+from .proofs.proof import Proof
+from . import timing, metrics
+
+FORMATS = ['yaml', 'json', 'jsonl', 'binary']
+
+STRUCTURED_FORMATS = ['yaml', 'json', 'jsonl']
+
+# File extension -> format; files with other extensions are binary
+EXTENSIONS = {
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+# Format -> extension used for new files
+FORMAT_EXTENSIONS = {
+    'yaml': '.yaml',
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'binary': '.bin',
+}
+
+
+def guess_format(path: str, format: str = None) -> str:
+    """Returns normalized file format name: either the given `format` or, if it is not provided, the format guessed
+    by file extension (see `EXTENSIONS`)"""
+    if format is None:
+        return EXTENSIONS.get(os.path.splitext(path.lower())[1], 'binary')
+    elif format.lower() in FORMATS:
+        return format.lower()
+    raise ValueError(f'unknown file format `{format}`; accepted values are {", ".join(FORMATS)}')
+
+
+def load_structure(data, format: str):
+    """Parses structured data from a string, bytes or text stream with the given format. JSON Lines data must
+    contain a single record"""
+    if format == 'yaml':
+        import yaml
+        with timing.span('yaml.load'):
+            return yaml.load(data, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+    elif format in ['json', 'jsonl']:
+        with timing.span('json.load'):
+            return json.loads(data) if isinstance(data, (str, bytes)) else json.load(data)
+    raise ValueError(f'`{format}` is not a structured data format')
+
+
+def dump_structure(data, f, format: str):
+    """Writes structured data into a text stream with the given format; JSON Lines data are written as a single
+    line"""
+    if format == 'yaml':
+        import yaml
+        with timing.span('yaml.dump'):
+            yaml.dump(data, f, Dumper=getattr(yaml, 'CDumper', yaml.Dumper), default_flow_style=False)
+    elif format == 'json':
+        with timing.span('json.dump'):
+            json.dump(data, f, indent=2)
+            f.write('\n')
+    elif format == 'jsonl':
+        with timing.span('json.dump'):
+            json.dump(data, f, separators=(',', ':'))
+            f.write('\n')
+    else:
+        raise ValueError(f'`{format}` is not a structured data format')
+
+
+def load_schema(path: str, cache: SchemaCache = None) -> Schema:
+    """Loads schema with all its internal references resolved. Schemas in structured formats are taken from the
+    `cache` of compiled schemas, if provided, or are put into it after being compiled"""
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    # Binary schemas have all internal references serialized as resolved type indexes, so they are not cached
+    format = guess_format(path)
+    if format == 'binary':
+        return Schema.deserialize(content)
+
+    if cache is not None:
+        schema = cache.get(content)
+        if schema is not None:
+            return schema
+
+    data = load_structure(content, format)
+    schema = Schema(**data)
+    schema.resolve_refs()
+
+    if cache is not None:
+        try:
+            cache.put(content, schema)
+        except OSError:
+            # -- cache is an optimization only, so failing to store the schema in it is not an error
+            pass
+    return schema
+
+
+def load_proof(path: str, schema: Schema, format: str = None) -> Proof:
+    """Reads a single proof from file; JSON Lines files must contain exactly one proof (see `load_proofs`)"""
+    format = guess_format(path, format)
+    if format == 'jsonl':
+        proofs = list(load_proofs(path, schema, format))
+        if len(proofs) != 1:
+            raise ValueError(f'`{path}` contains {len(proofs)} proofs instead of a single one')
+        return proofs[0]
+    elif format in STRUCTURED_FORMATS:
+        with open(path, 'r') as f:
+            data = load_structure(f, format)
+            metrics.inc('bytes_read_total', (('encoding', 'structure'),), os.fstat(f.fileno()).st_size)
+            return Proof(schema_obj=schema, **data)
+    else:
+        with open(path, 'rb') as f:
+            (proof, _) = Proof.from_buffer(f.read(), schema_obj=schema)
+            return proof
+
+
+def load_proofs(path: str, schema: Schema, format: str = None):
+    """Iterates over proofs from file, reading JSON Lines files line by line (empty lines are skipped); files of
+    other formats provide a single proof"""
+    format = guess_format(path, format)
+    if format != 'jsonl':
+        yield load_proof(path, schema, format)
+        return
+    with open(path, 'r') as f:
+        for (no, line) in enumerate(f, 1):
+            if len(line.strip()) == 0:
+                continue
+            metrics.inc('bytes_read_total', (('encoding', 'structure'),), len(line))
+            try:
+                with timing.span('json.load'):
+                    data = json.loads(line)
+            except ValueError as err:
+                raise ValueError(f'malformed JSON at line {no} of `{path}`: {err}')
+            yield Proof(schema_obj=schema, **data)
+
+
+@contextmanager
+def _replacing(path: str, mode: str):
+    """Opens temporary file which replaces the file at `path` once written. Existing file is never written in place,
+    since it may be a hard link to a result cache entry or another output"""
+    tmp = _temp_name(path)
+    try:
+        # -- the file is created exclusively, so it is never shared with another writer
+        with open(tmp, mode.replace('w', 'x')) as f:
+            yield f
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _temp_name(path: str) -> str:
+    """Returns unique name of a temporary file next to `path`, which is free to be created. `mkstemp` creates private
+    files, while outputs must get the permissions of new files, so its file only reserves the name"""
+    (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=f'.{os.path.basename(path)}.',
+                                 suffix='.tmp')
+    os.close(fd)
+    os.unlink(tmp)
+    return tmp
+
+
+def save_proof(proof: Proof, path: str, format: str = None):
+    """Writes proof into file with the given format and returns number of bytes written (or 'n/a' for structured
+    formats)"""
+    format = guess_format(path, format)
+    if format in STRUCTURED_FORMATS:
+        with _replacing(path, 'w') as f:
+            dump_structure(proof.structure_serialize(), f, format)
+            metrics.inc('bytes_written_total', (('encoding', 'structure'),), f.tell())
+            return 'n/a'
+    else:
+        data = proof.serialize()
+        with _replacing(path, 'wb') as f:
+            f.write(data)
+        return len(data)
+
+
+def save_proofs(proofs, path: str) -> int:
+    """Writes proofs from an iterable into JSON Lines file as they come, returning number of proofs written"""
+    count = 0
+    with _replacing(path, 'w') as f:
+        for proof in proofs:
+            dump_structure(proof.structure_serialize(), f, 'jsonl')
+            count += 1
+        metrics.inc('bytes_written_total', (('encoding', 'structure'),), f.tell())
+    return count
+
+
+__all__ = [
+    'guess_format',
+    'load_schema',
+    'load_proof',
+    'load_proofs',
+    'save_proof',
+    'save_proofs'
+]
@@ -0,0 +1,230 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Proof history: directed acyclic graph of proofs connected through their `parents`, validated incrementally.
+
+Each proof is validated exactly once, as soon as all of its parents are known and validated, so adding proofs to a
+history validates only the added proofs and their descendants which were waiting for them. Validated proofs are
+kept in the graph only as a compact summary of their seals, which is what their children need for validation.
+
+Proofs do not contain the inputs of their transactions, so the outpoints of the seals closed by a proof may be
+provided along with it. Each of them must be a seal of one of the proof parents, with a type listed in `unseals` of
+the proof type; the number of closed seals of each type must be within the bounds of `unseals`, and for `balance`
+seal types the sum of the closed balances must match the sum of balances sealed by the proof. Without the spent
+outpoints the closed seals are unknown, so only the conditions holding for any of them are checked: parents must
+have enough seals of each unsealed type, and the proof can't seal more balance than its parents have."""
+
+from enum import Enum
+
+import bitcoin.segwit_addr as bech32
+
+from .data_types import OutPoint
+from .schema.schema import Schema, SchemaError
+from .schema.seal_type import SealType
+from .proofs.proof import Proof, ProofFormat
+from .proofs.errors import ProofValidationError
+
+
+class HistoryNode:
+    class Status(Enum):
+        pending = 0
+        valid = 1
+        invalid = 2
+
+    __slots__ = ['id', 'type_no', 'parents', 'waiting', 'status', 'error', 'seals', 'outpoints', 'spent', 'proof']
+
+    def __init__(self, proof_id: bytes, proof: Proof, spent=None):
+        self.id = proof_id
+        self.type_no = proof.type_no
+        self.parents = list(dict.fromkeys(parent.bytes for parent in proof.parents or []))
+        # Number of parents which are not validated yet
+        self.waiting = 0
+        self.status = HistoryNode.Status.pending
+        self.error = None
+        # Summary of the proof seals: seal type number -> (number of seals, sum of balances)
+        self.seals = None
+        # Seals with known outpoints: (txid, vout) -> (seal type number, balance)
+        self.outpoints = None
+        # Outpoints of the seals closed by the proof, as (txid, vout) pairs, or `None` if they are unknown
+        self.spent = [_outpoint(outpoint) for outpoint in spent] if spent is not None else None
+        self.proof = proof
+
+
+def _outpoint(outpoint) -> tuple:
+    outpoint = outpoint if isinstance(outpoint, OutPoint) else OutPoint(outpoint)
+    if outpoint.txid is None:
+        raise ValueError('spent outpoints must be full outpoints with txid')
+    return outpoint.txid, outpoint.vout
+
+
+class History:
+    """Proof history for a single schema"""
+
+    __slots__ = ['schema', 'nodes', 'waiting', 'order', 'keep_proofs']
+
+    def __init__(self, schema: Schema, keep_proofs: bool = False):
+        if not isinstance(schema, Schema):
+            raise ValueError(f'`schema` parameter must be of Schema type; got `{schema}` instead')
+        self.schema = schema
+        self.nodes = {}
+        # Parent proof id -> list of ids of proofs waiting for the parent to be validated
+        self.waiting = {}
+        # Ids of validated (both valid and invalid) proofs in topological order
+        self.order = []
+        self.keep_proofs = keep_proofs
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, proof_id: bytes) -> bool:
+        return proof_id in self.nodes
+
+    def add(self, proof: Proof, spent=None) -> list:
+        """Adds proof to the history and validates it (and its descendants waiting for it) if all of its parents
+        are already validated. `spent` are outpoints (`OutPoint`s or `txid:vout` strings) of the seals closed by the
+        proof, if they are known. Returns list of nodes validated during the call, in topological order"""
+        if proof.schema_obj is not self.schema:
+            proof.resolve_schema(self.schema)
+        proof_id = proof.GetHash()
+        if proof_id in self.nodes:
+            return []
+
+        node = HistoryNode(proof_id, proof, spent)
+        self.nodes[proof_id] = node
+        for parent_id in node.parents:
+            parent = self.nodes.get(parent_id)
+            if parent is None or parent.status is HistoryNode.Status.pending:
+                node.waiting += 1
+                self.waiting.setdefault(parent_id, []).append(proof_id)
+
+        return self._resolve(node) if node.waiting == 0 else []
+
+    def extend(self, proofs, spent: dict = None) -> int:
+        """Adds all proofs from an iterable, returning number of validated proofs; `spent` maps proof ids (as
+        `bytes`) to the outpoints they spend"""
+        return sum(len(self.add(proof, spent.get(proof.GetHash()) if spent is not None else None))
+                   for proof in proofs)
+
+    def _resolve(self, node: HistoryNode) -> list:
+        resolved = []
+        queue = [node]
+        while len(queue) > 0:
+            node = queue.pop()
+            self._validate(node)
+            self.order.append(node.id)
+            resolved.append(node)
+            for child_id in self.waiting.pop(node.id, []):
+                child = self.nodes[child_id]
+                child.waiting -= 1
+                if child.waiting == 0:
+                    queue.append(child)
+        return resolved
+
+    def _validate(self, node: HistoryNode):
+        proof = node.proof
+        try:
+            proof.validate()
+            if proof.format is not ProofFormat.root and len(node.parents) == 0:
+                raise ProofValidationError('non-root proof must have parents')
+            for parent_id in node.parents:
+                if self.nodes[parent_id].status is not HistoryNode.Status.valid:
+                    raise ProofValidationError(f'parent proof `{bech32.encode("pf", 1, parent_id)}` is invalid')
+            seals = {}
+            outpoints = {}
+            for seal in proof.seals:
+                state = seal.state if isinstance(seal.state, int) else 0
+                (count, balance) = seals.get(seal.type_no, (0, 0))
+                seals[seal.type_no] = (count + 1, balance + state)
+                txid = seal.outpoint.txid if seal.outpoint.txid is not None else \
+                    proof.txid.bytes if proof.txid is not None else None
+                if txid is not None:
+                    outpoints[(txid, seal.outpoint.vout)] = (seal.type_no, state)
+            parents = [self.nodes[parent_id] for parent_id in node.parents]
+            if node.spent is not None:
+                self._validate_spent(proof, parents, node.spent, seals)
+            else:
+                self._validate_unseals(proof, parents, seals)
+        except (ProofValidationError, SchemaError) as err:
+            node.status = HistoryNode.Status.invalid
+            node.error = str(err)
+        else:
+            node.status = HistoryNode.Status.valid
+            node.seals = seals
+            node.outpoints = outpoints
+        if not self.keep_proofs:
+            node.proof = None
+
+    def _validate_spent(self, proof: Proof, parents: list, spent: list, seals: dict):
+        unseals = {ref.type_pos: ref for ref in proof.proof_type.unseals or []}
+        closed = {}
+        for outpoint in dict.fromkeys(spent):
+            seal = next((parent.outpoints[outpoint] for parent in parents if outpoint in parent.outpoints), None)
+            if seal is None:
+                raise ProofValidationError(f'closed seal `{outpoint[0].hex()}:{outpoint[1]}` is not defined by '
+                                           'the proof parents')
+            (type_no, state) = seal
+            if type_no not in unseals:
+                raise ProofValidationError(f'proof of type `{proof.type_name}` can\'t close seal '
+                                           f'`{outpoint[0].hex()}:{outpoint[1]}` of type '
+                                           f'`{self.schema.seal_types[type_no].name}`')
+            (count, balance) = closed.get(type_no, (0, 0))
+            closed[type_no] = (count + 1, balance + state)
+
+        for ref in unseals.values():
+            (count, balance) = closed.get(ref.type_pos, (0, 0))
+            if count < ref.bounds.min() or count > ref.bounds.max():
+                raise ProofValidationError(f'proof of type `{proof.type_name}` must close {ref.bounds.name} seal(s) '
+                                           f'of type `{ref.ref_name}`; it closes {count} of them')
+            if ref.type.type is SealType.Type.balance and seals.get(ref.type_pos, (0, 0))[1] != balance:
+                raise ProofValidationError(f'balance of `{ref.ref_name}` seals is not conserved: {balance} is '
+                                           f'closed, while {seals.get(ref.type_pos, (0, 0))[1]} is sealed')
+
+    def _validate_unseals(self, proof: Proof, parents: list, seals: dict):
+        # -- the closed seals are unknown, so they are checked only against all seals of the parents
+        for ref in proof.proof_type.unseals or []:
+            (count, balance) = (0, 0)
+            for parent in parents:
+                (parent_count, parent_balance) = parent.seals.get(ref.type_pos, (0, 0))
+                count += parent_count
+                balance += parent_balance
+            if count < ref.bounds.min():
+                raise ProofValidationError(f'proof of type `{proof.type_name}` must close {ref.bounds.name} seal(s) '
+                                           f'of type `{ref.ref_name}`; its parents have {count} of them')
+            if ref.type.type is SealType.Type.balance and seals.get(ref.type_pos, (0, 0))[1] > balance:
+                raise ProofValidationError(f'balance of `{ref.ref_name}` seals is not conserved: at most {balance} '
+                                           f'can be closed, while {seals.get(ref.type_pos, (0, 0))[1]} is sealed')
+
+    def status(self, proof_id: bytes):
+        node = self.nodes.get(proof_id)
+        return node.status if node is not None else None
+
+    def valid(self) -> list:
+        return [proof_id for proof_id in self.order if self.nodes[proof_id].status is HistoryNode.Status.valid]
+
+    def invalid(self) -> list:
+        return [self.nodes[proof_id] for proof_id in self.order
+                if self.nodes[proof_id].status is HistoryNode.Status.invalid]
+
+    def pending(self) -> list:
+        return [node for node in self.nodes.values() if node.status is HistoryNode.Status.pending]
+
+    def missing(self) -> set:
+        """Returns ids of parent proofs which are referenced, but were not added to the history"""
+        return set(parent_id for parent_id in self.waiting.keys() if parent_id not in self.nodes)
+
+
+__all__ = [
+    'HistoryNode',
+    'History'
+]
@@ -0,0 +1,227 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Incremental transcoding: manifest of processed proof files and watching of their directories for changes.
+
+`Manifest` records for each input file the hashes of its content and of the output it was transcoded into, the id of
+the schema and the digest of the proof type used (see `proof_type_digests`). An input is processed again only if it,
+or its output, were changed since, or if the definition of its proof type was changed by a new schema version. File
+size and modification time are recorded as well, so unchanged files are not even read."""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+
+from bitcoin.core.serialize import VarIntSerializer
+
+from .schema.schema import Schema
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _stat(path: str):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def proof_type_digests(schema: Schema) -> dict:
+    """Returns proof type name -> digest of everything in the schema affecting transcoding of the proofs of this type:
+    proof type number and definition along with the definitions of field and seal types it references"""
+    digests = {}
+    for (no, proof_type) in enumerate(schema.proof_types):
+        digest = hashlib.sha256(VarIntSerializer.serialize(no) + proof_type.serialize())
+        for ref in proof_type.fields + proof_type.seals + (proof_type.unseals or []):
+            digest.update(ref.type.serialize())
+        digests.setdefault(proof_type.name, digest.hexdigest())
+    return digests
+
+
+class Manifest:
+    """Input file path -> record of its last successful processing, stored as JSON file"""
+
+    # Manifest format version; manifests of other versions are discarded
+    FORMAT = 1
+
+    __slots__ = ['path', 'entries']
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            # -- broken manifest only makes all the inputs to be processed once again
+            return
+        if data.get('format') == Manifest.FORMAT:
+            self.entries = data['entries']
+
+    def check(self, infile: str, outfile: str, operation: str, schema_id: str, digests: dict):
+        """Returns `None` if the input file was already processed and neither it, nor its output or its proof type
+        were changed since; otherwise returns the state of the input (its stat signature and content hash), which is
+        passed to `update` once the input is processed"""
+        entry = self.entries.get(infile)
+        # -- stat is taken before hashing, so the changes made in between are detected by the next check
+        stat = _stat(infile)
+        if entry is None or entry['output'] != outfile or entry['operation'] != operation:
+            return stat, file_hash(infile)
+        if schema_id != entry['schema'] and digests.get(entry['type']) != entry['type_digest']:
+            return stat, file_hash(infile)
+
+        input_hash = entry['input_hash'] if stat == entry['input_stat'] else file_hash(infile)
+        if input_hash != entry['input_hash']:
+            return stat, input_hash
+        output_stat = _stat(outfile)
+        if output_stat is None:
+            return stat, input_hash
+        if output_stat != entry['output_stat'] and file_hash(outfile) != entry['output_hash']:
+            return stat, input_hash
+        # -- files were touched, but not changed, or schema was changed without affecting the proof type
+        entry.update(input_stat=stat, output_stat=output_stat, schema=schema_id)
+        return None
+
+    def update(self, infile: str, state: tuple, outfile: str, operation: str, schema_id: str, type_name: str,
+               digests: dict):
+        """Records successful processing of the input file in the `state` returned by `check`"""
+        (stat, input_hash) = state
+        output_stat = _stat(outfile)
+        self.entries[infile] = {
+            'input_hash': input_hash, 'input_stat': stat,
+            'output': outfile, 'output_hash': file_hash(outfile), 'output_stat': output_stat,
+            'operation': operation, 'schema': schema_id, 'type': type_name, 'type_digest': digests.get(type_name)
+        }
+
+    def discard(self, infile: str):
+        self.entries.pop(infile, None)
+
+    def prune(self, infiles):
+        """Removes records of the input files which are not among `infiles` anymore"""
+        keep = set(infiles)
+        for infile in [infile for infile in self.entries if infile not in keep]:
+            del self.entries[infile]
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        (fd, tmp) = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'format': Manifest.FORMAT, 'entries': self.entries}, f, indent=1)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify, used as a notification that watched directories were changed"""
+
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    __slots__ = ['fd']
+
+    def __init__(self, dirs):
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(_Inotify.IN_NONBLOCK | _Inotify.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        for directory in dirs:
+            if libc.inotify_add_watch(self.fd, os.fsencode(directory), _Inotify.MASK) < 0:
+                errno = ctypes.get_errno()
+                os.close(self.fd)
+                raise OSError(errno, f'unable to watch `{directory}`')
+
+    def wait(self, timeout: float = None) -> bool:
+        import select
+        (ready, _, _) = select.select([self.fd], [], [], timeout)
+        if len(ready) == 0:
+            return False
+        try:
+            while os.read(self.fd, 1 << 16):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher:
+    """Waits for changes of files in the watched directories with inotify (on Linux) or, where it is not available,
+    by polling `snapshot` function returning stat signatures of the files every `interval` seconds"""
+
+    # Time to wait after the first change for the following ones (editors often save files in several steps)
+    SETTLE = 0.2
+
+    __slots__ = ['snapshot', 'interval', 'inotify', 'last']
+
+    def __init__(self, dirs, snapshot, interval: float = 1.0):
+        self.snapshot = snapshot
+        self.interval = interval
+        try:
+            self.inotify = _Inotify(dirs)
+        except (OSError, AttributeError):
+            # -- `AttributeError` is raised by ctypes on systems which libc has no inotify functions
+            self.inotify = None
+        self.last = snapshot()
+
+    def wait(self):
+        """Blocks until watched files are changed"""
+        while True:
+            if self.inotify is not None:
+                self.inotify.wait()
+                time.sleep(Watcher.SETTLE)
+                self.inotify.wait(0)
+            else:
+                time.sleep(self.interval)
+            current = self.snapshot()
+            if current != self.last:
+                self.last = current
+                return
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+
+
+__all__ = [
+    'file_hash',
+    'proof_type_digests',
+    'Manifest',
+    'Watcher'
+]
@@ -0,0 +1,157 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Operational metrics: process-wide counters of decoded and encoded proofs, bytes, seals, metadata fields and errors.
+
+Counters are always on; they are plain integers in a dict updated once per proof (seals and fields are summed up per
+proof before being added), so they are cheap enough for hot paths. Counters are exported in Prometheus text format,
+suitable for node_exporter textfile collector, or as JSON with `write`; `Flusher` writes them periodically from
+long-running processes."""
+
+import os
+import json
+import time
+import threading
+
+PREFIX = 'rgbconvert_'
+
+# Metric name -> help text; all metrics are counters
+METRICS = {
+    'proofs_decoded_total': 'Proofs decoded, by proof format and encoding (binary or structure)',
+    'proofs_encoded_total': 'Proofs encoded, by proof format and encoding (binary or structure)',
+    'bytes_read_total': 'Bytes of proofs decoded, by encoding',
+    'bytes_written_total': 'Bytes of proofs encoded, by encoding',
+    'seals_total': 'Seals of proofs resolved against schema, by seal type',
+    'fields_total': 'Metadata field values of proofs resolved against schema, by field type',
+    'errors_total': 'Parse, schema and validation errors, by error class and kind',
+    'result_cache_total': 'Result cache lookups, by operation (transcode or validate) and result (hit or miss)',
+}
+
+# (metric name, tuple of (label, value) pairs) -> counter value
+_counters = {}
+_lock = threading.Lock()
+
+
+def inc(name: str, labels: tuple = (), value: int = 1):
+    key = (name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def add(name: str, label: str, counts: dict):
+    """Adds label value -> count pairs to the counters of `name` metric at once"""
+    with _lock:
+        for value, count in counts.items():
+            key = (name, ((label, value),))
+            _counters[key] = _counters.get(key, 0) + count
+
+
+def count_error(err: Exception, kind: str = None):
+    inc('errors_total', (('error', type(err).__name__), ('kind', kind if kind is not None else '')))
+
+
+def snapshot() -> dict:
+    """Returns metric name -> list of `{"labels": {...}, "value": ...}` dicts"""
+    with _lock:
+        items = sorted(_counters.items())
+    data = {}
+    for (name, labels), value in items:
+        data.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+    return data
+
+
+def merge(data: dict):
+    """Adds counters from a `snapshot` of another process (like a batch worker)"""
+    with _lock:
+        for name, samples in data.items():
+            for sample in samples:
+                key = (name, tuple(sorted(sample['labels'].items())))
+                _counters[key] = _counters.get(key, 0) + sample['value']
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def prometheus_text() -> str:
+    lines = []
+    for name, samples in snapshot().items():
+        lines.append(f'# HELP {PREFIX}{name} {METRICS.get(name, name)}')
+        lines.append(f'# TYPE {PREFIX}{name} counter')
+        for sample in samples:
+            labels = ','.join(f'{label}="{_escape(str(value))}"' for label, value in sample['labels'].items())
+            lines.append(f'{PREFIX}{name}{{{labels}}} {sample["value"]}' if labels else
+                         f'{PREFIX}{name} {sample["value"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def write(path: str, format: str = None):
+    """Writes counters into file in `prometheus` or `json` format (guessed by `.json` extension if not given). The file
+    is replaced atomically, so collectors never read a partially written one"""
+    if format is None:
+        format = 'json' if path.lower().endswith('.json') else 'prometheus'
+    if format == 'json':
+        content = json.dumps({'time': time.time(), 'counters': snapshot()}, indent=2) + '\n'
+    elif format == 'prometheus':
+        content = prometheus_text()
+    else:
+        raise ValueError(f'unknown metrics format `{format}`; accepted values are prometheus, json')
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(content)
+    os.replace(tmp, path)
+
+
+class Flusher:
+    """Writes counters into file not more often than once per `interval` seconds"""
+
+    __slots__ = ['path', 'interval', 'last']
+
+    def __init__(self, path: str, interval: float = 15.0):
+        self.path = path
+        self.interval = interval
+        self.last = time.monotonic()
+
+    def flush(self):
+        write(self.path)
+        self.last = time.monotonic()
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last >= self.interval:
+            self.flush()
+
+    async def run(self):
+        """Flushes counters every `interval` seconds until cancelled"""
+        import asyncio
+        while True:
+            await asyncio.sleep(self.interval)
+            self.flush()
+
+
+__all__ = [
+    'inc',
+    'add',
+    'count_error',
+    'snapshot',
+    'merge',
+    'reset',
+    'prometheus_text',
+    'write',
+    'Flusher'
+]
@@ -14,6 +14,8 @@
 
 from enum import Enum, unique
 
+from .. import metrics
+
 
 class FieldParseError(Exception):
     """Errors raised due to incomplete or misstructured fields in source file (YAML etc)"""
@@ -31,6 +33,7 @@ class FieldParseError(Exception):
         self.kind = kind
         self.field_name = field_name
         self.details = details
+        metrics.count_error(self, kind.name)
 
     def __str__(self):
         msg = f"Unable to parse field `{self.field_name}`: {self.kind.value}"
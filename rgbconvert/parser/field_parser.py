@@ -41,7 +41,8 @@ class FieldParser:
         """Assigns a value of a proper type from the `kwargs` and returns whether the required field was presented"""
 
         parsed = None
-        if field_name in kwargs:
+        # -- explicit `null` values of non-required fields (like the ones written by YAML serializer) mean absent field
+        if field_name in kwargs and (kwargs[field_name] is not None or self.required):
             val = kwargs[field_name]
         elif self.required:
             raise FieldParseError(FieldParseError.Kind.noRequiredField, field_name)
@@ -51,15 +52,16 @@ class FieldParser:
 
         if self.array:
             if isinstance(val, list):
-                parsed = [self.field_type(**item) for item in val]
+                # -- scalar items (like hex-encoded ids of the proof parents) are passed as they are
+                parsed = [item if isinstance(item, self.field_type) else
+                          self.field_type(**item) if isinstance(item, dict) else self.field_type(item) for item in val]
             elif isinstance(val, dict):
                 parsed = []
                 for name, data in val.items():
                     if isinstance(data, dict):
                         v = self.field_type(name, **data)
-                    elif isinstance(data, list):
-                        v = self.field_type(name, *data)
                     else:
+                        # -- list values (like the ones of repeated metadata fields) are passed as they are
                         v = self.field_type(name, data)
                     parsed.append(v)
             else:
@@ -12,12 +12,19 @@
 # along with this software.
 # If not, see <https://opensource.org/licenses/MIT>.
 
+from .errors import ProofValidationError
 from .meta_field import MetaField
 from .seal import Seal
 from .proof import Proof
+from .lazy_proof import LazyProof
+from .compact import InternPool, CompactProof
 
 __all__ = [
+    'ProofValidationError',
     'MetaField',
     'Seal',
-    'Proof'
+    'Proof',
+    'LazyProof',
+    'InternPool',
+    'CompactProof'
 ]
\ No newline at end of file
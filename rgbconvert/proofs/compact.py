@@ -0,0 +1,149 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Compact in-memory records of proofs for workloads keeping large numbers of decoded proofs (like indexers).
+
+`CompactProof` holds seals as arrays of their type numbers and outputs, sealed state and metadata in their consensus
+serialization and parent ids as a single byte string, so a proof takes a fixed number of objects regardless of the
+number of its seals, fields and parents. Transaction ids and schema ids, which are shared by many proofs, are
+de-duplicated through an `InternPool` provided by the caller, which owns it along with the records: the pool keeps all
+the ids added to it until it is cleared or dropped."""
+
+from array import array
+
+from bitcoin.core.serialize import ImmutableSerializable
+
+from ..consensus import BufferWriter
+from ..data_types import Hash256Id, OutPoint, PubKey
+from ..schema.schema import Schema, SchemaError
+from .seal import Seal
+from .proof import Proof, ProofFormat
+
+
+class InternPool:
+    """Pool of shared transaction ids (as `bytes`) and schema ids (as `Hash256Id`): equal values added to the pool
+    are replaced with the same object"""
+
+    __slots__ = ['txids', 'ids']
+
+    def __init__(self):
+        self.txids = {}
+        self.ids = {}
+
+    def txid(self, txid):
+        if txid is None:
+            return None
+        return self.txids.setdefault(txid, txid)
+
+    def hash_id(self, value: Hash256Id):
+        if value is None:
+            return None
+        return self.ids.setdefault(value.bytes, value)
+
+    def clear(self):
+        self.txids.clear()
+        self.ids.clear()
+
+    def __len__(self):
+        return len(self.txids) + len(self.ids)
+
+
+class CompactProof(ImmutableSerializable):
+    """Compact record of a proof, which is converted from and to `Proof` with `from_proof` and `to_proof`.
+
+    Seals are kept as `seal_types` and `vouts` arrays together with `txids` tuple of (interned) transaction ids, which
+    is `None` if none of the seals has a txid. Sealed state and metadata are kept consensus-serialized, so schema is
+    required only for decoding them back with `to_proof`; the record itself is serialized without a schema."""
+
+    __slots__ = ['ver', 'format', 'schema', 'network', 'root', 'type_no', 'seal_types', 'vouts', 'txids', 'state',
+                 'metadata', 'pubkey', 'txid', 'parents']
+
+    @classmethod
+    def from_proof(cls, proof: Proof, pool: InternPool = None):
+        """Converts proof read from consensus-serialized data or resolved against a schema into a compact record.
+        Ids are shared with other records only through the given `pool`; without it, they are de-duplicated within
+        the proof only"""
+        if pool is None:
+            pool = InternPool()
+        if proof.type_no is None:
+            raise SchemaError('compact proof record requires proof type number, so proof must be resolved against '
+                              'a schema')
+        seals = proof.seals
+        if any(seal.type_no is None for seal in seals):
+            raise SchemaError('compact proof record requires seal type numbers, so proof must be resolved against '
+                              'a schema')
+
+        record = cls.__new__(cls)
+        txids = tuple(pool.txid(seal.outpoint.txid) for seal in seals)
+        set_attr = object.__setattr__
+        set_attr(record, 'ver', proof.ver)
+        set_attr(record, 'format', proof.format)
+        set_attr(record, 'schema', pool.hash_id(proof.schema))
+        set_attr(record, 'network', proof.network)
+        set_attr(record, 'root', proof.root)
+        set_attr(record, 'type_no', proof.type_no)
+        set_attr(record, 'seal_types', array('H', [seal.type_no for seal in seals]))
+        set_attr(record, 'vouts', array('I', [seal.outpoint.vout for seal in seals]))
+        set_attr(record, 'txids', txids if any(txid is not None for txid in txids) else None)
+        # -- proofs read from binary data keep their raw state and metadata, others are encoded with the schema
+        set_attr(record, 'state', CompactProof._section(proof, proof.state, proof._write_state))
+        set_attr(record, 'metadata', CompactProof._section(proof, proof.metadata, proof._write_metadata))
+        set_attr(record, 'pubkey', proof.pubkey.data if proof.pubkey is not None else None)
+        set_attr(record, 'txid', pool.txid(proof.txid.bytes) if proof.txid is not None else None)
+        set_attr(record, 'parents', b''.join(parent.bytes for parent in proof.parents)
+                 if proof.parents is not None else None)
+        return record
+
+    @staticmethod
+    def _section(proof: Proof, raw, write) -> bytes:
+        if raw is not None:
+            # -- raw data may be a view of a large buffer, which must not be kept alive by the record
+            return bytes(raw)
+        f = BufferWriter()
+        write(f)
+        return f.getvalue()
+
+    def outpoints(self):
+        """Yields outpoints of the proof seals"""
+        txids = self.txids if self.txids is not None else [None] * len(self.vouts)
+        for txid, vout in zip(txids, self.vouts):
+            yield OutPoint.from_raw(txid, vout)
+
+    def parent_ids(self) -> list:
+        if self.parents is None:
+            return None
+        parents = self.parents
+        return [Hash256Id.from_raw(parents[pos:pos + 32]) for pos in range(0, len(parents), 32)]
+
+    def to_proof(self, schema_obj: Schema = None, compiled=None) -> Proof:
+        """Restores full proof; unless `schema_obj` is provided, the proof is left unresolved, like the ones read with
+        `Proof.from_buffer` without schema"""
+        seals = [Seal(outpoint=outpoint, type_no=type_no) for outpoint, type_no in zip(self.outpoints(),
+                                                                                      self.seal_types)]
+        proof = Proof(type_no=self.type_no, fields=None, seals=seals, ver=self.ver, format=self.format,
+                      schema=self.schema, network=self.network, root=self.root, state=self.state,
+                      metadata=self.metadata, pubkey=PubKey.from_raw(self.pubkey) if self.pubkey is not None else None,
+                      txid=Hash256Id.from_raw(self.txid) if self.txid is not None else None,
+                      parents=self.parent_ids())
+        if schema_obj is not None:
+            proof.resolve_schema(schema_obj, compiled)
+        return proof
+
+    @classmethod
+    def stream_deserialize(cls, f, **kwargs):
+        (proof, _) = Proof.from_buffer(f.read())
+        return cls.from_proof(proof, kwargs.get('pool'))
+
+    def stream_serialize(self, f, **kwargs):
+        self.to_proof().stream_serialize(f)
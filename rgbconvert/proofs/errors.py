@@ -0,0 +1,26 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+from .. import metrics
+
+
+class ProofValidationError(Exception):
+    __slots__ = ['description']
+
+    def __init__(self, description: str):
+        self.description = description
+        metrics.count_error(self)
+
+    def __str__(self):
+        return self.description
@@ -0,0 +1,124 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+from ..consensus import BufferReader
+from ..schema.schema import Schema, SchemaError
+from .proof import Proof, ProofFormat
+
+
+class LazyProof(Proof):
+    """Proof read from consensus-serialized data, which decodes only its header (version, schema id, network, root,
+    proof type, public key and pruned data) right away. Seal sequence, sealed state and metadata are kept as raw
+    byte ranges of the source buffer and are decoded on the first access to `seals` or `fields` attributes.
+
+    Lazy proofs are re-serialized from the raw bytes they were read from, so neither serialization nor `GetHash`
+    requires decoding seals or metadata. Like with `Proof.from_buffer`, the source buffer must stay open while the
+    proof is used.
+    """
+
+    LAZY = ['seals', 'fields']
+
+    __slots__ = ['raw', 'raw_seals', 'compiled']
+
+    @classmethod
+    def from_buffer(cls, buf, offset: int = 0, schema_obj: Schema = None, size: int = None, compiled=None):
+        """Reads lazy proof from the buffer; returns the proof and the number of bytes consumed
+        (see `Proof.from_buffer`)"""
+        if schema_obj is not None and not isinstance(schema_obj, Schema):
+            raise ValueError(f'`schema_obj` parameter must be of Schema type; got `{schema_obj}` instead')
+        reader = BufferReader(buf, offset, size)
+
+        header = Proof._read_header(reader)
+        # - seals are not parsed, we just find where their sequence ends
+        seals_start = reader.tell()
+        if Proof._read_seals(reader, skip=True) == 0:
+            header['format'] = ProofFormat.burn
+        raw_seals = reader.view[seals_start:reader.tell()]
+        state = reader.read_varbytes_view()
+        metadata = reader.read_varbytes_view()
+        trailer = Proof._read_trailer(reader)
+
+        proof = cls.__new__(cls)
+        [object.__setattr__(proof, attr, value) for attr, value in header.items()]
+        [object.__setattr__(proof, attr, value) for attr, value in trailer.items()]
+        object.__setattr__(proof, 'type_name', None)
+        object.__setattr__(proof, 'proof_type', None)
+        object.__setattr__(proof, 'schema_obj', None)
+        object.__setattr__(proof, 'state', state)
+        object.__setattr__(proof, 'metadata', metadata)
+        object.__setattr__(proof, 'raw', reader.view[offset:reader.tell()])
+        object.__setattr__(proof, 'raw_seals', raw_seals)
+        object.__setattr__(proof, 'compiled', compiled)
+
+        if schema_obj is not None:
+            proof.resolve_schema(schema_obj)
+
+        return proof, reader.tell() - offset
+
+    @classmethod
+    def stream_deserialize(cls, f, **kwargs):
+        (proof, _) = cls.from_buffer(f.read(), schema_obj=kwargs.get('schema_obj'), compiled=kwargs.get('compiled'))
+        return proof
+
+    def __getattr__(self, name):
+        # -- called only for the slots which were not assigned yet, i.e. for the parts which were not decoded
+        if name == 'seals':
+            self._decode_seals()
+        elif name == 'fields':
+            self._decode_fields()
+        else:
+            raise AttributeError(f'`{type(self).__name__}` object has no attribute `{name}`')
+        return object.__getattribute__(self, name)
+
+    def is_decoded(self, name: str) -> bool:
+        """Checks whether lazy part (`seals` or `fields`) of the proof was already decoded"""
+        try:
+            object.__getattribute__(self, name)
+        except AttributeError:
+            return False
+        return True
+
+    def resolve_schema(self, schema: Schema, compiled=None):
+        if not isinstance(schema, Schema):
+            raise ValueError(f'`schema` parameter must be of Schema type; got `{schema}` instead')
+        object.__setattr__(self, 'schema_obj', schema)
+        if compiled is not None:
+            object.__setattr__(self, 'compiled', compiled)
+
+        self.resolve_schema_refs(schema.proof_types, schema.proof_type_index)
+        if self.proof_type is None:
+            raise SchemaError(f'the provided schema `{schema.name}` does not define proof type `{self.type_name}` '
+                              f'or type with index number {self.type_no}')
+
+        # -- parts decoded with the previous schema (if any) will be decoded once again
+        for name in LazyProof.LAZY:
+            if self.is_decoded(name):
+                object.__delattr__(self, name)
+
+    def _decode_seals(self):
+        seals = Proof._read_seals(BufferReader(self.raw_seals))
+        if self.schema_obj is not None:
+            [seal.resolve_schema(self.schema_obj) for seal in seals]
+            self._parse_state(seals, self.compiled)
+        object.__setattr__(self, 'seals', seals)
+
+    def _decode_fields(self):
+        if self.proof_type is None:
+            object.__setattr__(self, 'fields', None)
+            return
+        self._parse_metadata(self.compiled)
+
+    def serialize_into(self, f, **kwargs):
+        f.write(self.raw)
+        return f
@@ -14,6 +14,7 @@
 
 from bitcoin.core.serialize import ImmutableSerializable
 
+from ..consensus.buffer import BufferReader
 from ..parser import *
 from ..schema.schema import Schema
 from ..schema.errors import SchemaError
@@ -35,33 +36,61 @@ class MetaField(ImmutableSerializable, StructureSerializable):
         if isinstance(schema_obj, Schema):
             self.resolve_schema(schema_obj)
 
+    @classmethod
+    def from_value(cls, field_type, value):
+        """Constructs field for an already typed value (like the one read from consensus-serialized data) of the
+        given schema field type, bypassing structured data parsing and schema resolution"""
+        field = cls.__new__(cls)
+        object.__setattr__(field, 'type_name', field_type.name)
+        object.__setattr__(field, 'value', value)
+        object.__setattr__(field, 'str_value', value)
+        object.__setattr__(field, 'field_type', field_type)
+        return field
+
     def resolve_schema(self, schema: Schema):
         if not isinstance(schema, Schema):
             raise ValueError(f'`schema` parameter must be of Schema type; got `{schema}` instead')
 
-        self.resolve_schema_refs(schema.field_types)
+        self.resolve_schema_refs(schema.field_types, schema.field_type_index)
         if self.field_type is None:
             raise SchemaError(f'the provided schema `{schema.name}` does not define field type `{self.type_name}`')
 
         value = self.field_type.value_from_str(self.str_value)
         object.__setattr__(self, 'value', value)
 
-    def resolve_schema_refs(self, field_types: list):
-        try:
-            pos = next(num for num, type in enumerate(field_types) if type.name == self.type_name)
-            object.__setattr__(self, 'field_type', field_types[pos])
-        except StopIteration:
-            object.__setattr__(self, 'field_type', None)
+    def resolve_schema_refs(self, field_types: list, index: dict = None):
+        if index is not None:
+            pos = index.get(self.type_name)
+        else:
+            pos = next((num for num, type in enumerate(field_types) if type.name == self.type_name), None)
+        object.__setattr__(self, 'field_type', field_types[pos] if pos is not None else None)
+        if pos is not None:
+            # -- names read from structured data are replaced with the schema ones, so they are not duplicated
+            object.__setattr__(self, 'type_name', field_types[pos].name)
 
-    def parse_field(self, metadata: bytes, pos: int) -> int:
+    def parse_field(self, metadata, pos: int) -> int:
         if self.field_type is None:
             raise SchemaError("can't parse field value from metadata without knowing `field_type` of the field")
-        value, shift = self.field_type.value_from_blob(metadata[pos:-1])
+        reader = BufferReader(metadata, pos)
+        value = self.field_type.stream_deserialize_value(reader)
         object.__setattr__(self, 'value', value)
-        return pos + shift
+        object.__setattr__(self, 'str_value', value)
+        return reader.tell()
 
     def structure_serialize(self, **kwargs) -> dict:
-        return {self.type_name: self.value}
+        return {self.type_name: MetaField._structure_value(self.value)}
+
+    @staticmethod
+    def _structure_value(value):
+        # -- typed values are converted into the strings `FieldType.value_from_str` accepts, so structured data may
+        #    be written with JSON or safe YAML dumpers
+        if isinstance(value, list):
+            return [MetaField._structure_value(item) for item in value]
+        elif isinstance(value, StructureSerializable):
+            return value.structure_serialize()
+        elif isinstance(value, bytes):
+            return value.hex()
+        return value
 
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
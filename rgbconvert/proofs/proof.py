@@ -12,12 +12,11 @@
 # along with this software.
 # If not, see <https://opensource.org/licenses/MIT>.
 
-from io import BytesIO
 from enum import unique
-from functools import reduce
 
 from bitcoin.core.serialize import Serializable, ImmutableSerializable, \
-                                   VectorSerializer, VarIntSerializer, BytesSerializer, ser_read
+                                   VectorSerializer, VarIntSerializer
+from bitcoin.core import Hash
 import bitcoin.segwit_addr as bech32
 
 from ..consensus import *
@@ -26,6 +25,11 @@ from ..parser import *
 from ..proofs.meta_field import MetaField
 from ..proofs.seal import Seal
 from ..schema.schema import Schema, SchemaError
+from ..schema.seal_type import SealType
+from ..schema.type_ref import TypeRef
+from .errors import ProofValidationError
+from ..schema import compiler
+from .. import timing, metrics
 
 
 @unique
@@ -60,6 +64,7 @@ class Proof(ImmutableSerializable):
                 raise AttributeError('constructing proof requires providing type id')
             object.__setattr__(self, 'type_no', type_no)
             object.__setattr__(self, 'type_name', None)
+            object.__setattr__(self, 'proof_type', None)
             object.__setattr__(self, 'fields', None)
             object.__setattr__(self, 'state', None)
             object.__setattr__(self, 'metadata', None)
@@ -67,8 +72,9 @@ class Proof(ImmutableSerializable):
             object.__setattr__(self, 'schema_obj', schema_obj)
             return
 
-        for name, field in Proof.FIELDS.items():
-            field.parse(self, kwargs, name)
+        with timing.span('proof.parse_fields'):
+            for name, field in Proof.FIELDS.items():
+                field.parse(self, kwargs, name)
 
         for field in ['ver', 'schema', 'network', 'root']:
             val = object.__getattribute__(self, field)
@@ -89,16 +95,20 @@ class Proof(ImmutableSerializable):
         object.__setattr__(self, 'type_no', None)
         object.__setattr__(self, 'state', None)
         object.__setattr__(self, 'metadata', None)
+        object.__setattr__(self, 'schema_obj', None)
+        object.__setattr__(self, 'proof_type', None)
+        metrics.inc('proofs_decoded_total', (('encoding', 'structure'), ('format', self.format.name)))
 
         if isinstance(schema_obj, Schema):
             self.resolve_schema(schema_obj)
 
-    def resolve_schema(self, schema: Schema):
+    @timing.timed('proof.resolve_schema')
+    def resolve_schema(self, schema: Schema, compiled=None):
         object.__setattr__(self, 'schema_obj', schema)
         if not isinstance(schema, Schema):
             raise ValueError(f'`schema` parameter must be of Schema type; got `{schema}` instead')
 
-        self.resolve_schema_refs(schema.proof_types)
+        self.resolve_schema_refs(schema.proof_types, schema.proof_type_index)
         if self.proof_type is None:
             raise SchemaError(f'the provided schema `{schema.name}` does not define proof type `{self.type_name}` '
                               f'or type with index number {self.type_no}')
@@ -109,41 +119,81 @@ class Proof(ImmutableSerializable):
         else:
             object.__setattr__(self, 'fields', [])
 
+        present = {}
+        for field in self.fields:
+            present.setdefault(field.type_name, field)
         fields = []
         for field_ref in self.proof_type.fields:
-            field = field_ref.type
-            try:
-                pos = next(num for num, f in enumerate(self.fields) if f.type_name == field.name)
-                fields.append(self.fields[pos])
-            except:
-                fields.append(MetaField(type_name=field.name, value=None, schema_obj=schema))
+            name = field_ref.type.name
+            field = present.get(name)
+            fields.append(field if field is not None else MetaField(type_name=name, value=None, schema_obj=schema))
         object.__setattr__(self, 'fields', fields)
 
         if self.state is not None:
-            self._parse_data_with_schema()
+            self._parse_data_with_schema(compiled)
+        self._count_metrics()
 
-    def resolve_schema_refs(self, proof_types: list):
+    def _count_metrics(self):
+        """Adds seals and metadata field values of the resolved proof to the operational metrics"""
+        seals = {}
+        for seal in self.seals:
+            name = seal.seal_type.name
+            seals[name] = seals.get(name, 0) + 1
+        fields = {}
+        for field_ref, field in zip(self.proof_type.fields, self.fields):
+            if field.value is not None:
+                name = field_ref.type.name
+                fields[name] = fields.get(name, 0) + (len(field.value) if isinstance(field.value, list) else 1)
+        metrics.add('seals_total', 'type', seals)
+        metrics.add('fields_total', 'type', fields)
+
+    def resolve_schema_refs(self, proof_types: list, index: dict = None):
         try:
             proof_type = proof_types[self.type_no]
             object.__setattr__(self, 'type_name', proof_type.name)
         except:
-            try:
-                pos = next(num for num, type in enumerate(proof_types) if type.name == self.type_name)
-                proof_type = proof_types[pos]
+            if index is not None:
+                pos = index.get(self.type_name)
+            else:
+                pos = next((num for num, type in enumerate(proof_types) if type.name == self.type_name), None)
+            proof_type = proof_types[pos] if pos is not None else None
+            if pos is not None:
                 object.__setattr__(self, 'type_no', pos)
-            except StopIteration:
-                proof_type = None
+                # -- names read from structured data are replaced with the schema ones, so they are not duplicated
+                object.__setattr__(self, 'type_name', proof_type.name)
 
         object.__setattr__(self, 'proof_type', proof_type)
 
-    def _parse_data_with_schema(self):
-        [seal.resolve_schema(self.schema_obj) for seal in self.seals]
+    def _parse_data_with_schema(self, compiled=None):
+        self._parse_state(self.seals, compiled)
+        self._parse_metadata(compiled)
+
+    @timing.timed('proof.parse_state')
+    def _parse_state(self, seals: list, compiled=None):
+        if compiled is None:
+            compiled = compiler.enabled
+        if compiled:
+            codec = self.proof_type.codec()
+            states = codec.decode_state(self.state, [seal.type_no for seal in seals])
+            [object.__setattr__(seal, 'state', state) for seal, state in zip(seals, states)]
+            return
 
         pos = 0
-        for seal in self.seals:
+        for seal in seals:
             pos = seal.parse_state_from_blob(self.state, pos)
 
-        f = BytesIO(self.metadata)
+    @timing.timed('proof.parse_metadata')
+    def _parse_metadata(self, compiled=None):
+        if compiled is None:
+            compiled = compiler.enabled
+        if compiled:
+            values = self.proof_type.codec().decode_metadata(self.metadata)
+            fields = [MetaField.from_value(field_ref.type, value)
+                      for field_ref, value in zip(self.proof_type.fields, values)]
+            object.__setattr__(self, 'fields', fields)
+            return
+
+        f = BufferReader(self.metadata)
         fields = []
         field_no = 0
         for field_ref in self.proof_type.fields:
@@ -154,28 +204,92 @@ class Proof(ImmutableSerializable):
 
         object.__setattr__(self, 'fields', fields)
 
-        left = f.read()
-        if len(left) != 0:
-            raise SchemaError(f'Not all metadata bytes were consumed during deserialization, {left} bytes left')
+        if not f.at_end():
+            raise SchemaError(f'Not all metadata bytes were consumed during deserialization, '
+                              f'{f.remaining()} bytes left')
+
+    def _write_state(self, f, compiled=None):
+        if self.proof_type is None and self.state is not None:
+            # -- proof was not resolved against a schema, so we write raw state data as it was read
+            f.write(self.state)
+            return
+        if compiled is None:
+            compiled = compiler.enabled
+        if compiled and self.proof_type is not None and all(seal.seal_type is not None for seal in self.seals):
+            f.write(self.proof_type.codec().encode_state([seal.type_no for seal in self.seals],
+                                                         [seal.state for seal in self.seals]))
+            return
+        [seal.stream_serialize(f, state=True) for seal in self.seals]
+
+    def _write_metadata(self, f, compiled=None):
+        if self.proof_type is None:
+            # -- proof was not resolved against a schema, so we can only write raw metadata as it was read
+            if self.metadata is None:
+                raise SchemaError('Unable to consensus-serialize proof metadata without schema')
+            f.write(self.metadata)
+            return
+        if compiled is None:
+            compiled = compiler.enabled
+        if compiled:
+            f.write(self.proof_type.codec().encode_metadata([field.value for field in self.fields]))
+            return
+        [field_ref.stream_serialize_value(field.value, f) for field_ref, field in zip(self.proof_type.fields,
+                                                                                     self.fields)]
 
+    @timing.timed('proof.validate')
     def validate(self):
-        # TODO: check format compliance
-        pass
+        """Checks proof compliance with the bounds defined by its schema proof type: number of seals of each type,
+        presence and number of field values and sealed balances. Rules involving the proof parents are checked by
+        `rgbconvert.history.History`"""
+        if self.proof_type is None:
+            raise ProofValidationError('proof must be resolved against a schema before it can be validated')
+        name = self.proof_type.name
+        if self.format is ProofFormat.root and self.proof_type.unseals is not None:
+            raise ProofValidationError(f'proof of type `{name}` can\'t be a root proof')
+        elif self.format is not ProofFormat.root and self.proof_type.unseals is None:
+            raise ProofValidationError(f'proof of type `{name}` must be a root proof')
+
+        counts = {}
+        for seal in self.seals:
+            counts[seal.type_no] = counts.get(seal.type_no, 0) + 1
+            if seal.seal_type is not None and seal.seal_type.type is SealType.Type.balance:
+                if not isinstance(seal.state, int) or seal.state < 0:
+                    raise ProofValidationError(f'seal `{seal.outpoint.structure_serialize()}` must have non-negative '
+                                               f'balance; got `{seal.state}` instead')
+        for ref in self.proof_type.seals:
+            count = counts.pop(ref.type_pos, 0)
+            if count < ref.bounds.min() or count > ref.bounds.max():
+                raise ProofValidationError(f'proof of type `{name}` must have {ref.bounds.name} seal(s) of type '
+                                           f'`{ref.ref_name}`; got {count} instead')
+        if len(counts) > 0:
+            raise ProofValidationError(f'proof of type `{name}` can\'t have seals of types with numbers '
+                                       f'{sorted(counts.keys())}')
+
+        for ref, field in zip(self.proof_type.fields, self.fields):
+            value = field.value
+            if ref.bounds is TypeRef.Usage.optional or ref.bounds is TypeRef.Usage.single:
+                count = 0 if value is None else 1
+            else:
+                count = len(value) if isinstance(value, list) else 0 if value is None else -1
+            if count < ref.bounds.min() or count > ref.bounds.max():
+                raise ProofValidationError(f'proof of type `{name}` must have {ref.bounds.name} value(s) of field '
+                                           f'`{ref.ref_name}`; got `{value}` instead')
 
     def bech32_id(self) -> str:
         return bech32.encode('pf', 1, self.GetHash())
 
+    @timing.timed('proof.structure_serialize')
     def structure_serialize(self, **kwargs) -> dict:
         data = {}
         for field_name in Proof.FIELDS.keys():
-            value = self.__getattribute__(field_name)
+            value = getattr(self, field_name)
             if isinstance(value, list):
                 value = [item.structure_serialize(**kwargs) for item in value]
             elif issubclass(type(value), StructureSerializable) or issubclass(type(value), FieldEnum):
                 value = value.structure_serialize(**kwargs)
             data[field_name] = value
 
-        if 'schema' in data:
+        if self.schema is not None:
             data['schema'] = self.schema.structure_serialize(bech32=True, **kwargs)
 
         fields = {}
@@ -185,6 +299,7 @@ class Proof(ImmutableSerializable):
                     fields[name] = value
         data['fields'] = fields
 
+        metrics.inc('proofs_encoded_total', (('encoding', 'structure'), ('format', self.format.name)))
         return data
 
     @classmethod
@@ -192,36 +307,103 @@ class Proof(ImmutableSerializable):
         schema_obj = kwargs['schema_obj'] if 'schema_obj' in kwargs else None
         if not isinstance(schema_obj, Schema):
             raise ValueError(f'`schema_obj` parameter must be of Schema type; got `{schema_obj}` instead')
+        return cls._deserialize(StreamReader(f), schema_obj, kwargs.get('compiled'))
+
+    @classmethod
+    def from_buffer(cls, buf, offset: int = 0, schema_obj: Schema = None, size: int = None, compiled=None):
+        """Deserializes proof directly from `bytes`, `bytearray`, `memoryview`, `mmap` or other object supporting
+        buffer protocol without copying it into an intermediary stream.
+
+        Since the pruned data of the proof are optional, the proof is read up to the end of the buffer, or up to
+        `offset + size` if `size` is provided. Returns the proof and the number of bytes consumed.
+
+        Raw `state` and `metadata` of the returned proof are `memoryview` slices of `buf`, so the buffer (and the
+        file it is mapped from) must stay open while the proof is used. If `schema_obj` is not provided, the proof
+        is left unresolved and can only be re-serialized back to its binary form.
+        """
+        if schema_obj is not None and not isinstance(schema_obj, Schema):
+            raise ValueError(f'`schema_obj` parameter must be of Schema type; got `{schema_obj}` instead')
+        reader = BufferReader(buf, offset, size)
+        proof = cls._deserialize(reader, schema_obj, compiled)
+        return proof, reader.tell() - offset
+
+    @classmethod
+    @timing.timed('proof.deserialize')
+    def _deserialize(cls, reader, schema_obj, compiled=None):
+        start = reader.tell()
+        header = Proof._read_header(reader)
+        seals = Proof._read_seals(reader)
+
+        # -- if we had zero seals implies proof of state destruction format
+        if len(seals) == 0:
+            header['format'] = ProofFormat.burn
+
+        # - reading unparsed state and metadata bytes
+        state = reader.read_varbytes_view()
+        metadata = reader.read_varbytes_view()
+
+        proof = Proof(schema_obj=schema_obj, fields=None, seals=seals, metadata=metadata, state=state,
+                      **header, **Proof._read_trailer(reader))
+        metrics.inc('proofs_decoded_total', (('encoding', 'binary'), ('format', proof.format.name)))
+        metrics.inc('bytes_read_total', (('encoding', 'binary'),), reader.tell() - start)
+
+        # Parsing raw seals and metadata and resolving types against the provided Schema
+        if isinstance(schema_obj, Schema):
+            proof.resolve_schema(schema_obj, compiled)
+
+        return proof
 
+    @staticmethod
+    def _read_header(reader) -> dict:
         # Deserialize proof header
         # - version with flag
-        (ver, flag) = FlagVarIntSerializer.stream_deserialize(f)
+        (ver, flag) = reader.read_flag_varint()
+        (schema, network, root) = (None, None, None)
         # - fields common for root and upgrade proofs
         if flag:
-            schema = Hash256Id.stream_deserialize(f)
-            network = VarIntSerializer.stream_deserialize(f)
-            if network is 0x00:
+            schema = Hash256Id.from_raw(bytes(reader.read_view(32)))
+            network = reader.read_varint()
+            if network == 0x00:
+                network = None
                 format = ProofFormat.upgrade
             # - root-specific fields
             else:
                 network = Network(network)
                 format = ProofFormat.root
-                root = OutPoint.stream_deserialize(f, short=False)
+                txid = bytes(reader.read_view(32))
+                root = OutPoint.from_raw(txid, reader.read_varint())
         else:
             format = ProofFormat.ordinary
+            # -- absent version is serialized as zero, and only root and upgrade proofs may have one
+            ver = ver if ver != 0 else None
 
         # Deserialize proof body
         # - reading proof type
-        type_no = ser_read(f, 1)[0]
+        type_no = reader.read_byte()
 
-        # - reading `seal_sequence` structure
+        return {'ver': ver, 'format': format, 'schema': schema, 'network': network, 'root': root, 'type_no': type_no}
+
+    @staticmethod
+    def _read_seals(reader, skip: bool = False):
+        """Reads `seal_sequence` structure; with `skip` set it only moves the reader past the structure and returns
+        the number of seals in it"""
         seals = []
+        count = 0
         seal_type_no = 0
+        bulk = isinstance(reader, BufferReader)
         # -- we iterate over the seals until 0xFF (=FlagVarIntSerializer.Separator.EOF) byte is met
         while True:
+            if bulk:
+                # -- runs of seals referencing outputs of the proof own transaction have no txids, so they are a
+                #    contiguous run of FlagVarInts, which is decoded at once
+                vouts = reader.read_flag_varint_run(True)
+                count += len(vouts)
+                if not skip and len(vouts) > 0:
+                    seals.extend([Seal(outpoint=OutPoint.from_raw(None, vout), type_no=seal_type_no)
+                                  for vout in vouts])
             try:
                 # -- reading seal with the current type number
-                seal = Seal.stream_deserialize(f, type_no=seal_type_no, schema_obj=schema_obj)
+                (vout, no_txid) = reader.read_flag_varint()
             except BaseException as ex:
                 # due to some strange bug, python 3 is unable to capture SeparatorByteSignal exception by its type,
                 # and `isinstance(ex, SeparatorByteSignal)` returns False as well :(
@@ -230,58 +412,75 @@ class Proof(ImmutableSerializable):
                 if not callable(getattr(ex, "is_eol", None)):
                     raise
                 if ex.is_eol():
-                    # -- met 0xFE separator byte, increasing current type number
+                    # -- met 0x7F separator byte, increasing current type number
                     seal_type_no = seal_type_no + 1
                 elif ex.is_eof():
                     # -- end of `seal_sequence` structure
                     break
             else:
+                count += 1
+                if skip:
+                    reader.read_view(0 if no_txid else 32)
+                    continue
                 # -- otherwise append read seal to the list of seals
-                seals.append(seal)
-
-        # -- if we had zero seals implies proof of state destruction format
-        if len(seals) is 0:
-            format = ProofFormat.burn
-
-        # - reading unparsed state and metadata bytes
-        state = BytesSerializer.stream_deserialize(f)
-        metadata = BytesSerializer.stream_deserialize(f)
+                txid = None if no_txid else bytes(reader.read_view(32))
+                seals.append(Seal(outpoint=OutPoint.from_raw(txid, vout), type_no=seal_type_no))
+        return count if skip else seals
 
+    @staticmethod
+    def _read_trailer(reader) -> dict:
         # Deserialize original public key
-        pkcode = ser_read(f, 1)
-        if pkcode is 0x00:
+        pkcode = reader.read_byte()
+        if pkcode == 0x00:
             pubkey = None
         else:
-            buf = pkcode + ser_read(f, 32)
-            pubkey = PubKey.deserialize(buf)
+            pubkey = PubKey.from_raw(bytes([pkcode]) + bytes(reader.read_view(32)))
 
         # Deserialize prunable data
-        try:
-            pruned_flag = ser_read(f, 1)
-        except:
-            pruned_flag = 0x00
+        pruned_flag = 0x00 if reader.at_end() else reader.read_byte()
 
         txid, parents = None, None
         if pruned_flag & 0x01 > 0:
-            txid = Hash256Id.stream_deserialize(f)
+            txid = Hash256Id.from_raw(bytes(reader.read_view(32)))
         if pruned_flag & 0x02 > 0:
-            parents = VectorSerializer.stream_deserialize(Hash256Id, f)
-
-        proof = Proof(
-            schema_obj=schema_obj, type_no=type_no,
-            ver=ver, format=format, schema=schema, network=network, root=root, pubkey=pubkey,
-            fields=None, seals=seals, txid=txid, parents=parents, metadata=metadata, state=state
-        )
-
-        # Parsing raw seals and metadata and resolving types against the provided Schema
-        if 'schema_obj' in kwargs:
-            schema_obj = kwargs['schema_obj']
-        if isinstance(schema_obj, Schema):
-            proof.resolve_schema(schema_obj)
+            # -- parent ids are a contiguous array of hashes, so they are read at once and sliced
+            data = bytes(reader.read_view(32 * reader.read_varint()))
+            parents = [Hash256Id.from_raw(data[pos:pos + 32]) for pos in range(0, len(data), 32)]
+
+        return {'pubkey': pubkey, 'txid': txid, 'parents': parents}
+
+    def serialize(self, params={}) -> bytes:
+        """Serializes proof into bytes; since the proof is immutable, its hash is computed from the same data, so
+        subsequent `GetHash` and `bech32_id` calls do not serialize the proof once again"""
+        data = bytes(self.serialize_into(BufferWriter(), **params).buf)
+        with timing.span('proof.hash'):
+            object.__setattr__(self, '_cached_GetHash', Hash(data))
+        self._count_encoded(len(data))
+        return data
 
-        return proof
+    def GetHash(self) -> bytes:
+        try:
+            return self._cached_GetHash
+        except AttributeError:
+            pass
+        with timing.span('proof.hash'):
+            hash = Hash(self.serialize_into(BufferWriter()).buf)
+        object.__setattr__(self, '_cached_GetHash', hash)
+        return hash
 
     def stream_serialize(self, f, **kwargs):
+        buf = self.serialize_into(BufferWriter(), **kwargs).buf
+        f.write(buf)
+        self._count_encoded(len(buf))
+
+    def _count_encoded(self, size: int):
+        metrics.inc('proofs_encoded_total', (('encoding', 'binary'), ('format', self.format.name)))
+        metrics.inc('bytes_written_total', (('encoding', 'binary'),), size)
+
+    @timing.timed('proof.serialize')
+    def serialize_into(self, f: BufferWriter, **kwargs) -> BufferWriter:
+        """Writes consensus-serialized proof into `BufferWriter` in a single pass: state and metadata sections are
+        encoded once into a scratch buffer, which provides their length prefixes"""
         # Serialize proof header
         # - version with flag
         ver = self.ver if self.ver is not None else 0
@@ -307,26 +506,33 @@ class Proof(ImmutableSerializable):
         f.write(bytes([self.type_no]))
 
         # - writing `seal_sequence` structure
-        current_type_no = None
+        current_type_no = 0
+        # -- outputs of seals without txids are collected and written as a single run of FlagVarInts
+        vouts = []
         for seal in self.seals:
-            if current_type_no is None:
-                current_type_no = seal.type_no
-            elif seal.type_no is not current_type_no:
+            if seal.type_no != current_type_no:
+                f.write(encode_flag_varints(vouts, True))
+                vouts.clear()
                 # -- writing EOL byte to signify the change of the type
-                [f.write(bytes([0x7F])) for n in range(current_type_no, seal.type_no)]
+                f.write(bytes([0x7F]) * (seal.type_no - current_type_no))
                 current_type_no = seal.type_no
+            if seal.outpoint.txid is None:
+                vouts.append(seal.outpoint.vout)
+                continue
+            f.write(encode_flag_varints(vouts, True))
+            vouts.clear()
             seal.stream_serialize(f, state=False)
+        f.write(encode_flag_varints(vouts, True))
         f.write(bytes([0xFF]))
 
-        # - writing raw data for the sealed state
-        length = reduce((lambda acc, seal: acc + len(seal.serialize({'state': True}))), [0] + self.seals)
-        VarIntSerializer.stream_serialize(length, f)
-        [seal.stream_serialize(f, state=True) for seal in self.seals]
-
-        # - writing raw data for all metafields
-        length = reduce((lambda acc, field: acc + len(field.serialize())), [0] + self.fields)
-        VarIntSerializer.stream_serialize(length, f)
-        [field.stream_serialize(f) for field in self.fields]
+        # - writing raw data for the sealed state and all metafields
+        compiled = kwargs.get('compiled')
+        section = BufferWriter()
+        for write in [self._write_state, self._write_metadata]:
+            write(section, compiled)
+            VarIntSerializer.stream_serialize(len(section.buf), f)
+            f.write(section.buf)
+            section.clear()
 
         # Serialize original public key
         if self.pubkey is not None:
@@ -335,15 +541,12 @@ class Proof(ImmutableSerializable):
             ZeroBytesSerializer.stream_serialize(1, f)
 
         # Serialize prunable data
+        pruned_flag = (0x01 if self.txid is not None else 0x00) | (0x02 if self.parents is not None else 0x00)
+        if pruned_flag != 0x00:
+            f.write(bytes([pruned_flag]))
         if self.txid is not None:
-            if self.parents is not None:
-                f.write(bytes(0x03))
-                self.txid.stream_serialize(f)
-            else:
-                f.write(bytes(0x01))
+            self.txid.stream_serialize(f)
+        if self.parents is not None:
             VectorSerializer.stream_serialize(Hash256Id, self.parents, f)
-        elif self.parents is not None:
-            f.write(bytes(0x02))
-            VectorSerializer.stream_serialize(Hash256Id, self.parents, f)
-        else:
-            f.write(bytes(0x00))
+
+        return f
@@ -19,6 +19,7 @@ from ..parser import *
 from ..data_types import OutPoint
 from ..schema.schema import Schema
 from ..schema.errors import SchemaError
+from .. import timing
 
 
 class Seal(ImmutableSerializable):
@@ -56,23 +57,25 @@ class Seal(ImmutableSerializable):
             object.__setattr__(self, 'dict_state', None)
         else:
             # Reading from structured data source
-            for field_name, field in Seal.FIELDS.items():
-                field.parse(self, {'type_name': type_name, 'outpoint': outpoint}, field_name)
-            data = {}
-            for item in kwargs.keys():
-                if item not in Seal.FIELDS.keys():
-                    data[item] = kwargs[item]
+            with timing.span('seal.parse_fields'):
+                for field_name, field in Seal.FIELDS.items():
+                    field.parse(self, {'type_name': type_name, 'outpoint': outpoint}, field_name)
+                data = {}
+                for item in kwargs.keys():
+                    if item not in Seal.FIELDS.keys():
+                        data[item] = kwargs[item]
             object.__setattr__(self, 'dict_state', data)
 
         object.__setattr__(self, 'seal_type', None)
         if isinstance(schema_obj, Schema):
             self.resolve_schema(schema_obj)
 
+    @timing.timed('seal.resolve_schema')
     def resolve_schema(self, schema: Schema):
         if not isinstance(schema, Schema):
             raise ValueError(f'`schema` parameter must be of Schema type; got `{schema}` instead')
 
-        self.resolve_schema_refs(schema.seal_types)
+        self.resolve_schema_refs(schema.seal_types, schema.seal_type_index)
         if self.seal_type is None:
             raise SchemaError(f'the provided schema `{schema.name}` does not define seal type `{self.type_name}`'
                               f'or type with index number {self.type_no}')
@@ -81,26 +84,30 @@ class Seal(ImmutableSerializable):
             state = self.seal_type.state_from_dict(self.dict_state)
             object.__setattr__(self, 'state', state)
 
-    def resolve_schema_refs(self, seal_types: list):
+    def resolve_schema_refs(self, seal_types: list, index: dict = None):
         try:
             seal_type = seal_types[self.type_no]
             object.__setattr__(self, 'type_name', seal_type.name)
         except:
-            try:
-                pos = next(num for num, type in enumerate(seal_types) if type.name == self.type_name)
-                seal_type = seal_types[pos]
+            if index is not None:
+                pos = index.get(self.type_name)
+            else:
+                pos = next((num for num, type in enumerate(seal_types) if type.name == self.type_name), None)
+            seal_type = seal_types[pos] if pos is not None else None
+            if pos is not None:
                 object.__setattr__(self, 'type_no', pos)
-            except StopIteration:
-                seal_type = None
+                # -- names read from structured data are replaced with the schema ones, so they are not duplicated
+                object.__setattr__(self, 'type_name', seal_type.name)
 
         object.__setattr__(self, 'seal_type', seal_type)
 
-    def parse_state_from_blob(self, state: bytes, pos: int) -> int:
+    @timing.timed('seal.parse_state')
+    def parse_state_from_blob(self, state, pos: int) -> int:
         if self.seal_type is None:
             raise SchemaError("can't parse state data without knowing `seal_type` of the seal")
-        state, shift = self.seal_type.state_from_blob(state[pos:])
+        state, pos = self.seal_type.state_from_blob(state, pos)
         object.__setattr__(self, 'state', state)
-        return pos + shift
+        return pos
 
     def structure_serialize(self, **kwargs) -> dict:
         if self.seal_type is None:
@@ -0,0 +1,197 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Content-addressed on-disk cache of command results (transcoded proof files and validation verdicts).
+
+Entries are keyed by the hash of the input file content, schema id, operation (like `transcode:yaml:binary`), package
+version and cache format version. Each entry consists of a `.meta` JSON file describing the result and, for
+operations producing files, an `.out` file with the output itself. `.out` files are read-only and their sha256 is
+kept in `.meta`, so an output which was modified anyway (e.g. through a hard link) is a cache miss. Cache size is
+bounded: once it exceeds `max_size`, least recently used entries (by modification time of their `.meta` files, which
+is updated on each hit) are removed."""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+from . import metrics
+
+
+def _file_digest(path: str):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _file_hash(path: str) -> str:
+    return _file_digest(path).hexdigest()
+
+
+class ResultCache:
+    # Cache format version; must be increased each time the content of cache entries is changed
+    FORMAT = 3
+
+    # Default cache size limit, in bytes
+    MAX_SIZE = 1 << 30
+
+    __slots__ = ['path', 'max_size', 'link', 'size']
+
+    def __init__(self, path: str = None, max_size: int = MAX_SIZE, link: bool = False):
+        """With `link` set, cached outputs are hard-linked instead of being copied, so they are read-only"""
+        self.path = path if path is not None else ResultCache.default_path()
+        self.max_size = max_size
+        self.link = link
+        # -- total size of the entries, which is computed on the first eviction and then tracked by `put`
+        self.size = None
+
+    @staticmethod
+    def default_path() -> str:
+        """Returns cache directory from `RGB_CONVERT_CACHE_DIR` environment variable or, if it is not set,
+        `rgb-convert/results` inside user cache directory"""
+        if 'RGB_CONVERT_CACHE_DIR' in os.environ:
+            return os.path.join(os.environ['RGB_CONVERT_CACHE_DIR'], 'results')
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'rgb-convert', 'results')
+
+    def key(self, infile: str, schema_id: str, operation: str) -> str:
+        from . import __version__
+        digest = _file_digest(infile)
+        digest.update(f'\x00{schema_id}\x00{operation}\x00{__version__}\x00{ResultCache.FORMAT}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key: str, ext: str) -> str:
+        return os.path.join(self.path, key + ext)
+
+    def get(self, key: str, outfile: str = None):
+        """Returns result description stored with the entry or `None` if the result is not cached yet. If `outfile` is
+        given, the cached output is copied (or linked) into it, and the entry is a hit only if this succeeds"""
+        operation = 'validate' if outfile is None else 'transcode'
+        meta_path = self.entry_path(key, '.meta')
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            output_hash = meta.pop('output_hash', None)
+            if outfile is not None:
+                out_path = self.entry_path(key, '.out')
+                if output_hash is None or _file_hash(out_path) != output_hash:
+                    raise ValueError(f'cached output `{out_path}` was modified')
+                self._restore(out_path, outfile)
+            os.utime(meta_path)
+        except (OSError, ValueError):
+            # -- missing, broken or concurrently evicted entries are cache misses and will be overwritten
+            metrics.inc('result_cache_total', (('operation', operation), ('result', 'miss')))
+            return None
+        metrics.inc('result_cache_total', (('operation', operation), ('result', 'hit')))
+        return meta
+
+    def _restore(self, path: str, outfile: str):
+        # -- existing output is replaced rather than written in place, since it may be a link to another entry
+        if self.link and os.path.exists(outfile) and os.path.samefile(path, outfile):
+            # -- output is linked to the entry already (and renaming a link over the same file would do nothing)
+            return
+        # -- `mkstemp` only reserves a unique name: links can't replace its file, and copies must get the permissions
+        # of new files rather than its private ones
+        (fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(outfile)),
+                                     prefix=f'.{os.path.basename(outfile)}.', suffix='.tmp')
+        os.close(fd)
+        os.unlink(tmp)
+        try:
+            if self.link:
+                try:
+                    os.link(path, tmp)
+                except OSError:
+                    # -- hard links are not possible across file systems, so the output is copied then
+                    shutil.copyfile(path, tmp)
+            else:
+                shutil.copyfile(path, tmp)
+            os.replace(tmp, outfile)
+        except BaseException:
+            if os.path.lexists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def put(self, key: str, meta: dict, outfile: str = None):
+        """Stores result description and, if `outfile` is given, the output file with the entry"""
+        os.makedirs(self.path, exist_ok=True)
+        size = 0
+        if outfile is not None:
+            digest = hashlib.sha256()
+
+            def copy(f):
+                with open(outfile, 'rb') as src:
+                    for chunk in iter(lambda: src.read(1 << 20), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+                # -- outputs may be hard-linked to the entry, which is protected from being written through the links
+                os.fchmod(f.fileno(), 0o444)
+            size += self._store(self.entry_path(key, '.out'), copy)
+            meta = dict(meta, output_hash=digest.hexdigest())
+        # -- `.meta` file is written last, so incomplete entries are never seen as cached
+        size += self._store(self.entry_path(key, '.meta'), lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        if self.size is not None:
+            self.size += size
+        if self.size is None or self.size > self.max_size:
+            self.evict()
+
+    def _store(self, path: str, write) -> int:
+        (fd, tmp) = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+                size = f.tell()
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return size
+
+    def evict(self):
+        """Removes least recently used entries until the cache size drops below 90% of `max_size` (if it exceeds
+        `max_size`)"""
+        entries = {}
+        total = 0
+        with os.scandir(self.path) as it:
+            for item in it:
+                (key, ext) = os.path.splitext(item.name)
+                if ext not in ['.meta', '.out']:
+                    continue
+                try:
+                    stat = item.stat()
+                except FileNotFoundError:
+                    continue
+                entry = entries.setdefault(key, [0, 0])
+                entry[0] += stat.st_size
+                if ext == '.meta':
+                    entry[1] = stat.st_mtime
+                total += stat.st_size
+        if total > self.max_size:
+            for key, (size, _) in sorted(entries.items(), key=lambda item: item[1][1]):
+                if total <= self.max_size * 0.9:
+                    break
+                for ext in ['.meta', '.out']:
+                    try:
+                        os.unlink(self.entry_path(key, ext))
+                    except FileNotFoundError:
+                        pass
+                total -= size
+        self.size = total
+
+
+__all__ = [
+    'ResultCache'
+]
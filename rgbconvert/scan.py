@@ -0,0 +1,106 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Header-only scanning of binary proofs, proof containers and archives.
+
+Only the proof header (version, format, schema id, network, root outpoint and proof type number) is decoded, so
+scanning requires no schema and creates no seals or metadata fields. Proof ids of proofs from containers and archives
+are taken from their frames and index entries; ids of separate proof files are computed from their data."""
+
+import bitcoin.segwit_addr as bech32
+from bitcoin.core import Hash
+
+from .consensus import BufferReader
+from .data_types import Hash256Id
+from .proofs.proof import Proof, ProofFormat
+from .container import Container, ContainerReader
+from .archive import Archive, ArchiveReader
+
+# Columns of the rows yielded by `scan` and `header_row`
+COLUMNS = ['path', 'frame', 'id', 'format', 'ver', 'schema', 'network', 'root', 'type_no', 'error']
+
+
+def read_header(buf, offset: int = 0, size: int = None) -> dict:
+    """Reads header of the consensus-serialized proof from the buffer; returns dict with `ver`, `format`, `schema`,
+    `network`, `root` and `type_no` keys"""
+    reader = BufferReader(buf, offset, size)
+    header = Proof._read_header(reader)
+    # -- proofs without seals have a seal sequence of separator bytes only and are burn proofs
+    (view, pos, end) = (reader.view, reader.pos, reader.end)
+    while pos < end and view[pos] == 0x7F:
+        pos += 1
+    if pos < end and view[pos] == 0xFF:
+        header['format'] = ProofFormat.burn
+    return header
+
+
+def scan_file(path: str):
+    """Yields header dicts (see `read_header`) extended with `path`, `frame` (number of the proof in the container or
+    archive) and `id` keys for all proofs of a binary proof file, proof container or proof archive"""
+    with open(path, 'rb') as f:
+        magic = f.read(max(len(Container.MAGIC), len(Archive.MAGIC)))
+        if magic.startswith(Container.MAGIC):
+            f.seek(0)
+            # -- proof ids are verified only when proofs are decoded, scanning trusts the frames
+            for no, (proof_id, data) in enumerate(ContainerReader(f, verify=False).frames()):
+                yield dict(read_header(data), path=path, frame=no, id=proof_id)
+            return
+        elif not magic.startswith(Archive.MAGIC):
+            data = magic + f.read()
+            yield dict(read_header(data), path=path, frame=None, id=Hash256Id.from_raw(Hash(data)))
+            return
+    with ArchiveReader(path) as reader:
+        for no, (proof_id, data) in enumerate(reader.frames()):
+            try:
+                yield dict(read_header(data), path=path, frame=no, id=proof_id)
+            finally:
+                data.release()
+
+
+def scan(paths):
+    """Yields headers of all proofs from the given files (see `scan_file`). Files which fail to be read do not stop
+    the scan: they are yielded as dicts with `path` and `error` keys only"""
+    for path in paths:
+        try:
+            for header in scan_file(path):
+                header['error'] = None
+                yield header
+        except Exception as err:
+            yield {'path': path, 'error': f'{type(err).__name__}: {err}'}
+
+
+def header_row(header: dict) -> dict:
+    """Converts header yielded by `scan` into a table row of strings and numbers with `COLUMNS` keys"""
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=header['path'], error=header.get('error'))
+    if 'format' not in header:
+        return row
+    row.update(frame=header['frame'], ver=header['ver'], type_no=header['type_no'],
+               id=bech32.encode('pf', 1, header['id'].bytes), format=header['format'].name)
+    if header['schema'] is not None:
+        row['schema'] = header['schema'].structure_serialize(bech32=True)
+    if header['network'] is not None:
+        row['network'] = header['network'].structure_serialize()
+    if header['root'] is not None:
+        row['root'] = header['root'].structure_serialize()
+    return row
+
+
+__all__ = [
+    'COLUMNS',
+    'read_header',
+    'scan_file',
+    'scan',
+    'header_row'
+]
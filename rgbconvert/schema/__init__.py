@@ -18,6 +18,7 @@ from .proof_type import ProofType
 from .seal_type import SealType
 from .type_ref import TypeRef
 from .schema import Schema
+from .cache import SchemaCache
 
 __all__ = [
     'SchemaError',
@@ -27,5 +28,6 @@ __all__ = [
     'ProofType',
     'SealType',
     'TypeRef',
-    'Schema'
+    'Schema',
+    'SchemaCache'
 ]
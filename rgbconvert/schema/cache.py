@@ -0,0 +1,77 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import os
+import hashlib
+import tempfile
+
+from .schema import Schema
+
+
+class SchemaCache:
+    """Persistent on-disk cache of compiled schemas: schemas which were parsed from their source file and had all
+    their internal references resolved. Entries hold schema consensus serialization (which keeps references as
+    resolved type indexes) rather than pickled objects, so reading a cache entry never executes code from it. Entries
+    are keyed by the hash of the schema source file content, package version and cache format version
+    """
+
+    # Cache format version; must be increased each time the meaning of cache entries is changed
+    FORMAT = 3
+
+    __slots__ = ['path']
+
+    def __init__(self, path: str = None):
+        self.path = path if path is not None else SchemaCache.default_path()
+
+    @staticmethod
+    def default_path() -> str:
+        """Returns cache directory from `RGB_CONVERT_CACHE_DIR` environment variable or, if it is not set,
+        `rgb-convert/schemas` inside user cache directory"""
+        if 'RGB_CONVERT_CACHE_DIR' in os.environ:
+            return os.path.join(os.environ['RGB_CONVERT_CACHE_DIR'], 'schemas')
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'rgb-convert', 'schemas')
+
+    def key(self, content: bytes) -> str:
+        from .. import __version__
+        digest = hashlib.sha256(content)
+        digest.update(f'\x00{__version__}\x00{SchemaCache.FORMAT}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, content: bytes) -> str:
+        return os.path.join(self.path, self.key(content) + '.schema')
+
+    def get(self, content: bytes):
+        """Returns compiled schema for the given schema file content or `None` if it is not cached yet"""
+        try:
+            with open(self.entry_path(content), 'rb') as f:
+                return Schema.deserialize(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # -- broken or incompatible cache entries are treated as cache misses and will be overwritten
+            return None
+
+    def put(self, content: bytes, schema: Schema):
+        """Stores resolved schema as the compiled version of the given schema file content"""
+        data = schema.serialize()
+        os.makedirs(self.path, exist_ok=True)
+        (fd, tmp) = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self.entry_path(content))
+        except BaseException:
+            os.unlink(tmp)
+            raise
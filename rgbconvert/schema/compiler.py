@@ -0,0 +1,462 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Schema compiler generating proof type-specific codecs for proof metadata and sealed state.
+
+Interpreted codecs (`TypeRef.stream_deserialize_value`, `FieldType.stream_serialize_value` etc) dispatch on field
+type and type usage for each single value. For a resolved proof type the layout of metadata is known in advance, so
+we generate a Python function reading (or writing) all metadata fields in order, where consecutive fixed-width fields
+are merged into a single `struct.Struct` call."""
+
+import struct
+from io import BytesIO
+
+from ..consensus import FlagVarIntSerializer, SeparatorByteSignal
+from ..consensus.buffer import truncated as _truncated, read_varint as _read_varint
+from ..consensus.varint import varint_bytes as _varint_bytes, flag_varint_bytes as _flag_varint_bytes, \
+    decode_varints, encode_varints
+from ..data_types import Hash256Id, Hash160Id, PubKey
+from .errors import SchemaError
+from .field_type import FieldType
+from .seal_type import SealType
+from .type_ref import TypeRef
+
+# Default for the `compiled` parameter of proof (de)serialization methods: set to `False` in order to fall back to
+# the interpreted codecs
+enabled = True
+
+# `struct` format codes and value classes for fixed-width field types
+FIXED_WIDTH = {
+    FieldType.Type.u8: ('B', None),
+    FieldType.Type.u16: ('H', None),
+    FieldType.Type.u32: ('I', None),
+    FieldType.Type.u64: ('Q', None),
+    FieldType.Type.i8: ('b', None),
+    FieldType.Type.i16: ('h', None),
+    FieldType.Type.i32: ('i', None),
+    FieldType.Type.i64: ('q', None),
+    FieldType.Type.sha256: ('32s', Hash256Id),
+    FieldType.Type.sha256d: ('32s', Hash256Id),
+    FieldType.Type.ripmd160: ('20s', Hash160Id),
+    FieldType.Type.hash160: ('20s', Hash160Id),
+    FieldType.Type.pubkey: ('33s', PubKey),
+}
+
+# Serialization of absent values (see `FieldType.stream_serialize_value`)
+NONE_VALUES = {
+    FieldType.Type.fvi: bytes([0xFF]),
+    FieldType.Type.str: bytes([0x00]),
+    FieldType.Type.bytes: bytes([0x00]),
+    FieldType.Type.sha256: bytes(32),
+    FieldType.Type.sha256d: bytes(32),
+    FieldType.Type.ripmd160: bytes(20),
+    FieldType.Type.hash160: bytes(20),
+    FieldType.Type.pubkey: bytes([0x00]),
+    FieldType.Type.ecdsa: bytes([0x00]),
+}
+
+_unpack_u16 = struct.Struct('<H').unpack_from
+_unpack_u32 = struct.Struct('<I').unpack_from
+
+
+def _read_flag_varint(buf, pos: int, end: int) -> (int, int):
+    """Reads flag-prefixed variable length int dropping the flag (see `FlagVarIntSerializer`)"""
+    if pos >= end:
+        _truncated(1, 0)
+    prefix = buf[pos]
+    r = prefix & 0x7f
+    if r < 0x7c:
+        return r, pos + 1
+    elif prefix == 0x7f:
+        raise SeparatorByteSignal(FlagVarIntSerializer.Separator.EOL)
+    elif prefix == 0xff:
+        raise SeparatorByteSignal(FlagVarIntSerializer.Separator.EOF)
+    (size, unpack) = (1, None) if r == 0x7c else (2, _unpack_u16) if r == 0x7d else (4, _unpack_u32)
+    if pos + 1 + size > end:
+        _truncated(size, end - pos - 1)
+    return (buf[pos + 1] if unpack is None else unpack(buf, pos + 1)[0]), pos + 1 + size
+
+
+def _read_varbytes(buf, pos: int, end: int) -> (bytes, int):
+    (size, pos) = _read_varint(buf, pos, end)
+    if pos + size > end:
+        _truncated(size, end - pos)
+    return bytes(buf[pos:pos + size]), pos + size
+
+
+def _read_ecdsa(buf, pos: int, end: int) -> int:
+    if pos >= end:
+        _truncated(1, 0)
+    if buf[pos] != 0x00:
+        raise NotImplementedError('ECDSA deserialization is not implemented')
+    return pos + 1
+
+
+def _value_reader(field_type: FieldType):
+    """Returns function reading single value of the given field type from buffer"""
+    tp = field_type.type
+    if tp in FIXED_WIDTH:
+        (fmt, cls) = FIXED_WIDTH[tp]
+        s = struct.Struct('<' + fmt)
+        (size, unpack) = (s.size, s.unpack_from)
+        # -- values come from the binary data, so they need no validation
+        from_raw = cls.from_raw if cls is not None else None
+
+        def read_fixed(buf, pos, end):
+            if pos + size > end:
+                _truncated(size, end - pos)
+            value = unpack(buf, pos)[0]
+            return (value if cls is None else from_raw(value)), pos + size
+        return read_fixed
+    elif tp is FieldType.Type.vi:
+        return _read_varint
+    elif tp is FieldType.Type.fvi:
+        return _read_flag_varint
+    elif tp is FieldType.Type.str:
+        def read_str(buf, pos, end):
+            (value, pos) = _read_varbytes(buf, pos, end)
+            return value.decode('utf-8'), pos
+        return read_str
+    elif tp is FieldType.Type.bytes:
+        return _read_varbytes
+    elif tp is FieldType.Type.ecdsa:
+        return lambda buf, pos, end: (None, _read_ecdsa(buf, pos, end))
+    raise NotImplementedError(f'field type `{tp.name}` can not be compiled')
+
+
+def _value_writer(field_type: FieldType):
+    """Returns function serializing single (possibly absent) value of the given field type into bytes"""
+    tp = field_type.type
+    none = NONE_VALUES.get(tp, b'')
+    if tp in FIXED_WIDTH:
+        (fmt, cls) = FIXED_WIDTH[tp]
+        pack = struct.Struct('<' + fmt).pack
+        if tp is FieldType.Type.pubkey:
+            return lambda value: none if value is None else pack(value.data)
+        elif cls is not None:
+            return lambda value: none if value is None else pack(value.bytes)
+        return lambda value: none if value is None else pack(value)
+    elif tp is FieldType.Type.vi:
+        return lambda value: none if value is None else _varint_bytes(value)
+    elif tp is FieldType.Type.fvi:
+        return lambda value: none if value is None else _flag_varint_bytes(value)
+    elif tp is FieldType.Type.str:
+        def write_str(value):
+            if value is None:
+                return none
+            data = value.encode('utf-8')
+            return _varint_bytes(len(data)) + data
+        return write_str
+    elif tp is FieldType.Type.bytes:
+        return lambda value: none if value is None else _varint_bytes(len(value)) + value
+    elif tp is FieldType.Type.ecdsa:
+        def write_ecdsa(value):
+            if value is not None:
+                raise NotImplementedError('ECDSA serialization is not implemented')
+            return none
+        return write_ecdsa
+    raise NotImplementedError(f'field type `{tp.name}` can not be compiled')
+
+
+def _ref_writer(ref: TypeRef):
+    """Returns function serializing value(s) of the type reference with a non-fixed layout into bytes"""
+    write = _value_writer(ref.type)
+    if ref.bounds is TypeRef.Usage.single or ref.bounds is TypeRef.Usage.optional:
+        return write
+    count = ref.bounds.min()
+    if ref.bounds.is_fixed():
+        def write_fixed(values):
+            if values is None or len(values) != count:
+                raise SchemaError(f'field `{ref.ref_name}` requires exactly {count} values, got `{values}` instead')
+            return b''.join([write(value) for value in values])
+        return write_fixed
+
+    def write_vector(values):
+        values = [] if values is None else values
+        if len(values) < count:
+            raise SchemaError(f'field `{ref.ref_name}` requires at least {count} values, got {len(values)} instead')
+        return _varint_bytes(len(values)) + b''.join([write(value) for value in values])
+    return write_vector
+
+
+def _interpreted_writer(refs: list):
+    """Returns function serializing values for a run of type references with the interpreted codec; used for the
+    runs of fixed-width values which contain absent values and can't be packed with a single `struct` call"""
+    def write(values):
+        f = BytesIO()
+        [ref.stream_serialize_value(value, f) for ref, value in zip(refs, values)]
+        return f.getvalue()
+    return write
+
+
+class _Generator:
+    """Accumulates source code and namespace for a generated function"""
+
+    __slots__ = ['lines', 'namespace']
+
+    def __init__(self, namespace: dict):
+        self.lines = []
+        self.namespace = dict(namespace)
+
+    def name(self, prefix: str, value) -> str:
+        name = f'_{prefix}{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent: int, line: str):
+        self.lines.append('    ' * indent + line)
+
+    def compile(self, func_name: str, filename: str):
+        source = '\n'.join(self.lines) + '\n'
+        exec(compile(source, filename, 'exec'), self.namespace)
+        return self.namespace[func_name], source
+
+
+class ProofCodec:
+    """Compiled codec for the metadata and sealed state of a given (resolved) proof type.
+
+    `decode_metadata(buf)` returns list of values for all proof type fields from metadata bytes, `bytearray` or
+    `memoryview`, and `encode_metadata(values)` does the opposite. `decode_state(blob, type_nos)` returns list of
+    states for the seals with given type numbers, and `encode_state(type_nos, states)` serializes them back.
+    Codecs are generated once per proof type and cached by `ProofType.codec`.
+    """
+
+    __slots__ = ['proof_type', 'decode_metadata', 'encode_metadata', 'decode_state', 'encode_state', 'source']
+
+    def __init__(self, proof_type):
+        for ref in proof_type.fields + proof_type.seals + (proof_type.unseals or []):
+            if ref.type is None:
+                raise SchemaError(f'proof type `{proof_type.name}` must have all references resolved to be compiled')
+        object.__setattr__(self, 'proof_type', proof_type)
+
+        (decode_metadata, decode_source) = self._generate_decoder(proof_type)
+        (encode_metadata, encode_source) = self._generate_encoder(proof_type)
+        object.__setattr__(self, 'decode_metadata', decode_metadata)
+        object.__setattr__(self, 'encode_metadata', encode_metadata)
+        object.__setattr__(self, 'source', decode_source + '\n' + encode_source)
+
+        (decode_state, encode_state) = self._state_codec(proof_type)
+        object.__setattr__(self, 'decode_state', decode_state)
+        object.__setattr__(self, 'encode_state', encode_state)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Object is immutable')
+
+    @staticmethod
+    def _runs(refs: list) -> list:
+        """Splits type references into runs of fixed-width values with fixed usage (which are packed together) and
+        individual references"""
+        runs = []
+        current = []
+        for no, ref in enumerate(refs):
+            if ref.type.type in FIXED_WIDTH and (ref.bounds is TypeRef.Usage.single or ref.bounds.is_fixed()):
+                current.append(no)
+                continue
+            if len(current) > 0:
+                runs.append(current)
+                current = []
+            runs.append(no)
+        if len(current) > 0:
+            runs.append(current)
+        return runs
+
+    @staticmethod
+    def _generate_decoder(proof_type) -> tuple:
+        refs = proof_type.fields
+        g = _Generator({
+            'SchemaError': SchemaError,
+            '_truncated': _truncated,
+            '_read_varint': _read_varint,
+            '_read_flag_varint': _read_flag_varint,
+            '_read_varbytes': _read_varbytes,
+            '_read_ecdsa': _read_ecdsa,
+        })
+        g.emit(0, 'def decode_metadata(buf):')
+        g.emit(1, 'end = len(buf)')
+        g.emit(1, 'pos = 0')
+        for run in ProofCodec._runs(refs):
+            if isinstance(run, list):
+                # -- fixed-width values are unpacked with a single struct call
+                fmt = '<'
+                names = []
+                wraps = []
+                for no in run:
+                    ref = refs[no]
+                    (code, cls) = FIXED_WIDTH[ref.type.type]
+                    count = ref.bounds.min()
+                    fmt += code * count
+                    items = [f'v{no}'] if ref.bounds is TypeRef.Usage.single else [f'v{no}_{n}' for n in range(count)]
+                    names += items
+                    if cls is not None:
+                        wrap = g.name('from_raw', cls.from_raw)
+                        wraps += [f'{item} = {wrap}({item})' for item in items]
+                    if ref.bounds is not TypeRef.Usage.single:
+                        wraps.append(f'v{no} = [{", ".join(items)}]')
+                s = struct.Struct(fmt)
+                unpack = g.name('unpack', s.unpack_from)
+                g.emit(1, f'if pos + {s.size} > end:')
+                g.emit(2, f'_truncated({s.size}, end - pos)')
+                g.emit(1, f'{", ".join(names)}, = {unpack}(buf, pos)')
+                g.emit(1, f'pos += {s.size}')
+                [g.emit(1, line) for line in wraps]
+                continue
+
+            no = run
+            ref = refs[no]
+            tp = ref.type.type
+            read = g.name('read', _value_reader(ref.type))
+            if ref.bounds is TypeRef.Usage.single:
+                g.emit(1, f'v{no}, pos = {read}(buf, pos, end)')
+            elif ref.bounds.is_fixed():
+                g.emit(1, f'v{no} = []')
+                g.emit(1, f'for _ in range({ref.bounds.min()}):')
+                g.emit(2, f'value, pos = {read}(buf, pos, end)')
+                g.emit(2, f'v{no}.append(value)')
+            elif ref.bounds is TypeRef.Usage.optional:
+                if tp is FieldType.Type.pubkey or tp is FieldType.Type.ecdsa:
+                    g.emit(1, 'if pos >= end:')
+                    g.emit(2, '_truncated(1, 0)')
+                    g.emit(1, 'if buf[pos] == 0x00:')
+                    g.emit(2, f'v{no} = None')
+                    g.emit(2, 'pos += 1')
+                    g.emit(1, 'else:')
+                    g.emit(2, f'v{no}, pos = {read}(buf, pos, end)')
+                elif tp is FieldType.Type.fvi:
+                    g.emit(1, 'if pos < end and buf[pos] == 0xFF:')
+                    g.emit(2, f'v{no} = None')
+                    g.emit(2, 'pos += 1')
+                    g.emit(1, 'else:')
+                    g.emit(2, f'v{no}, pos = {read}(buf, pos, end)')
+                elif tp is FieldType.Type.str or tp is FieldType.Type.bytes:
+                    g.emit(1, f'v{no}, pos = {read}(buf, pos, end)')
+                    g.emit(1, f'v{no} = v{no} if len(v{no}) > 0 else None')
+                elif tp in FIXED_WIDTH and FIXED_WIDTH[tp][1] in [Hash256Id, Hash160Id]:
+                    # -- absent hashes are serialized as zero hashes
+                    zero = g.name('zero', bytes(struct.calcsize(FIXED_WIDTH[tp][0])))
+                    g.emit(1, f'v{no}, pos = {read}(buf, pos, end)')
+                    g.emit(1, f'v{no} = v{no} if v{no}.bytes != {zero} else None')
+                else:
+                    # -- absent integer values are not serialized at all, so they can be detected only at the end
+                    g.emit(1, 'if pos >= end:')
+                    g.emit(2, f'v{no} = None')
+                    g.emit(1, 'else:')
+                    g.emit(2, f'v{no}, pos = {read}(buf, pos, end)')
+            else:
+                g.emit(1, 'count, pos = _read_varint(buf, pos, end)')
+                if tp in FIXED_WIDTH:
+                    (code, cls) = FIXED_WIDTH[tp]
+                    s = struct.Struct('<' + code)
+                    iter_unpack = g.name('iter_unpack', s.iter_unpack)
+                    g.emit(1, f'if pos + count * {s.size} > end:')
+                    g.emit(2, f'_truncated(count * {s.size}, end - pos)')
+                    if cls is None:
+                        g.emit(1, f'v{no} = [value for value, in {iter_unpack}(buf[pos:pos + count * {s.size}])]')
+                    else:
+                        wrap = g.name('from_raw', cls.from_raw)
+                        g.emit(1, f'v{no} = [{wrap}(value) for value, in '
+                                  f'{iter_unpack}(buf[pos:pos + count * {s.size}])]')
+                    g.emit(1, f'pos += count * {s.size}')
+                else:
+                    g.emit(1, f'v{no} = []')
+                    g.emit(1, 'for _ in range(count):')
+                    g.emit(2, f'value, pos = {read}(buf, pos, end)')
+                    g.emit(2, f'v{no}.append(value)')
+
+        g.emit(1, 'if pos != end:')
+        g.emit(2, "raise SchemaError(f'Not all metadata bytes were consumed during deserialization, "
+                  "{end - pos} bytes left')")
+        g.emit(1, f'return [{", ".join(f"v{no}" for no in range(len(refs)))}]')
+        return g.compile('decode_metadata', f'<decode_metadata: {proof_type.name}>')
+
+    @staticmethod
+    def _generate_encoder(proof_type) -> tuple:
+        refs = proof_type.fields
+        g = _Generator({})
+        g.emit(0, 'def encode_metadata(values):')
+        if len(refs) == 0:
+            g.emit(1, "return b''")
+            return g.compile('encode_metadata', f'<encode_metadata: {proof_type.name}>')
+
+        g.emit(1, f'{", ".join(f"v{no}" for no in range(len(refs)))}, = values')
+        g.emit(1, 'parts = []')
+        for run in ProofCodec._runs(refs):
+            if isinstance(run, list):
+                fmt = '<'
+                args = []
+                absent = []
+                for no in run:
+                    ref = refs[no]
+                    (code, cls) = FIXED_WIDTH[ref.type.type]
+                    count = ref.bounds.min()
+                    fmt += code * count
+                    items = [f'v{no}'] if ref.bounds is TypeRef.Usage.single else [f'v{no}[{n}]' for n in range(count)]
+                    if ref.bounds is TypeRef.Usage.single:
+                        absent.append(f'v{no} is None')
+                    else:
+                        absent.append(f'v{no} is None or len(v{no}) != {count} or None in v{no}')
+                    if ref.type.type is FieldType.Type.pubkey:
+                        items = [f'{item}.data' for item in items]
+                    elif cls is not None:
+                        items = [f'{item}.bytes' for item in items]
+                    args += items
+                pack = g.name('pack', struct.Struct(fmt).pack)
+                fallback = g.name('interpreted', _interpreted_writer([refs[no] for no in run]))
+                # -- absent values have variable-width serialization and are written with the interpreted codec
+                g.emit(1, f'if {" or ".join(f"({cond})" for cond in absent)}:')
+                g.emit(2, f'parts.append({fallback}(({", ".join(f"v{no}" for no in run)},)))')
+                g.emit(1, 'else:')
+                g.emit(2, f'parts.append({pack}({", ".join(args)}))')
+                continue
+
+            write = g.name('write', _ref_writer(refs[run]))
+            g.emit(1, f'parts.append({write}(v{run}))')
+        g.emit(1, "return b''.join(parts)")
+        return g.compile('encode_metadata', f'<encode_metadata: {proof_type.name}>')
+
+    @staticmethod
+    def _state_codec(proof_type) -> tuple:
+        """Sealed state layout depends only on the seal types, so instead of generating code we specialize codecs
+        with the sets of type numbers for the seal types allowed by the proof type"""
+        refs = proof_type.seals + (proof_type.unseals or [])
+        balance = frozenset(ref.type_pos for ref in refs if ref.type.type is SealType.Type.balance)
+        known = frozenset(ref.type_pos for ref in refs)
+        name = proof_type.name
+
+        def check(type_no):
+            if type_no not in known:
+                raise SchemaError(f'seal type #{type_no} is not defined for proof type `{name}`')
+
+        def balances(type_nos) -> (list, int):
+            is_balance = [type_no in balance for type_no in type_nos]
+            count = is_balance.count(True)
+            if count < len(is_balance):
+                [check(type_no) for (type_no, flag) in zip(type_nos, is_balance) if not flag]
+            return is_balance, count
+
+        def decode_state(blob, type_nos) -> list:
+            # -- all the balances are decoded with a single batch call and then matched with their seals
+            (is_balance, count) = balances(type_nos)
+            values = decode_varints(blob, 0, len(blob), count)[0].tolist()
+            if count == len(is_balance):
+                return values
+            values = iter(values)
+            return [next(values) if flag else None for flag in is_balance]
+
+        def encode_state(type_nos, states) -> bytes:
+            (is_balance, count) = balances(type_nos)
+            if count == len(is_balance):
+                return encode_varints(states)
+            return encode_varints([state for (state, flag) in zip(states, is_balance) if flag])
+
+        return decode_state, encode_state
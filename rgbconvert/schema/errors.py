@@ -12,12 +12,15 @@
 # along with this software.
 # If not, see <https://opensource.org/licenses/MIT>.
 
+from .. import metrics
+
 
 class SchemaError(Exception):
     __slots__ = ['description']
 
     def __init__(self, description: str):
         self.description = description
+        metrics.count_error(self)
 
     def __str__(self):
         return self.description
@@ -30,6 +33,7 @@ class SchemaInternalRefError(SchemaError):
         self.ref_type = ref_type
         self.ref_name = ref_name
         self.section = section
+        metrics.count_error(self, ref_type)
 
     def __str__(self):
         return f'Unable to resolve {self.ref_type} reference inside `{self.section}` named `{self.ref_name}`'
@@ -40,6 +44,7 @@ class SchemaValidationError(SchemaError):
 
     def __init__(self, description: str):
         self.description = description
+        metrics.count_error(self)
 
     def __str__(self):
         return self.description
@@ -59,21 +59,25 @@ class FieldType(ImmutableSerializable):
                 field.parse(self, {'name': name, 'type': tp}, field_name)
         elif isinstance(tp, FieldType.Type):
             object.__setattr__(self, 'name', name)
-            object.__setattr__(self, 'type', type)
+            object.__setattr__(self, 'type', tp)
         else:
-            ValueError('type parameter in FieldType constructor must be either string tyoe name or Type enum object')
+            raise ValueError('type parameter in FieldType constructor must be either string tyoe name or Type enum '
+                             'object')
 
-    def value_from_str(self, s: str):
+    def value_from_str(self, s):
+        """Converts value from structured data source (or an already typed value) into the value of field type"""
         if s is None:
             return None
+        if isinstance(s, list):
+            return [self.value_from_str(item) for item in s]
         lut = {
             FieldType.Type.str: lambda x: x,
-            FieldType.Type.bytes: lambda x: bytes(x),
-            FieldType.Type.sha256: lambda x: Hash256Id(x),
-            FieldType.Type.sha256d: lambda x: Hash256Id(x),
-            FieldType.Type.ripmd160: lambda x: Hash160Id(x),
-            FieldType.Type.hash160: lambda x: Hash160Id(x),
-            FieldType.Type.pubkey: lambda x: PubKey(x),
+            FieldType.Type.bytes: lambda x: bytes.fromhex(x) if isinstance(x, str) else bytes(x),
+            FieldType.Type.sha256: lambda x: x if isinstance(x, Hash256Id) else Hash256Id(x),
+            FieldType.Type.sha256d: lambda x: x if isinstance(x, Hash256Id) else Hash256Id(x),
+            FieldType.Type.ripmd160: lambda x: x if isinstance(x, Hash160Id) else Hash160Id(x),
+            FieldType.Type.hash160: lambda x: x if isinstance(x, Hash160Id) else Hash160Id(x),
+            FieldType.Type.pubkey: lambda x: x if isinstance(x, PubKey) else PubKey(x),
             FieldType.Type.ecdsa: lambda _: None
         }
         result = lut[self.type](s) if self.type in lut.keys() else int(s)
@@ -83,16 +87,16 @@ class FieldType(ImmutableSerializable):
 
     def stream_deserialize_value(self, f):
         lut = {
-            FieldType.Type.u8: lambda: ser_read(f, 1),
+            FieldType.Type.u8: lambda: ser_read(f, 1)[0],
             FieldType.Type.u16: lambda: struct.unpack(b'<H', ser_read(f, 2))[0],
             FieldType.Type.u32: lambda: struct.unpack(b'<I', ser_read(f, 4))[0],
             FieldType.Type.u64: lambda: struct.unpack(b'<Q', ser_read(f, 8))[0],
-            FieldType.Type.i8: lambda: ser_read(f, 1),
+            FieldType.Type.i8: lambda: struct.unpack(b'<b', ser_read(f, 1))[0],
             FieldType.Type.i16: lambda: struct.unpack(b'<h', ser_read(f, 2))[0],
             FieldType.Type.i32: lambda: struct.unpack(b'<i', ser_read(f, 4))[0],
             FieldType.Type.i64: lambda: struct.unpack(b'<q', ser_read(f, 8))[0],
             FieldType.Type.vi: lambda: VarIntSerializer.stream_deserialize(f),
-            FieldType.Type.fvi: lambda: FlagVarIntSerializer.stream_deserialize(f),
+            FieldType.Type.fvi: lambda: FlagVarIntSerializer.stream_deserialize(f)[0],
             FieldType.Type.str: lambda: VarStringSerializer.stream_deserialize(f).decode('utf-8'),
             FieldType.Type.bytes: lambda: BytesSerializer.stream_deserialize(f),
             FieldType.Type.sha256: lambda: Hash256Id.stream_deserialize(f),
@@ -100,13 +104,20 @@ class FieldType(ImmutableSerializable):
             FieldType.Type.ripmd160: lambda: Hash160Id.stream_deserialize(f),
             FieldType.Type.hash160: lambda: Hash160Id.stream_deserialize(f),
             FieldType.Type.pubkey: lambda: PubKey.stream_deserialize(f),
-            FieldType.Type.ecdsa: lambda: None,
+            FieldType.Type.ecdsa: lambda: self._stream_deserialize_ecdsa(f),
         }
         if self.type in lut.keys():
             return lut[self.type]()
         else:
             raise NotImplementedError()
 
+    @staticmethod
+    def _stream_deserialize_ecdsa(f):
+        # -- ECDSA signatures are not supported yet, so the only value we can read is zero byte for absent signature
+        if ser_read(f, 1)[0] != 0x00:
+            raise NotImplementedError('ECDSA deserialization is not implemented')
+        return None
+
     def stream_serialize_value(self, value, f):
         if value is None:
             if self.type is FieldType.Type.str or self.type is FieldType.Type.bytes:
@@ -128,7 +139,7 @@ class FieldType(ImmutableSerializable):
             FieldType.Type.u16: lambda x: f.write(struct.pack(b'<H', x)),
             FieldType.Type.u32: lambda x: f.write(struct.pack(b'<I', x)),
             FieldType.Type.u64: lambda x: f.write(struct.pack(b'<Q', x)),
-            FieldType.Type.i8: lambda x: f.write(bytes([x])),
+            FieldType.Type.i8: lambda x: f.write(struct.pack(b'<b', x)),
             FieldType.Type.i16: lambda x: f.write(struct.pack(b'<h', x)),
             FieldType.Type.i32: lambda x: f.write(struct.pack(b'<i', x)),
             FieldType.Type.i64: lambda x: f.write(struct.pack(b'<q', x)),
@@ -136,16 +147,15 @@ class FieldType(ImmutableSerializable):
             FieldType.Type.fvi: lambda x: FlagVarIntSerializer.stream_serialize((x, False), f),
             FieldType.Type.str: lambda x: VarStringSerializer.stream_serialize(x.encode('utf-8'), f),
             FieldType.Type.bytes: lambda x: BytesSerializer.stream_serialize(x, f),
-            FieldType.Type.sha256: lambda x: x.stream_serealize(f),
-            FieldType.Type.sha256d: lambda x: x.stream_serealize(f),
-            FieldType.Type.ripmd160: lambda x: x.stream_serealize(f),
-            FieldType.Type.hash160: lambda x: x.stream_serealize(f),
-            FieldType.Type.pubkey: lambda x: x.stream_serealize(f),
-            FieldType.Type.ecdsa: lambda _: None,
+            FieldType.Type.sha256: lambda x: x.stream_serialize(f),
+            FieldType.Type.sha256d: lambda x: x.stream_serialize(f),
+            FieldType.Type.ripmd160: lambda x: x.stream_serialize(f),
+            FieldType.Type.hash160: lambda x: x.stream_serialize(f),
+            FieldType.Type.pubkey: lambda x: x.stream_serialize(f),
         }
         if self.type in lut.keys():
             if self.type in [FieldType.Type.sha256, FieldType.Type.sha256d,
-                             FieldType.Type.ripmd160, FieldType.Type.hash160] and not issubclass(value, HashId):
+                             FieldType.Type.ripmd160, FieldType.Type.hash160] and not isinstance(value, HashId):
                 raise ValueError('in order to serialize hash value you need to provide an instance of HashId class')
             lut[self.type](value)
         else:
@@ -153,8 +163,8 @@ class FieldType(ImmutableSerializable):
 
     @classmethod
     def stream_deserialize(cls, f, **kwargs):
-        name = VarStringSerializer.stream_deserialize(f)
-        type_val = ser_read(f, 1)
+        name = VarStringSerializer.stream_deserialize(f).decode('utf-8')
+        type_val = ser_read(f, 1)[0]
         return FieldType(name, FieldType.Type(type_val))
 
     def stream_serialize(self, f, **kwargs):
@@ -17,6 +17,7 @@ from bitcoin.core.serialize import ImmutableSerializable, VarStringSerializer, V
 from .type_ref import TypeRef
 from .errors import *
 from ..parser import *
+from .. import timing
 
 
 class ProofType(ImmutableSerializable):
@@ -27,30 +28,61 @@ class ProofType(ImmutableSerializable):
         'seals': FieldParser(TypeRef, array=True)
     }
 
-    __slots__ = list(FIELDS.keys())
+    # Slots holding runtime-only data (codecs compiled for the proof type), which are not serialized
+    TRANSIENT = ['compiled']
+
+    __slots__ = list(FIELDS.keys()) + TRANSIENT
 
     def __init__(self, **kwargs):
         for name, field in ProofType.FIELDS.items():
             field.parse(self, kwargs, name)
+        object.__setattr__(self, 'compiled', None)
 
     def resolve_refs(self, schema):
         for meta_field in self.fields:
-            meta_field.resolve_ref(schema.field_types)
+            meta_field.resolve_ref(schema.field_types, schema.field_type_index)
             if meta_field.type is None:
                 raise SchemaInternalRefError(ref_type='field', ref_name=meta_field.ref_name, section='fields')
         for seal in self.seals:
-            seal.resolve_ref(schema.seal_types)
+            seal.resolve_ref(schema.seal_types, schema.seal_type_index)
             if seal.type is None:
                 raise SchemaInternalRefError(ref_type='seal', ref_name=seal.ref_name, section='seals')
         if self.unseals is not None:
             for seal in self.unseals:
-                seal.resolve_ref(schema.seal_types)
+                seal.resolve_ref(schema.seal_types, schema.seal_type_index)
                 if seal.type is None:
                     raise SchemaInternalRefError(ref_type='seal', ref_name=seal.ref_name, section='unseals')
 
+    def codec(self):
+        """Returns codec for proof metadata and sealed state compiled for this proof type (see
+        `rgbconvert.schema.compiler`). The codec is generated on the first call and requires resolved references"""
+        codec = getattr(self, 'compiled', None)
+        if codec is None:
+            from .compiler import ProofCodec
+            with timing.span('schema.compile'):
+                codec = ProofCodec(self)
+            object.__setattr__(self, 'compiled', codec)
+        return codec
+
     @classmethod
-    def stream_deserialize(cls, f):
-        pass
+    def stream_deserialize(cls, f, **kwargs):
+        """Reads proof type with its type references resolved against `field_types` and `seal_types` parameters"""
+        if 'field_types' not in kwargs or 'seal_types' not in kwargs:
+            raise AttributeError(
+                'ProofType.stream_deserialize must be provided with `field_types` and `seal_types` parameters')
+        field_refs = {'schema_types': kwargs['field_types'], 'ref_type': 'field', 'section': 'fields'}
+        unseal_refs = {'schema_types': kwargs['seal_types'], 'ref_type': 'seal', 'section': 'unseals'}
+        seal_refs = {'schema_types': kwargs['seal_types'], 'ref_type': 'seal', 'section': 'seals'}
+
+        name = VarStringSerializer.stream_deserialize(f).decode('utf-8')
+        fields = VectorSerializer.stream_deserialize(TypeRef, f, inner_params=field_refs)
+        unseals = VectorSerializer.stream_deserialize(TypeRef, f, inner_params=unseal_refs)
+        seals = VectorSerializer.stream_deserialize(TypeRef, f, inner_params=seal_refs)
+        data = {'name': name, 'fields': fields, 'seals': seals}
+        # -- absent `unseals` are serialized as an empty vector
+        if len(unseals) > 0:
+            data['unseals'] = unseals
+        return ProofType(**data)
 
     def stream_serialize(self, f):
         VarStringSerializer.stream_serialize(self.name.encode('utf-8'), f)
@@ -18,6 +18,7 @@ import bitcoin.segwit_addr as bech32
 from . import *
 from ..data_types import SemVer, Hash256Id
 from ..parser import *
+from .. import timing
 
 
 class Schema(ImmutableSerializable):
@@ -30,16 +31,38 @@ class Schema(ImmutableSerializable):
         'proof_types': FieldParser(ProofType, array=True),
     }
 
-    __slots__ = list(FIELDS.keys())
+    # Name to index lookup tables for `field_types`, `seal_types` and `proof_types`, built by `resolve_refs`
+    INDEXES = ['field_type_index', 'seal_type_index', 'proof_type_index']
+
+    __slots__ = list(FIELDS.keys()) + INDEXES
 
     def __init__(self, **kwargs):
-        for name, field in Schema.FIELDS.items():
-            field.parse(self, kwargs, name)
+        with timing.span('schema.parse_fields'):
+            for name, field in Schema.FIELDS.items():
+                field.parse(self, kwargs, name)
+        for name in Schema.INDEXES:
+            object.__setattr__(self, name, None)
+
+    @staticmethod
+    def type_index(types: list) -> dict:
+        """Builds name to index lookup table for a list of schema types; for duplicated names the first one wins"""
+        index = {}
+        for num, tp in enumerate(types):
+            index.setdefault(tp.name, num)
+        return index
+
+    def build_indexes(self):
+        object.__setattr__(self, 'field_type_index', Schema.type_index(self.field_types))
+        object.__setattr__(self, 'seal_type_index', Schema.type_index(self.seal_types))
+        object.__setattr__(self, 'proof_type_index', Schema.type_index(self.proof_types))
 
+    @timing.timed('schema.resolve_refs')
     def resolve_refs(self):
+        self.build_indexes()
         for proof_type in self.proof_types:
             proof_type.resolve_refs(self)
 
+    @timing.timed('schema.validate')
     def validate(self):
         if len(self.proof_types) is 0:
             raise SchemaValidationError('Schema contains zero proof types defined')
@@ -52,16 +75,28 @@ class Schema(ImmutableSerializable):
         return bech32.encode('sm', 1, self.GetHash())
 
     @classmethod
-    def stream_deserialize(cls, f):
-        name = VarStringSerializer.deserialize(f)
-        #return Schema(
-        #    name=name,
-        #    schema_ver=schema_ver,
-        #    prev_schema=prev_schema,
-        #    field_types=field_types,
-        #    seal_types=seal_types,
-        #    proof_types=proof_types
-        #)
+    @timing.timed('schema.deserialize')
+    def stream_deserialize(cls, f, **kwargs):
+        """Reads consensus-serialized schema. Type references inside proof types are serialized as type indexes,
+        so the returned schema has all of them (and type lookup tables) already resolved and does not require
+        `resolve_refs` call"""
+        name = VarStringSerializer.stream_deserialize(f).decode('utf-8')
+        schema_ver = SemVer.stream_deserialize(f)
+        prev_schema = Hash256Id.stream_deserialize(f)
+        field_types = VectorSerializer.stream_deserialize(FieldType, f)
+        seal_types = VectorSerializer.stream_deserialize(SealType, f)
+        proof_types = VectorSerializer.stream_deserialize(
+            ProofType, f, inner_params={'field_types': field_types, 'seal_types': seal_types})
+        schema = Schema(
+            name=name,
+            schema_ver=schema_ver,
+            prev_schema=prev_schema,
+            field_types=field_types,
+            seal_types=seal_types,
+            proof_types=proof_types
+        )
+        schema.build_indexes()
+        return schema
 
     def stream_serialize(self, f):
         VarStringSerializer.stream_serialize(self.name.encode('utf-8'), f)
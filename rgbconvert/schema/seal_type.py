@@ -13,8 +13,9 @@
 # If not, see <https://opensource.org/licenses/MIT>.
 
 from enum import unique
-from bitcoin.core.serialize import ImmutableSerializable, VarStringSerializer, VarIntSerializer
+from bitcoin.core.serialize import ImmutableSerializable, VarStringSerializer, VarIntSerializer, ser_read
 
+from ..consensus.buffer import read_varint
 from ..parser import *
 
 
@@ -31,7 +32,7 @@ class SealType(ImmutableSerializable):
 
     __slots__ = list(FIELDS.keys())
 
-    def __init__(self, name: str, tp: str):
+    def __init__(self, name: str, tp):
         for field_name, field in SealType.FIELDS.items():
             field.parse(self, {'name': name, 'type': tp}, field_name)
 
@@ -47,27 +48,23 @@ class SealType(ImmutableSerializable):
         else:
             return {}
 
-    def state_from_blob(self, blob: bytes) -> (any, int):
+    def state_from_blob(self, blob, pos: int = 0) -> (any, int):
+        """Reads state from `blob` starting at `pos` offset without copying the blob; returns the state and the offset
+        next to it"""
         if self.type is SealType.Type.balance:
-            if blob[0] == 0xfd:
-                shift = 3
-            elif blob[0] == 0xfe:
-                shift = 5
-            elif blob[0] == 0xff:
-                shift = 9
-            else:
-                shift = 1
-            return VarIntSerializer.deserialize(blob), shift
+            return read_varint(blob, pos, len(blob))
         else:
-            return None, 0
+            return None, pos
 
     def stream_serialize_state(self, state, f):
         if self.type is SealType.Type.balance:
             VarIntSerializer.stream_serialize(state, f)
 
     @classmethod
-    def stream_deserialize(cls, f):
-        pass
+    def stream_deserialize(cls, f, **kwargs):
+        name = VarStringSerializer.stream_deserialize(f).decode('utf-8')
+        type_val = ser_read(f, 1)[0]
+        return SealType(name, SealType.Type(type_val))
 
     def stream_serialize(self, f):
         VarStringSerializer.stream_serialize(self.name.encode('utf-8'), f)
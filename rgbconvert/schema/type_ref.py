@@ -17,7 +17,7 @@ from bitcoin.core.serialize import ImmutableSerializable, VarIntSerializer, Vect
 
 from ..data_types import PubKey
 from ..parser import *
-from ..schema import FieldType, SchemaError
+from ..schema import FieldType, SchemaError, SchemaInternalRefError
 
 
 class TypeRef(ImmutableSerializable):
@@ -38,6 +38,14 @@ class TypeRef(ImmutableSerializable):
         def is_fixed(self) -> bool:
             return self.min() is self.max() and self.min() > 0
 
+        @classmethod
+        def from_bounds(cls, min: int, max: int):
+            """Returns usage matching consensus-serialized `min` and `max` bounds"""
+            try:
+                return next(usage for usage in cls if usage.min() == min and usage.max() == max)
+            except StopIteration:
+                raise ValueError(f'there is no type usage with {min}..{max} bounds')
+
     FIELDS = {
         'ref_name': FieldParser(str),
         'bounds': FieldParser(Usage)
@@ -49,14 +57,15 @@ class TypeRef(ImmutableSerializable):
         for field_name, field in TypeRef.FIELDS.items():
             field.parse(self, {'ref_name': name, 'bounds': bounds}, field_name)
 
-    def resolve_ref(self, schema_types: list):
-        try:
-            pos = next(num for num, type in enumerate(schema_types) if type.name == self.ref_name)
-            object.__setattr__(self, 'type_pos', pos)
-            object.__setattr__(self, 'type', schema_types[pos])
-        except StopIteration:
-            object.__setattr__(self, 'type_pos', None)
-            object.__setattr__(self, 'type', None)
+    def resolve_ref(self, schema_types: list, index: dict = None):
+        """Resolves reference by type name using `index` name to position lookup table (see `Schema.resolve_refs`)
+        or, if the table is not provided, by scanning `schema_types` list"""
+        if index is not None:
+            pos = index.get(self.ref_name)
+        else:
+            pos = next((num for num, type in enumerate(schema_types) if type.name == self.ref_name), None)
+        object.__setattr__(self, 'type_pos', pos)
+        object.__setattr__(self, 'type', schema_types[pos] if pos is not None else None)
 
     def stream_deserialize_value(self, f):
         if self.bounds is TypeRef.Usage.single:
@@ -66,15 +75,24 @@ class TypeRef(ImmutableSerializable):
         elif self.bounds is TypeRef.Usage.optional:
             if self.type.type is FieldType.Type.pubkey:
                 key = ser_read(f, 1)
-                if key[0] is 0:
+                if key[0] == 0:
                     return None
                 data = key + ser_read(f, 32)
                 return PubKey.deserialize(data)
             elif self.type.type is FieldType.Type.ecdsa:
                 key = ser_read(f, 1)
-                if key[0] is 0:
+                if key[0] == 0:
                     return None
                 raise NotImplementedError('ECDSA deserealization is not implemented')
+            elif self.type.type not in [FieldType.Type.fvi, FieldType.Type.str, FieldType.Type.bytes,
+                                        FieldType.Type.sha256, FieldType.Type.sha256d,
+                                        FieldType.Type.ripmd160, FieldType.Type.hash160]:
+                # -- absent integer values are not serialized at all, so they can be detected only at the end of data
+                pos = f.tell()
+                if len(f.read(1)) == 0:
+                    return None
+                f.seek(pos)
+                return self.type.stream_deserialize_value(f)
 
             try:
                 value = self.type.stream_deserialize_value(f)
@@ -93,25 +111,51 @@ class TypeRef(ImmutableSerializable):
 
             if self.type.type is FieldType.Type.fvi:
                 pass
-            elif self.type.type is FieldType.Type.str:
-                value = None if value is b'\x00' or len(value) is 0 else value
-            elif self.type.type is FieldType.Type.bytes:
-                value = None if len(value) is 0 else value
-            elif self.type.type in [FieldType.Type.sha256, FieldType.Type.sha256d]:
-                value = None if value is bytes([0] * 32) else value
-            elif self.type.type in [FieldType.Type.ripmd160, FieldType.Type.hash160]:
-                value = None if value is bytes([0] * 20) else value
-            else:
-                raise SchemaError(f'optional fields can be only of `str`, `fvi`, `bytes` and complex types')
+            elif self.type.type is FieldType.Type.str or self.type.type is FieldType.Type.bytes:
+                value = None if len(value) == 0 else value
+            elif value.bytes == bytes(len(value)):
+                # -- zero hashes are used to serialize absent hash values
+                value = None
         else:
             no = VarIntSerializer.stream_deserialize(f)
             value = [self.type.stream_deserialize_value(f) for n in range(0, no)]
 
         return value
 
+    def stream_serialize_value(self, value, f):
+        if self.bounds is TypeRef.Usage.single or self.bounds is TypeRef.Usage.optional:
+            self.type.stream_serialize_value(value, f)
+        elif self.bounds.is_fixed():
+            if value is None or len(value) != self.bounds.min():
+                raise SchemaError(f'field `{self.ref_name}` requires exactly {self.bounds.min()} values, '
+                                  f'got `{value}` instead')
+            [self.type.stream_serialize_value(item, f) for item in value]
+        else:
+            value = [] if value is None else value
+            if len(value) < self.bounds.min():
+                raise SchemaError(f'field `{self.ref_name}` requires at least {self.bounds.min()} values, '
+                                  f'got {len(value)} instead')
+            VarIntSerializer.stream_serialize(len(value), f)
+            [self.type.stream_serialize_value(item, f) for item in value]
+
     @classmethod
-    def stream_deserialize(cls, f):
-        pass
+    def stream_deserialize(cls, f, **kwargs):
+        """Reads type reference and resolves it against the list of schema types provided in `schema_types`
+        parameter, which must be either `Schema.field_types` or `Schema.seal_types`"""
+        if 'schema_types' not in kwargs:
+            raise AttributeError('TypeRef.stream_deserialize must be provided with `schema_types` parameter')
+        schema_types = kwargs['schema_types']
+
+        type_pos = VarIntSerializer.stream_deserialize(f)
+        bounds = TypeRef.Usage.from_bounds(ser_read(f, 1)[0], ser_read(f, 1)[0])
+        if type_pos >= len(schema_types):
+            raise SchemaInternalRefError(ref_type=kwargs.get('ref_type', 'type'), ref_name=f'#{type_pos}',
+                                         section=kwargs.get('section', 'proof_types'))
+
+        type_ref = TypeRef(schema_types[type_pos].name, bounds)
+        object.__setattr__(type_ref, 'type_pos', type_pos)
+        object.__setattr__(type_ref, 'type', schema_types[type_pos])
+        return type_ref
 
     def stream_serialize(self, f):
         VarIntSerializer.stream_serialize(self.type_pos, f)
@@ -0,0 +1,165 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Persistent index of single-use seals backed by sqlite3, answering which proof defined a seal with a given outpoint
+and which proofs closed it.
+
+Short-form outpoints of the seals (the ones without txid) are resolved against the `txid` of the proof defining them;
+seals of proofs without `txid` can't be indexed. Proofs do not contain the inputs of their transactions, so the
+outpoints of the seals closed by a proof must be provided along with it (e.g. taken from its witness transaction);
+closings are stored by these outpoints, so proofs can be indexed in any order. Seals closed by more than one proof are
+reported as double spends; closings of proofs added without their spent outpoints are unknown, and they are never
+reported as such."""
+
+import sqlite3
+from contextlib import contextmanager
+
+from .data_types import Hash256Id, OutPoint
+from .proofs.proof import Proof
+
+
+class SealIndex:
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS seals (txid BLOB NOT NULL, vout INTEGER NOT NULL, proof BLOB NOT NULL, '
+        'type_no INTEGER NOT NULL, PRIMARY KEY (txid, vout, proof)) WITHOUT ROWID',
+        'CREATE TABLE IF NOT EXISTS spends (txid BLOB NOT NULL, vout INTEGER NOT NULL, proof BLOB NOT NULL, '
+        'PRIMARY KEY (txid, vout, proof)) WITHOUT ROWID',
+        # -- earlier versions stored closings by parent proof and seal type, which can't tell sibling proofs apart
+        'DROP TABLE IF EXISTS closings',
+    ]
+    INDEXES = [
+        'CREATE INDEX IF NOT EXISTS seals_proof ON seals (proof, type_no)',
+    ]
+
+    __slots__ = ['db', 'batch_size', 'pending', 'skipped', 'unknown']
+
+    def __init__(self, path: str, batch_size: int = 10000):
+        self.db = sqlite3.connect(path, isolation_level=None)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        for statement in SealIndex.SCHEMA + SealIndex.INDEXES:
+            self.db.execute(statement)
+        self.batch_size = batch_size
+        # Number of proofs added since the last commit
+        self.pending = 0
+        # Number of seals which were not indexed since their proof has no txid
+        self.skipped = 0
+        # Number of non-root proofs added without spent outpoints, so the seals they close are unknown
+        self.unknown = 0
+
+    def add(self, proof: Proof, spent=None):
+        """Indexes seals defined by the proof, which must be resolved against a schema, and seals closed by it, which
+        are given as `spent` outpoints (`OutPoint`s or `txid:vout` strings). Changes are committed in batches of
+        `batch_size` proofs"""
+        if proof.proof_type is None:
+            raise ValueError('proof must be resolved against a schema before indexing')
+        if self.pending == 0:
+            self.db.execute('BEGIN')
+        proof_id = proof.GetHash()
+
+        seals = []
+        for seal in proof.seals:
+            txid = seal.outpoint.txid if seal.outpoint.txid is not None else \
+                proof.txid.bytes if proof.txid is not None else None
+            if txid is None:
+                self.skipped += 1
+                continue
+            seals.append((txid, seal.outpoint.vout, proof_id, seal.type_no))
+        self.db.executemany('INSERT OR IGNORE INTO seals VALUES (?, ?, ?, ?)', seals)
+
+        if spent is not None:
+            spends = [SealIndex._outpoint(outpoint) + (proof_id,) for outpoint in spent]
+            self.db.executemany('INSERT OR IGNORE INTO spends VALUES (?, ?, ?)', spends)
+        elif len(proof.parents or []) > 0 or len(proof.proof_type.unseals or []) > 0:
+            self.unknown += 1
+
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.commit()
+
+    def extend(self, proofs, spent: dict = None) -> int:
+        """Indexes all proofs from an iterable; `spent` maps proof ids (as `bytes`) to the outpoints they spend"""
+        count = 0
+        for proof in proofs:
+            self.add(proof, spent.get(proof.GetHash()) if spent is not None else None)
+            count += 1
+        self.commit()
+        return count
+
+    def commit(self):
+        if self.pending > 0:
+            self.db.execute('COMMIT')
+            self.pending = 0
+
+    @contextmanager
+    def bulk(self):
+        """Bulk-load mode for initial indexing of large amounts of proofs: secondary indexes are dropped and
+        re-created at the end, and durability guarantees are relaxed until the end of the mode"""
+        self.commit()
+        self.db.execute('DROP INDEX IF EXISTS seals_proof')
+        self.db.execute('PRAGMA synchronous=OFF')
+        batch_size = self.batch_size
+        self.batch_size = max(batch_size, 100000)
+        try:
+            yield self
+            self.commit()
+        finally:
+            if self.pending > 0:
+                self.db.execute('ROLLBACK')
+                self.pending = 0
+            self.batch_size = batch_size
+            for statement in SealIndex.INDEXES:
+                self.db.execute(statement)
+            self.db.execute('PRAGMA synchronous=NORMAL')
+
+    @staticmethod
+    def _outpoint(outpoint) -> tuple:
+        outpoint = outpoint if isinstance(outpoint, OutPoint) else OutPoint(outpoint)
+        if outpoint.txid is None:
+            raise ValueError('seal lookup requires full outpoint with txid')
+        return outpoint.txid, outpoint.vout
+
+    def created_by(self, outpoint) -> list:
+        """Returns ids of the proofs defining seal with the given outpoint (there must be no more than one)"""
+        rows = self.db.execute('SELECT proof FROM seals WHERE txid = ? AND vout = ?', SealIndex._outpoint(outpoint))
+        return [Hash256Id(proof) for (proof,) in rows]
+
+    def closed_by(self, outpoint) -> list:
+        """Returns ids of the proofs closing seal with the given outpoint; more than one id means a double spend"""
+        rows = self.db.execute('SELECT proof FROM spends WHERE txid = ? AND vout = ?', SealIndex._outpoint(outpoint))
+        return [Hash256Id(proof) for (proof,) in rows]
+
+    def double_spends(self):
+        """Iterates over outpoints of the seals which were closed by more than one proof, yielding pairs of the
+        outpoint and list of ids of the closing proofs"""
+        rows = self.db.execute('SELECT txid, vout, group_concat(hex(proof)) FROM spends '
+                               'GROUP BY txid, vout HAVING count(*) > 1')
+        for (txid, vout, proofs) in rows:
+            ids = sorted(proofs.split(','))
+            yield OutPoint(txid, vout), [Hash256Id(bytes.fromhex(proof)) for proof in ids]
+
+    def close(self):
+        self.commit()
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+__all__ = [
+    'SealIndex'
+]
@@ -0,0 +1,126 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Timing of processing stages (parsing, schema resolution, state and metadata decoding, serialization, hashing).
+
+Stages are marked with `span` context managers or `timed` decorators. Unless timing is switched on with `enabled`,
+a span is a shared no-op object, so instrumented code pays for a single flag check only. With timing enabled, each
+stage accumulates number of calls, total time and self time (total time minus the time of stages nested into it);
+stages are accounted per thread and merged into a single process-wide `report`."""
+
+import time
+import threading
+from functools import wraps
+
+# Set to `True` in order to collect stage timings
+enabled = False
+
+# Stage name -> [number of calls, total time, self time]
+_stats = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ['name', 'start', 'nested']
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        stack = getattr(_local, 'stack', None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.nested = 0.0
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        stack = _local.stack
+        stack.pop()
+        if len(stack) > 0:
+            stack[-1].nested += elapsed
+        with _lock:
+            stat = _stats.get(self.name)
+            if stat is None:
+                stat = _stats[self.name] = [0, 0.0, 0.0]
+            stat[0] += 1
+            stat[1] += elapsed
+            stat[2] += elapsed - self.nested
+        return False
+
+
+class _NoSpan:
+    __slots__ = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name: str):
+    """Returns context manager accounting the time spent inside it to the `name` stage"""
+    return _Span(name) if enabled else _NO_SPAN
+
+
+def timed(name: str):
+    """Decorator accounting the time of function calls to the `name` stage"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            with _Span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def report() -> dict:
+    """Returns stage name -> {`count`, `total`, `self`} dict with times in seconds, sorted by the self time"""
+    with _lock:
+        items = [(name, list(stat)) for name, stat in _stats.items()]
+    items.sort(key=lambda item: item[1][2], reverse=True)
+    return {name: {'count': count, 'total': total, 'self': own} for name, (count, total, own) in items}
+
+
+def merge(stages: dict):
+    """Adds stage timings from a `report` of another process (like a batch worker)"""
+    with _lock:
+        for name, stage in stages.items():
+            stat = _stats.setdefault(name, [0, 0.0, 0.0])
+            stat[0] += stage['count']
+            stat[1] += stage['total']
+            stat[2] += stage['self']
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+__all__ = [
+    'span',
+    'timed',
+    'report',
+    'merge',
+    'reset'
+]
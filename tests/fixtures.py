@@ -0,0 +1,60 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Proof histories for the sample schema: an issue of assets and transfers of them"""
+
+import os
+
+from rgbconvert.files import load_schema
+from rgbconvert.proofs import Proof
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+ISSUE_TXID = '5700bdccfc6209a5460dc124403eed6c3f5ba58da0123b392ab0b1fa23306f27'
+
+
+def sample_schema():
+    return load_schema(os.path.join(SAMPLES, 'rgb_schema.yaml'))
+
+
+def issue(schema, balances: list) -> Proof:
+    """Issue with `assets` seals of the given balances at outputs 0, 4, 5..., and other seals at outputs 1-3"""
+    vouts = [0] + list(range(4, 3 + len(balances)))
+    seals = [{'type_name': 'assets', 'outpoint': f'{ISSUE_TXID}:{vout}', 'amount': amount}
+             for (vout, amount) in zip(vouts, balances)]
+    seals += [{'type_name': name, 'outpoint': f'{ISSUE_TXID}:{vout}'}
+              for (vout, name) in [(1, 'inflation'), (3, 'upgrade'), (2, 'pruning')]]
+    return Proof(schema_obj=schema, ver=1, format='root', schema=schema.bech32_id(), network='bitcoin:testnet',
+                 root=f'{ISSUE_TXID}:4', type_name='primary_issue', fields={'ticker': 'PLS', 'dust_limit': 1},
+                 seals=seals)
+
+
+def transfer(schema, parents: list, balances: list, no: int = 0) -> Proof:
+    """Transfer of assets from the parent proofs into short-form seals of its own transaction, which txid is derived
+    from `no`"""
+    seals = [{'type_name': 'assets', 'outpoint': vout, 'amount': amount} for (vout, amount) in enumerate(balances)]
+    return Proof(schema_obj=schema, type_name='asset_transfer', seals=seals, txid=txid(no),
+                 parents=[parent.bech32_id() for parent in parents])
+
+
+def txid(no: int) -> str:
+    return bytes([0x22, no]).hex() * 16
+
+
+def seal_outpoint(proof: Proof, no: int) -> str:
+    """Full outpoint (`txid:vout`) of the proof seal with the given number; short-form outpoints are resolved against
+    the proof txid"""
+    outpoint = proof.seals[no].outpoint
+    txid = outpoint.txid if outpoint.txid is not None else proof.txid.bytes
+    return f'{txid.hex()}:{outpoint.vout}'
@@ -0,0 +1,158 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from rgbconvert import files
+from rgbconvert.aio import aread_proofs, awrite_proof, atranscode_proofs
+
+from .fixtures import sample_schema, issue, transfer
+
+
+class Tracker:
+    """Wraps a function, counting its calls and the largest number of calls running at the same time"""
+
+    def __init__(self, func, delay: float = 0.01):
+        self.func = func
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            return self.func(*args, **kwargs)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+class AioTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = sample_schema()
+        first = issue(self.schema, [600, 400])
+        self.proofs = [first] + [transfer(self.schema, [first], [no + 1], no) for no in range(11)]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.paths = []
+        for (no, proof) in enumerate(self.proofs):
+            self.paths.append(os.path.join(self.tmp.name, f'{no}.json' if no % 2 else f'{no}.bin'))
+            files.save_proof(proof, self.paths[-1])
+        self.executor = ThreadPoolExecutor(max_workers=16)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.tmp.cleanup()
+
+    def ids(self, proofs) -> list:
+        return [proof.GetHash() for proof in proofs]
+
+    def read(self, paths, **kwargs) -> list:
+        async def read():
+            return [proof async for proof in aread_proofs(paths, self.schema, executor=self.executor, **kwargs)]
+        return asyncio.run(read())
+
+    def test_read(self):
+        self.assertEqual(self.ids(self.read(self.paths)), self.ids(self.proofs))
+        self.assertEqual(self.read([]), [])
+
+    def test_read_unordered(self):
+        proofs = self.read(self.paths, ordered=False, concurrency=4)
+        self.assertEqual(sorted(self.ids(proofs)), sorted(self.ids(self.proofs)))
+
+    def test_read_concurrency(self):
+        tracker = Tracker(files.load_proof)
+        with mock.patch.object(files, 'load_proof', tracker):
+            proofs = self.read(self.paths, concurrency=3)
+        self.assertEqual(self.ids(proofs), self.ids(self.proofs))
+        self.assertEqual(tracker.calls, len(self.paths))
+        self.assertEqual(tracker.max_active, 3)
+        with self.assertRaises(ValueError):
+            self.read(self.paths, concurrency=0)
+
+    def test_read_backpressure(self):
+        tracker = Tracker(files.load_proof, 0)
+
+        async def read_first():
+            proofs = aread_proofs(iter(self.paths), self.schema, concurrency=3, executor=self.executor)
+            first = await proofs.__anext__()
+            # -- no more files are read until the consumer asks for the next proof
+            await asyncio.sleep(0.05)
+            calls = tracker.calls
+            await proofs.aclose()
+            return first, calls
+
+        with mock.patch.object(files, 'load_proof', tracker):
+            (first, calls) = asyncio.run(read_first())
+        self.assertEqual(first.GetHash(), self.proofs[0].GetHash())
+        self.assertEqual(calls, 3)
+
+    def test_read_errors(self):
+        paths = self.paths[:2] + [os.path.join(self.tmp.name, 'missing.bin')] + self.paths[2:4]
+        with self.assertRaises(FileNotFoundError):
+            self.read(paths)
+
+        results = self.read(paths, return_exceptions=True)
+        self.assertIsInstance(results[2], FileNotFoundError)
+        self.assertEqual(self.ids(results[:2] + results[3:]), self.ids(self.proofs[:4]))
+
+    def test_write(self):
+        tracker = Tracker(files.save_proof)
+        paths = [os.path.join(self.tmp.name, f'out{no}.yaml') for no in range(len(self.proofs))]
+
+        async def write():
+            limit = asyncio.Semaphore(2)
+            return await asyncio.gather(*[awrite_proof(proof, path, executor=self.executor, limit=limit)
+                                          for (proof, path) in zip(self.proofs, paths)])
+
+        with mock.patch.object(files, 'save_proof', tracker):
+            self.assertEqual(asyncio.run(write()), ['n/a'] * len(self.proofs))
+        self.assertEqual(tracker.max_active, 2)
+        self.assertEqual(self.ids(files.load_proof(path, self.schema) for path in paths), self.ids(self.proofs))
+
+        path = os.path.join(self.tmp.name, 'out.bin')
+        self.assertEqual(asyncio.run(awrite_proof(self.proofs[0], path)), len(self.proofs[0].serialize()))
+
+    def test_transcode(self):
+        missing = os.path.join(self.tmp.name, 'missing.json')
+        jobs = [(path, os.path.join(self.tmp.name, f'out{no}.yaml')) for (no, path) in enumerate(self.paths)]
+        jobs.insert(3, (missing, os.path.join(self.tmp.name, 'missing.yaml')))
+
+        async def transcode():
+            return [result async for result in atranscode_proofs(jobs, self.schema, concurrency=2,
+                                                                  executor=self.executor)]
+
+        results = asyncio.run(transcode())
+        self.assertEqual([(infile, outfile) for (infile, outfile, _) in results], jobs)
+        self.assertIsInstance(results[3][2], FileNotFoundError)
+        self.assertFalse(os.path.exists(results[3][1]))
+        del jobs[3]
+        self.assertEqual(self.ids(files.load_proof(outfile, self.schema) for (_, outfile) in jobs),
+                         self.ids(self.proofs))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import os
+import tempfile
+import unittest
+
+from rgbconvert.files import load_schema
+from rgbconvert.archive import ArchiveReader, ArchiveWriter
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+
+class ArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = load_schema(os.path.join(SAMPLES, 'rgb_schema.yaml'))
+        self.data = []
+        for name in ['shares_issue.bin', 'shares_transfer.bin']:
+            with open(os.path.join(SAMPLES, name), 'rb') as f:
+                self.data.append(f.read())
+        (fd, self.path) = tempfile.mkstemp(suffix='.rgba')
+        os.close(fd)
+        writer = ArchiveWriter(self.path, self.schema)
+        self.ids = [writer.append_raw(data) for data in self.data]
+        writer.close()
+
+    def tearDown(self):
+        os.unlink(self.path)
+
+    def test_proofs_outlive_archive(self):
+        with ArchiveReader(self.path, self.schema) as reader:
+            proof = reader.get(self.ids[0])
+            items = list(reader.items())
+        self.assertEqual(proof.serialize(), self.data[0])
+        self.assertEqual(sorted(proof.serialize() for (_, proof) in items), sorted(self.data))
+
+    def test_lazy_proofs(self):
+        with ArchiveReader(self.path, self.schema) as reader:
+            proof = reader.get(self.ids[1], lazy=True)
+            self.assertEqual(proof.serialize(), self.data[1])
+            del proof
+
+    def test_missing_proof(self):
+        with ArchiveReader(self.path) as reader:
+            self.assertIsNone(reader.get(bytes(32)))
@@ -0,0 +1,115 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Differential tests of proof codecs: compiled and interpreted codecs, stream and buffer readers and lazy proofs
+must produce the same proofs and the same consensus serialization for synthetic proofs of all field types."""
+
+import io
+import os
+import sys
+import unittest
+
+from bitcoin.core.serialize import SerializationTruncationError
+
+from rgbconvert.proofs import Proof, LazyProof
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import synthetic  # noqa: E402
+
+# Keyword arguments of `synthetic.make_proof` for the tested proofs
+PROOFS = [
+    {'type_name': 'issue', 'seals': 1},
+    {'type_name': 'issue', 'seals': 12},
+    {'type_name': 'transfer', 'seals': 1},
+    {'type_name': 'transfer', 'seals': 12, 'repeat': 3},
+    {'type_name': 'transfer', 'seals': 40, 'parents': 3, 'repeat': 0},
+    {'type_name': 'transfer', 'seals': 300, 'parents': 1, 'repeat': 2},
+]
+
+SEEDS = range(4)
+
+
+class CodecTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = synthetic.make_schema(4)
+        cls.proofs = [synthetic.make_proof(cls.schema, seed=seed, **kwargs) for kwargs in PROOFS for seed in SEEDS]
+
+    def test_serialize(self):
+        for proof in self.proofs:
+            with self.subTest(type_name=proof.type_name, seals=len(proof.seals)):
+                self.assertEqual(proof.serialize({'compiled': True}), proof.serialize({'compiled': False}))
+
+    def test_round_trip(self):
+        for proof in self.proofs:
+            data = proof.serialize()
+            expected = proof.structure_serialize()
+            for compiled in [True, False]:
+                with self.subTest(type_name=proof.type_name, seals=len(proof.seals), compiled=compiled):
+                    decoded = [
+                        Proof.stream_deserialize(io.BytesIO(data), schema_obj=self.schema, compiled=compiled),
+                        Proof.from_buffer(data, 0, self.schema, compiled=compiled)[0],
+                        Proof.from_buffer(bytearray(data), 0, self.schema, compiled=compiled)[0],
+                        LazyProof.from_buffer(data, 0, self.schema, compiled=compiled)[0],
+                    ]
+                    for other in decoded:
+                        self.assertEqual(other.structure_serialize(), expected)
+                        self.assertEqual(other.serialize({'compiled': compiled}), data)
+                        self.assertEqual(other.GetHash(), proof.GetHash())
+
+    def test_offset(self):
+        blobs = [proof.serialize() for proof in self.proofs]
+        buf = b''.join(blobs)
+        offset = 0
+        for data in blobs:
+            (proof, consumed) = Proof.from_buffer(buf, offset, self.schema, size=len(data))
+            self.assertEqual(consumed, len(data))
+            self.assertEqual(proof.serialize(), data)
+            offset += consumed
+
+    def test_unresolved(self):
+        for proof in self.proofs:
+            data = proof.serialize()
+            (unresolved, _) = Proof.from_buffer(data)
+            self.assertEqual(unresolved.serialize(), data)
+            unresolved.resolve_schema(self.schema)
+            self.assertEqual(unresolved.structure_serialize(), proof.structure_serialize())
+
+    def test_truncated(self):
+        # -- every prefix of each proof is decoded, so only the proofs with less than 100 seals are checked
+        for proof in [proof for proof in self.proofs[::len(SEEDS)] if len(proof.seals) < 100]:
+            data = proof.serialize()
+            for size in range(len(data)):
+                for compiled in [True, False]:
+                    with self.subTest(type_name=proof.type_name, seals=len(proof.seals), size=size,
+                                      compiled=compiled):
+                        readers = [
+                            lambda: Proof.stream_deserialize(io.BytesIO(data[:size]), schema_obj=self.schema,
+                                                             compiled=compiled),
+                            lambda: Proof.from_buffer(data[:size], 0, self.schema, compiled=compiled)[0],
+                            lambda: Proof.from_buffer(data, 0, self.schema, size=size, compiled=compiled)[0],
+                        ]
+                        for read in readers:
+                            try:
+                                truncated = read()
+                            except SerializationTruncationError:
+                                continue
+                            # -- prunable data are optional, so proofs cut right before them are still valid
+                            self.assertIsNone(truncated.txid)
+                            self.assertIsNone(truncated.parents)
+                            self.assertEqual(truncated.serialize(), data[:size])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import os
+import sys
+import unittest
+
+from rgbconvert.proofs import Proof, InternPool, CompactProof
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import synthetic  # noqa: E402
+
+
+class CompactProofTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.schema = synthetic.make_schema(4)
+        cls.proofs = [synthetic.make_proof(cls.schema, type_name='issue', seals=5, seed=0),
+                      synthetic.make_proof(cls.schema, type_name='transfer', seals=30, parents=2, repeat=2, seed=1)]
+
+    def test_round_trip(self):
+        for proof in self.proofs:
+            data = proof.serialize()
+            for source in [proof, Proof.from_buffer(data, 0, self.schema)[0]]:
+                record = CompactProof.from_proof(source)
+                self.assertEqual(record.to_proof().serialize(), data)
+                self.assertEqual(record.to_proof(self.schema).structure_serialize(), proof.structure_serialize())
+                self.assertEqual(CompactProof.deserialize(record.serialize()).serialize(), data)
+
+    def test_pool(self):
+        pool = InternPool()
+        data = self.proofs[0].serialize()
+        records = [CompactProof.from_proof(Proof.from_buffer(data, 0, self.schema)[0], pool) for _ in range(2)]
+        self.assertIs(records[0].schema, records[1].schema)
+        self.assertEqual(records[0].txids, records[1].txids)
+        self.assertTrue(all(a is b for (a, b) in zip(records[0].txids, records[1].txids)))
+        size = len(pool)
+        # -- without a pool, ids are not kept beyond the conversion
+        records = [CompactProof.from_proof(Proof.from_buffer(data, 0, self.schema)[0]) for _ in range(2)]
+        self.assertIsNot(records[0].schema, records[1].schema)
+        self.assertEqual(len(pool), size)
+        pool.clear()
+        self.assertEqual(len(pool), 0)
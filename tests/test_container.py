@@ -0,0 +1,51 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import io
+import os
+import unittest
+
+from rgbconvert.files import load_schema
+from rgbconvert.container import ContainerError, ContainerReader, ContainerWriter
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+
+class ContainerTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = load_schema(os.path.join(SAMPLES, 'rgb_schema.yaml'))
+        self.data = []
+        for name in ['shares_issue.bin', 'shares_transfer.bin']:
+            with open(os.path.join(SAMPLES, name), 'rb') as f:
+                self.data.append(f.read())
+        self.f = io.BytesIO()
+        writer = ContainerWriter(self.f, self.schema)
+        # -- offsets of the frames
+        self.frames = []
+        for data in self.data:
+            self.frames.append(self.f.tell())
+            writer.append_raw(data)
+
+    def test_read(self):
+        self.f.seek(0)
+        proofs = list(ContainerReader(self.f, self.schema))
+        self.assertEqual([proof.serialize() for proof in proofs], self.data)
+
+    def test_corrupted_frame(self):
+        buf = self.f.getbuffer()
+        buf[-1] ^= 0xff
+        del buf
+        self.f.seek(0)
+        with self.assertRaisesRegex(ContainerError, f'at offset {self.frames[1]}$'):
+            list(ContainerReader(self.f, self.schema))
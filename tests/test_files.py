@@ -0,0 +1,118 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import json
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from rgbconvert import files
+
+from .fixtures import SAMPLES, sample_schema, issue, transfer
+
+
+class FilesTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = sample_schema()
+        self.issue = issue(self.schema, [600, 400])
+        self.proofs = [self.issue, transfer(self.schema, [self.issue], [600], 1),
+                       transfer(self.schema, [self.issue], [300, 100], 2)]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.umask = os.umask(0o022)
+        os.umask(self.umask)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def assertSameProofs(self, proofs: list, expected: list):
+        self.assertEqual([proof.GetHash() for proof in proofs], [proof.GetHash() for proof in expected])
+        self.assertEqual([proof.structure_serialize() for proof in proofs],
+                         [proof.structure_serialize() for proof in expected])
+
+    def test_guess_format(self):
+        for (name, format) in [('a.yaml', 'yaml'), ('a.YML', 'yaml'), ('a.json', 'json'), ('a.jsonl', 'jsonl'),
+                               ('a.ndjson', 'jsonl'), ('a.bin', 'binary'), ('a', 'binary')]:
+            self.assertEqual(files.guess_format(name), format)
+        self.assertEqual(files.guess_format('a.yaml', 'JSON'), 'json')
+        with self.assertRaises(ValueError):
+            files.guess_format('a.yaml', 'xml')
+
+    def test_proof_round_trip(self):
+        for format in files.FORMATS:
+            for proof in self.proofs:
+                with self.subTest(format=format, type_name=proof.type_name):
+                    path = self.path(f'proof{files.FORMAT_EXTENSIONS[format]}')
+                    files.save_proof(proof, path)
+                    self.assertSameProofs([files.load_proof(path, self.schema)], [proof])
+                    self.assertSameProofs(list(files.load_proofs(path, self.schema)), [proof])
+
+    def test_proofs_round_trip(self):
+        path = self.path('proofs.jsonl')
+        self.assertEqual(files.save_proofs(iter(self.proofs), path), len(self.proofs))
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), len(self.proofs))
+        self.assertEqual([json.loads(line) for line in lines], [proof.structure_serialize() for proof in self.proofs])
+        self.assertSameProofs(list(files.load_proofs(path, self.schema)), self.proofs)
+
+        # -- empty lines are skipped
+        with open(path, 'w') as f:
+            f.write('\n' + '\n\n'.join(lines) + '\n  \n')
+        self.assertSameProofs(list(files.load_proofs(path, self.schema)), self.proofs)
+
+    def test_jsonl_single_proof(self):
+        path = self.path('proofs.jsonl')
+        files.save_proofs(self.proofs, path)
+        with self.assertRaises(ValueError):
+            files.load_proof(path, self.schema)
+        files.save_proofs([], path)
+        self.assertEqual(list(files.load_proofs(path, self.schema)), [])
+        with self.assertRaises(ValueError):
+            files.load_proof(path, self.schema)
+
+    def test_malformed_jsonl(self):
+        path = self.path('proofs.jsonl')
+        files.save_proofs(self.proofs[:1], path)
+        with open(path, 'a') as f:
+            f.write('{"ver": \n')
+        proofs = files.load_proofs(path, self.schema)
+        self.assertSameProofs([next(proofs)], self.proofs[:1])
+        with self.assertRaisesRegex(ValueError, 'line 2'):
+            next(proofs)
+
+    def test_concurrent_save(self):
+        # -- threads of a process writing the same output must not share temporary files
+        path = self.path('proof.json')
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for _ in executor.map(lambda proof: files.save_proof(proof, path), self.proofs * 10):
+                pass
+        self.assertIn(files.load_proof(path, self.schema).GetHash(), [proof.GetHash() for proof in self.proofs])
+        self.assertEqual(os.listdir(self.tmp.name), ['proof.json'])
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o666 & ~self.umask)
+
+    def test_schema_json(self):
+        with open(os.path.join(SAMPLES, 'rgb_schema.yaml')) as f:
+            data = files.load_structure(f, 'yaml')
+        path = self.path('schema.json')
+        with open(path, 'w') as f:
+            files.dump_structure(data, f, 'json')
+        self.assertEqual(files.load_schema(path).bech32_id(), self.schema.bech32_id())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import unittest
+
+from rgbconvert.history import History, HistoryNode
+
+from .fixtures import sample_schema, issue, transfer, seal_outpoint
+
+Status = HistoryNode.Status
+
+
+class HistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = sample_schema()
+        self.issue = issue(self.schema, [600, 400])
+        self.history = History(self.schema)
+
+    def statuses(self, proofs) -> list:
+        return [self.history.status(proof.GetHash()) for proof in proofs]
+
+    def test_fan_out(self):
+        children = [transfer(self.schema, [self.issue], [600], 1), transfer(self.schema, [self.issue], [400], 2)]
+        spent = {child.GetHash(): [seal_outpoint(self.issue, no)] for (no, child) in enumerate(children)}
+        self.assertEqual(self.history.extend([self.issue] + children, spent), 3)
+        self.assertEqual(self.statuses([self.issue] + children), [Status.valid] * 3)
+
+    def test_fan_out_unknown_spends(self):
+        children = [transfer(self.schema, [self.issue], [600], 1), transfer(self.schema, [self.issue], [300, 100], 2)]
+        self.history.extend([self.issue] + children)
+        self.assertEqual(self.statuses(children), [Status.valid] * 2)
+
+    def test_balance_not_conserved(self):
+        child = transfer(self.schema, [self.issue], [500], 1)
+        self.history.extend([self.issue, child], {child.GetHash(): [seal_outpoint(self.issue, 0)]})
+        self.assertEqual(self.history.status(child.GetHash()), Status.invalid)
+        self.assertIn('not conserved', self.history.invalid()[0].error)
+
+    def test_over_spend(self):
+        child = transfer(self.schema, [self.issue], [1001], 1)
+        self.history.extend([self.issue, child])
+        self.assertEqual(self.history.status(child.GetHash()), Status.invalid)
+        self.assertIn('at most 1000', self.history.invalid()[0].error)
+
+    def test_unknown_seal(self):
+        child = transfer(self.schema, [self.issue], [600], 1)
+        self.history.extend([self.issue, child], {child.GetHash(): [f'{"33" * 32}:0']})
+        self.assertIn('not defined', self.history.invalid()[0].error)
+
+    def test_wrong_seal_type(self):
+        # -- the issue seal at output 1 is an `inflation` one, which transfers can't close
+        child = transfer(self.schema, [self.issue], [600], 1)
+        spent = [seal_outpoint(self.issue, 0), seal_outpoint(self.issue, 2)]
+        self.history.extend([self.issue, child], {child.GetHash(): spent})
+        self.assertIn('inflation', self.history.invalid()[0].error)
+
+    def test_chain(self):
+        first = transfer(self.schema, [self.issue], [250, 350], 1)
+        second = transfer(self.schema, [first], [600], 2)
+        spent = {
+            first.GetHash(): [seal_outpoint(self.issue, 0)],
+            second.GetHash(): [seal_outpoint(first, 0), seal_outpoint(first, 1)],
+        }
+        self.history.extend([self.issue, first, second], spent)
+        self.assertEqual(self.statuses([self.issue, first, second]), [Status.valid] * 3)
+        self.assertEqual(self.history.order, [self.issue.GetHash(), first.GetHash(), second.GetHash()])
+
+    def test_missing_parent(self):
+        first = transfer(self.schema, [self.issue], [600], 1)
+        second = transfer(self.schema, [first], [600], 2)
+        spent = {first.GetHash(): [seal_outpoint(self.issue, 0)], second.GetHash(): [seal_outpoint(first, 0)]}
+        self.assertEqual(self.history.extend([second, first], spent), 0)
+        self.assertEqual(self.statuses([first, second]), [Status.pending] * 2)
+        self.assertEqual(self.history.missing(), {self.issue.GetHash()})
+
+        # -- adding the missing parent validates the proofs waiting for it in topological order
+        validated = self.history.add(self.issue)
+        self.assertEqual([node.id for node in validated], [self.issue.GetHash(), first.GetHash(), second.GetHash()])
+        self.assertEqual(self.history.missing(), set())
+        self.assertEqual(self.history.pending(), [])
+
+    def test_invalid_parent(self):
+        first = transfer(self.schema, [self.issue], [1100], 1)
+        second = transfer(self.schema, [first], [1100], 2)
+        self.history.extend([self.issue, first, second])
+        self.assertEqual(self.statuses([self.issue, first, second]), [Status.valid, Status.invalid, Status.invalid])
+        self.assertIn('is invalid', self.history.invalid()[1].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import copy
+import os
+import tempfile
+import unittest
+
+from rgbconvert import files
+from rgbconvert.incremental import Manifest, proof_type_digests
+from rgbconvert.schema.schema import Schema
+
+from .fixtures import SAMPLES
+
+OPERATION = 'transcode:yaml:binary'
+
+
+def make_schema(data: dict) -> Schema:
+    schema = Schema(**copy.deepcopy(data))
+    schema.resolve_refs()
+    return schema
+
+
+class IncrementalTest(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(SAMPLES, 'rgb_schema.yaml')) as f:
+            self.data = files.load_structure(f, 'yaml')
+        self.schema = make_schema(self.data)
+        self.digests = proof_type_digests(self.schema)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.manifest = Manifest(self.path('manifest.json'))
+        self.infile = self.write('in.yaml', b'proof')
+        self.outfile = self.write('out.bin', b'output')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name: str, data: bytes) -> str:
+        with open(self.path(name), 'wb') as f:
+            f.write(data)
+        return self.path(name)
+
+    def process(self, schema: Schema = None, digests: dict = None):
+        """Checks the input and records it as processed if needed, returning the state returned by `check`"""
+        (schema, digests) = (schema or self.schema, digests or self.digests)
+        state = self.manifest.check(self.infile, self.outfile, OPERATION, schema.bech32_id(), digests)
+        if state is not None:
+            self.manifest.update(self.infile, state, self.outfile, OPERATION, schema.bech32_id(), 'primary_issue',
+                                 digests)
+        return state
+
+    def changed(self, keys: list, value) -> Schema:
+        """Returns the sample schema with `value` put into the schema data under the given `keys` path"""
+        data = copy.deepcopy(self.data)
+        target = data
+        for key in keys[:-1]:
+            target = target[key]
+        target[keys[-1]] = value
+        return make_schema(data)
+
+    def test_digests(self):
+        self.assertEqual(set(self.digests), {proof_type['name'] for proof_type in self.data['proof_types']})
+        self.assertEqual(proof_type_digests(make_schema(self.data)), self.digests)
+
+        # -- changes of other proof types and of the types they use do not affect the proof type
+        schema = self.changed(['proof_types', 2, 'fields', 'ver'], 'optional')
+        digests = proof_type_digests(schema)
+        self.assertNotEqual(schema.bech32_id(), self.schema.bech32_id())
+        self.assertNotEqual(digests['upgrade_signal'], self.digests['upgrade_signal'])
+        self.assertEqual({name: digest for name, digest in digests.items() if name != 'upgrade_signal'},
+                         {name: digest for name, digest in self.digests.items() if name != 'upgrade_signal'})
+
+        # -- changes of field types used by the proof type do
+        digests = proof_type_digests(self.changed(['field_types', 'dust_limit'], 'fvi'))
+        self.assertNotEqual(digests['primary_issue'], self.digests['primary_issue'])
+        self.assertEqual(digests['asset_transfer'], self.digests['asset_transfer'])
+
+        # -- and so do the changes of proof type numbers
+        data = copy.deepcopy(self.data)
+        data['proof_types'].insert(0, dict(data['proof_types'][-1], name='other_transfer'))
+        digests = proof_type_digests(make_schema(data))
+        self.assertTrue(all(digests[name] != digest for name, digest in self.digests.items()))
+
+    def test_unchanged(self):
+        self.assertIsNotNone(self.process())
+        self.assertIsNone(self.process())
+        # -- touched, but not changed files are not processed again
+        os.utime(self.infile, (1, 1))
+        os.utime(self.outfile, (1, 1))
+        self.assertIsNone(self.process())
+        self.assertEqual(self.manifest.entries[self.infile]['input_stat'][0], 1000000000)
+
+    def test_changed_files(self):
+        self.process()
+        self.write('in.yaml', b'changed proof')
+        self.assertIsNotNone(self.process())
+        self.assertIsNone(self.process())
+
+        self.write('out.bin', b'changed output')
+        self.assertIsNotNone(self.process())
+        os.unlink(self.outfile)
+        self.assertIsNotNone(self.manifest.check(self.infile, self.outfile, OPERATION, self.schema.bech32_id(),
+                                                 self.digests))
+        self.assertIsNotNone(self.manifest.check(self.infile, self.path('other.bin'), OPERATION,
+                                                 self.schema.bech32_id(), self.digests))
+
+    def test_schema_change(self):
+        self.process()
+        # -- a new schema version with another proof type changed keeps the input processed
+        schema = self.changed(['proof_types', 2, 'fields', 'ver'], 'optional')
+        self.assertIsNone(self.process(schema, proof_type_digests(schema)))
+        self.assertEqual(self.manifest.entries[self.infile]['schema'], schema.bech32_id())
+
+        schema = self.changed(['field_types', 'dust_limit'], 'fvi')
+        state = self.process(schema, proof_type_digests(schema))
+        self.assertIsNotNone(state)
+        self.assertIsNone(self.process(schema, proof_type_digests(schema)))
+
+    def test_prune(self):
+        self.process()
+        other = self.write('other.yaml', b'other proof')
+        state = self.manifest.check(other, self.outfile, OPERATION, self.schema.bech32_id(), self.digests)
+        self.manifest.update(other, state, self.outfile, OPERATION, self.schema.bech32_id(), 'primary_issue',
+                             self.digests)
+        os.unlink(other)
+        self.manifest.prune([self.infile])
+        self.assertEqual(list(self.manifest.entries), [self.infile])
+
+    def test_save(self):
+        self.process()
+        self.manifest.save()
+        manifest = Manifest(self.manifest.path)
+        self.assertEqual(manifest.entries, self.manifest.entries)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['in.yaml', 'manifest.json', 'out.bin'])
+        self.write('manifest.json', b'{"format": 1, "entr')
+        self.assertEqual(Manifest(self.manifest.path).entries, {})
+        self.write('manifest.json', b'{"format": 0, "entries": {"a": {}}}')
+        self.assertEqual(Manifest(self.manifest.path).entries, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
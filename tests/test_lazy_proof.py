@@ -0,0 +1,47 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import os
+import unittest
+
+from rgbconvert.files import load_schema
+from rgbconvert.proofs import Proof, LazyProof
+
+SAMPLES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'samples')
+
+
+class LazyProofTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = load_schema(os.path.join(SAMPLES, 'rgb_schema.yaml'))
+        with open(os.path.join(SAMPLES, 'shares_issue.bin'), 'rb') as f:
+            self.data = f.read()
+
+    def test_structure_serialize(self):
+        (proof, _) = Proof.from_buffer(self.data, 0, self.schema)
+        (lazy, _) = LazyProof.from_buffer(self.data, 0, self.schema)
+        self.assertFalse(lazy.is_decoded('fields'))
+        self.assertEqual(lazy.structure_serialize(), proof.structure_serialize())
+
+    def test_structure_serialize_after_resolve(self):
+        (proof, _) = Proof.from_buffer(self.data, 0, self.schema)
+        (lazy, _) = LazyProof.from_buffer(self.data, 0, self.schema)
+        lazy.seals
+        lazy.resolve_schema(self.schema)
+        self.assertFalse(lazy.is_decoded('seals'))
+        self.assertEqual(lazy.structure_serialize(), proof.structure_serialize())
+
+    def test_serialize(self):
+        (lazy, consumed) = LazyProof.from_buffer(self.data, 0, self.schema)
+        self.assertEqual(consumed, len(self.data))
+        self.assertEqual(lazy.serialize(), self.data)
@@ -0,0 +1,86 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import json
+import os
+import tempfile
+import unittest
+
+from rgbconvert import metrics
+from rgbconvert.proofs import Proof
+
+from .fixtures import sample_schema, issue
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = sample_schema()
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def counters(self, name: str) -> dict:
+        return {tuple(sample['labels'].values()): sample['value'] for sample in metrics.snapshot().get(name, [])}
+
+    def test_seals_and_fields(self):
+        issue(self.schema, [600, 400, 1])
+        self.assertEqual(self.counters('seals_total'), {('assets',): 3, ('inflation',): 1, ('upgrade',): 1,
+                                                        ('pruning',): 1})
+        self.assertEqual(self.counters('fields_total'), {('ticker',): 1, ('dust_limit',): 1})
+        self.assertEqual(self.counters('proofs_decoded_total'), {('structure', 'root'): 1})
+
+    def test_binary(self):
+        data = issue(self.schema, [600]).serialize()
+        metrics.reset()
+        Proof.from_buffer(data, 0, self.schema)
+        self.assertEqual(self.counters('proofs_decoded_total'), {('binary', 'root'): 1})
+        self.assertEqual(self.counters('bytes_read_total'), {('binary',): len(data)})
+        self.assertEqual(self.counters('seals_total')[('assets',)], 1)
+
+    def test_merge(self):
+        issue(self.schema, [600])
+        snapshot = metrics.snapshot()
+        metrics.merge(snapshot)
+        self.assertEqual(self.counters('seals_total')[('assets',)], 2)
+        self.assertEqual(self.counters('fields_total')[('ticker',)], 2)
+
+    def test_prometheus_text(self):
+        metrics.inc('errors_total', (('error', 'ValueError'), ('kind', 'a"b')), 2)
+        metrics.inc('unknown_total')
+        self.assertEqual(metrics.prometheus_text().splitlines(), [
+            '# HELP rgbconvert_errors_total ' + metrics.METRICS['errors_total'],
+            '# TYPE rgbconvert_errors_total counter',
+            'rgbconvert_errors_total{error="ValueError",kind="a\\"b"} 2',
+            '# HELP rgbconvert_unknown_total unknown_total',
+            '# TYPE rgbconvert_unknown_total counter',
+            'rgbconvert_unknown_total 1',
+        ])
+
+    def test_write(self):
+        metrics.add('seals_total', 'type', {'assets': 5})
+        with tempfile.TemporaryDirectory() as tmp:
+            metrics.write(os.path.join(tmp, 'metrics.json'))
+            with open(os.path.join(tmp, 'metrics.json')) as f:
+                self.assertEqual(json.load(f)['counters'], metrics.snapshot())
+            metrics.write(os.path.join(tmp, 'metrics.prom'))
+            with open(os.path.join(tmp, 'metrics.prom')) as f:
+                self.assertEqual(f.read(), metrics.prometheus_text())
+            self.assertEqual(sorted(os.listdir(tmp)), ['metrics.json', 'metrics.prom'])
+            with self.assertRaises(ValueError):
+                metrics.write(os.path.join(tmp, 'metrics.txt'), 'text')
+
+
+if __name__ == '__main__':
+    unittest.main()
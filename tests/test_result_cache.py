@@ -0,0 +1,116 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import os
+import stat
+import tempfile
+import time
+import unittest
+
+from rgbconvert.result_cache import ResultCache
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.path('cache'))
+        self.infile = self.write('in.yaml', b'proof')
+        self.outfile = self.write('out.bin', b'output')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.tmp.name, name)
+
+    def write(self, name: str, data: bytes) -> str:
+        with open(self.path(name), 'wb') as f:
+            f.write(data)
+        return self.path(name)
+
+    def read(self, path: str) -> bytes:
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def test_hit(self):
+        key = self.cache.key(self.infile, 'sc1', 'transcode:yaml:binary')
+        self.assertIsNone(self.cache.get(key, self.path('restored.bin')))
+        self.cache.put(key, {'pos': 6}, self.outfile)
+
+        self.assertEqual(self.cache.get(key, self.path('restored.bin')), {'pos': 6})
+        self.assertEqual(self.read(self.path('restored.bin')), b'output')
+        # -- copies are writable, while the cached output is not
+        self.assertTrue(os.stat(self.path('restored.bin')).st_mode & stat.S_IWUSR)
+        self.assertFalse(os.stat(self.cache.entry_path(key, '.out')).st_mode & stat.S_IWUSR)
+        self.assertEqual([name for name in os.listdir(self.tmp.name) if name.endswith('.tmp')], [])
+
+        verdict = self.cache.key(self.infile, 'sc1', 'validate:yaml')
+        self.cache.put(verdict, {'error': None})
+        self.assertEqual(self.cache.get(verdict), {'error': None})
+
+    def test_key(self):
+        key = self.cache.key(self.infile, 'sc1', 'transcode:yaml:binary')
+        self.assertEqual(self.cache.key(self.write('copy.yaml', b'proof'), 'sc1', 'transcode:yaml:binary'), key)
+        self.assertNotEqual(self.cache.key(self.infile, 'sc2', 'transcode:yaml:binary'), key)
+        self.assertNotEqual(self.cache.key(self.infile, 'sc1', 'transcode:yaml:json'), key)
+        self.write('in.yaml', b'changed proof')
+        self.assertNotEqual(self.cache.key(self.infile, 'sc1', 'transcode:yaml:binary'), key)
+
+    def test_modified_output(self):
+        key = self.cache.key(self.infile, 'sc1', 'transcode:yaml:binary')
+        self.cache.put(key, {'pos': 6}, self.outfile)
+        out = self.cache.entry_path(key, '.out')
+        os.chmod(out, 0o644)
+        self.write(out, b'tampered')
+        self.assertIsNone(self.cache.get(key, self.path('restored.bin')))
+        self.assertFalse(os.path.exists(self.path('restored.bin')))
+
+    def test_link(self):
+        cache = ResultCache(self.path('cache'), link=True)
+        key = cache.key(self.infile, 'sc1', 'transcode:yaml:binary')
+        cache.put(key, {'pos': 6}, self.outfile)
+        for _ in range(2):
+            self.assertEqual(cache.get(key, self.path('linked.bin')), {'pos': 6})
+            self.assertTrue(os.path.samefile(self.path('linked.bin'), cache.entry_path(key, '.out')))
+        # -- a linked output is replaced rather than written through when the entry is restored over another one
+        self.write('other.bin', b'other')
+        other = cache.key(self.write('other.yaml', b'other proof'), 'sc1', 'transcode:yaml:binary')
+        cache.put(other, {'pos': 5}, self.path('other.bin'))
+        self.assertEqual(cache.get(other, self.path('linked.bin')), {'pos': 5})
+        self.assertEqual(self.read(cache.entry_path(key, '.out')), b'output')
+
+    def test_eviction(self):
+        cache = ResultCache(self.path('cache'), max_size=2000)
+        keys = []
+        for no in range(10):
+            keys.append(cache.key(self.write(f'in{no}.yaml', bytes([no])), 'sc1', 'transcode:yaml:binary'))
+            cache.put(keys[-1], {'no': no}, self.write('out.bin', bytes(150)))
+            # -- entries are ordered by modification time of their `.meta` files, which must differ
+            os.utime(cache.entry_path(keys[-1], '.meta'), (no, no))
+            if no == 4:
+                # -- a hit makes the entry recently used
+                self.assertEqual(cache.get(keys[0], self.path('restored.bin')), {'no': 0})
+                os.utime(cache.entry_path(keys[0], '.meta'), (time.time(), time.time()))
+        self.assertLessEqual(cache.size, 2000)
+        cached = [no for (no, key) in enumerate(keys) if os.path.exists(cache.entry_path(key, '.meta'))]
+        self.assertIn(0, cached)
+        self.assertIn(9, cached)
+        self.assertNotIn(1, cached)
+        for key in keys:
+            self.assertEqual(os.path.exists(cache.entry_path(key, '.meta')),
+                             os.path.exists(cache.entry_path(key, '.out')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import unittest
+
+from rgbconvert.seal_index import SealIndex
+
+from .fixtures import sample_schema, issue, transfer, seal_outpoint
+
+
+class SealIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.schema = sample_schema()
+        self.issue = issue(self.schema, [600, 400])
+        self.index = SealIndex(':memory:')
+
+    def tearDown(self):
+        self.index.close()
+
+    def ids(self, proofs) -> list:
+        return sorted(proof.GetHash() for proof in proofs)
+
+    def test_fan_out(self):
+        children = [transfer(self.schema, [self.issue], [600], 1), transfer(self.schema, [self.issue], [400], 2)]
+        spent = {child.GetHash(): [seal_outpoint(self.issue, no)] for (no, child) in enumerate(children)}
+        self.assertEqual(self.index.extend([self.issue] + children, spent), 3)
+
+        self.assertEqual(list(self.index.double_spends()), [])
+        for (no, child) in enumerate(children):
+            outpoint = seal_outpoint(self.issue, no)
+            self.assertEqual([proof.bytes for proof in self.index.created_by(outpoint)], [self.issue.GetHash()])
+            self.assertEqual([proof.bytes for proof in self.index.closed_by(outpoint)], [child.GetHash()])
+            self.assertEqual([proof.bytes for proof in self.index.created_by(seal_outpoint(child, 0))],
+                             [child.GetHash()])
+        self.assertEqual(self.index.closed_by(seal_outpoint(self.issue, 2)), [])
+        self.assertEqual(self.index.unknown, 0)
+
+    def test_double_spend(self):
+        children = [transfer(self.schema, [self.issue], [600], 1), transfer(self.schema, [self.issue], [600], 2)]
+        outpoint = seal_outpoint(self.issue, 0)
+        self.index.extend([self.issue] + children, {child.GetHash(): [outpoint] for child in children})
+
+        spends = list(self.index.double_spends())
+        self.assertEqual(len(spends), 1)
+        self.assertEqual(spends[0][0].structure_serialize(), outpoint)
+        self.assertEqual([proof.bytes for proof in spends[0][1]], self.ids(children))
+        self.assertEqual(sorted(proof.bytes for proof in self.index.closed_by(outpoint)), self.ids(children))
+
+    def test_missing_parent(self):
+        child = transfer(self.schema, [self.issue], [600], 1)
+        outpoint = seal_outpoint(self.issue, 0)
+        self.index.add(child, [outpoint])
+        self.index.commit()
+        self.assertEqual(self.index.created_by(outpoint), [])
+        self.assertEqual([proof.bytes for proof in self.index.closed_by(outpoint)], [child.GetHash()])
+        self.assertEqual(list(self.index.double_spends()), [])
+
+    def test_unknown_spends(self):
+        children = [transfer(self.schema, [self.issue], [600], 1), transfer(self.schema, [self.issue], [400], 2)]
+        self.index.extend([self.issue] + children)
+        self.assertEqual(self.index.unknown, 2)
+        self.assertEqual(list(self.index.double_spends()), [])
+        self.assertEqual(self.index.closed_by(seal_outpoint(self.issue, 0)), [])
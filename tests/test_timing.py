@@ -0,0 +1,68 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+import time
+import unittest
+
+from rgbconvert import timing
+
+
+@timing.timed('test.outer')
+def outer(delay: float):
+    time.sleep(delay)
+    with timing.span('test.inner'):
+        time.sleep(delay)
+
+
+class TimingTest(unittest.TestCase):
+    def setUp(self):
+        self.enabled = timing.enabled
+        timing.reset()
+
+    def tearDown(self):
+        timing.enabled = self.enabled
+        timing.reset()
+
+    def test_disabled(self):
+        timing.enabled = False
+        outer(0)
+        self.assertEqual(timing.report(), {})
+
+    def test_nested(self):
+        timing.enabled = True
+        for _ in range(2):
+            outer(0.01)
+        report = timing.report()
+        self.assertEqual(set(report.keys()), {'test.outer', 'test.inner'})
+        (outer_stage, inner_stage) = (report['test.outer'], report['test.inner'])
+        self.assertEqual((outer_stage['count'], inner_stage['count']), (2, 2))
+        self.assertGreaterEqual(inner_stage['total'], 0.02)
+        self.assertEqual(inner_stage['self'], inner_stage['total'])
+        # -- time of the nested stage is excluded from the self time of the outer one
+        self.assertAlmostEqual(outer_stage['self'], outer_stage['total'] - inner_stage['total'], places=6)
+        self.assertGreaterEqual(outer_stage['self'], 0.02)
+
+    def test_merge(self):
+        timing.enabled = True
+        outer(0)
+        report = timing.report()
+        timing.merge(report)
+        merged = timing.report()
+        for name in ['test.outer', 'test.inner']:
+            self.assertEqual(merged[name]['count'], 2)
+            self.assertAlmostEqual(merged[name]['total'], 2 * report[name]['total'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+# This file is a part of Python OpenSeals library and tools
+# Written in 2019 by
+#     Dr. Maxim Orlovsky <orlovsky@pandoracore.com>, Pandora Core AG, Swiss
+#     with support of Bitfinex and other RGB project contributors
+#
+# To the extent possible under law, the author(s) have dedicated all
+# copyright and related and neighboring rights to this software to
+# the public domain worldwide. This software is distributed without
+# any warranty.
+#
+# You should have received a copy of the MIT License
+# along with this software.
+# If not, see <https://opensource.org/licenses/MIT>.
+
+"""Batch VarInt and FlagVarInt codecs are checked against single-value encoders and the stream serializers."""
+
+import io
+import random
+import unittest
+
+from bitcoin.core.serialize import SerializationTruncationError, VarIntSerializer
+
+from rgbconvert.consensus import FlagVarIntSerializer, SeparatorByteSignal
+from rgbconvert.consensus.varint import varint_bytes, flag_varint_bytes, decode_varints, encode_varints, \
+    decode_flag_varints, decode_flag_varint_run, encode_flag_varints
+
+# Boundaries of VarInt and FlagVarInt encoding lengths
+VARINT_EDGES = [0, 1, 0x7b, 0x7c, 0xfc, 0xfd, 0xff, 0x100, 0xffff, 0x10000, 0xffffffff, 0x100000000,
+                0xffffffffffffffff]
+FLAG_VARINT_EDGES = [0, 1, 0x7b, 0x7c, 0xff, 0x100, 0xffff, 0x10000, 0xffffffff]
+
+
+def random_values(rng: random.Random, count: int, bits: list) -> list:
+    """Values of random lengths with long runs of single-byte ones, like in real seal sequences"""
+    values = []
+    while len(values) < count:
+        width = rng.choice(bits)
+        values += [rng.getrandbits(width) for _ in range(rng.choice([1, 1, 5, 50]))]
+    return values[:count]
+
+
+class VarIntTest(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(0)
+
+    def test_varint_bytes(self):
+        for value in VARINT_EDGES:
+            self.assertEqual(varint_bytes(value), VarIntSerializer.serialize(value))
+        with self.assertRaises(ValueError):
+            varint_bytes(-1)
+
+    def test_decode_varints(self):
+        for count in [0, 1, 2, 10, 1000]:
+            for _ in range(20):
+                values = random_values(self.rng, count, [6, 8, 16, 32, 64])
+                data = b''.join(varint_bytes(value) for value in values)
+                self.assertEqual(encode_varints(values), data)
+                # -- values are decoded from the middle of a buffer, which must not be read beyond `end`
+                buf = b'\xff' + data + b'\x01\x02'
+                (decoded, pos) = decode_varints(buf, 1, len(buf) - 2, count)
+                self.assertEqual(list(decoded), values)
+                self.assertEqual(pos, len(data) + 1)
+
+    def test_decode_varints_truncated(self):
+        values = VARINT_EDGES * 3
+        data = encode_varints(values)
+        for end in range(len(data)):
+            with self.assertRaises(SerializationTruncationError):
+                decode_varints(data, 0, end, len(values))
+
+    def test_flag_varint_bytes(self):
+        for value in FLAG_VARINT_EDGES:
+            for flag in [False, True]:
+                self.assertEqual(flag_varint_bytes(value, flag), FlagVarIntSerializer.serialize((value, flag)))
+                decoded = FlagVarIntSerializer.stream_deserialize(io.BytesIO(flag_varint_bytes(value, flag)))
+                self.assertEqual(decoded, (value, flag))
+        for value in [-1, 0x100000000]:
+            with self.assertRaises(ValueError):
+                flag_varint_bytes(value)
+
+    def test_decode_flag_varints(self):
+        for count in [0, 1, 2, 10, 1000]:
+            for _ in range(20):
+                values = random_values(self.rng, count, [6, 7, 8, 16, 32])
+                flags = [self.rng.random() < 0.5 for _ in values]
+                data = b''.join(flag_varint_bytes(value, flag) for (value, flag) in zip(values, flags))
+                self.assertEqual(encode_flag_varints(values, flags), data)
+                buf = b'\x7f' + data + b'\x01'
+                (decoded, decoded_flags, pos) = decode_flag_varints(buf, 1, len(buf) - 1, count)
+                self.assertEqual(list(decoded), values)
+                self.assertEqual([flag == 1 for flag in decoded_flags], flags)
+                self.assertEqual(pos, len(data) + 1)
+
+    def test_decode_flag_varint_run(self):
+        for flag in [False, True]:
+            for _ in range(20):
+                values = random_values(self.rng, self.rng.randrange(100), [6, 7, 8, 16, 32])
+                data = encode_flag_varints(values, flag)
+                self.assertEqual(data, b''.join(flag_varint_bytes(value, flag) for value in values))
+                # -- the run ends at the first value with another flag or at a separator byte
+                for stop in [flag_varint_bytes(5, not flag), b'\x7f', b'\xff', b'']:
+                    buf = data + stop
+                    (decoded, pos) = decode_flag_varint_run(buf, 0, len(buf), flag)
+                    self.assertEqual(list(decoded), values)
+                    self.assertEqual(pos, len(data))
+
+    def test_decode_flag_varints_separator(self):
+        for separator in [b'\x7f', b'\xff']:
+            data = encode_flag_varints([1, 2, 300], False) + separator
+            with self.assertRaises(SeparatorByteSignal):
+                decode_flag_varints(data, 0, len(data), 4)
+
+    def test_decode_flag_varints_truncated(self):
+        values = FLAG_VARINT_EDGES * 3
+        data = encode_flag_varints(values, True)
+        for end in range(len(data)):
+            with self.assertRaises(SerializationTruncationError):
+                decode_flag_varints(data, 0, end, len(values))
+
+
+if __name__ == '__main__':
+    unittest.main()